@@ -10,6 +10,7 @@ import json
 import numpy as np 
 import geopandas as gpd
 import matplotlib.pyplot as plt
+from state_registry import INDIA_ID, STATE_IDS, attach_state_ids
 
 # Page setup
 st.set_page_config(layout="wide", page_title="India FoodCrop Dashboard", page_icon="🌾")
@@ -79,8 +80,9 @@ with st.sidebar:
 
     metric = st.selectbox("Select Metric", ["Area", "Production", "Yield"])
 
-try:
-    
+# Load each pulse sheet once; state names resolve to integer State_IDs at ingest
+@st.cache_data
+def load_pulses_sheet(pulse_type):
     df = pd.read_excel(
         "Data/Pulses_Data.xlsx",
         sheet_name=pulse_type,
@@ -92,52 +94,40 @@ try:
 
     # Rename "States/UTs" → "State"
     df = df.rename(columns={"States/UTs": "State"})
+    df["Year"] = df["Year"].astype(str)
+
+    return attach_state_ids(df, "State", source=f"Pulses_Data.xlsx [{pulse_type}]")
+
+@st.cache_data
+def load_india_states_shapefile():
+    gdf = gpd.read_file("India_Shapefile/india_st.shp")
+    return attach_state_ids(gdf, "State_Name", source="india_st.shp")
+
+def report_unmatched_states(source, unmatched):
+    if unmatched:
+        st.warning(f"State names in {source} not found in the state registry: {', '.join(unmatched)}")
+
+try:
+    df, unmatched_pulse_states = load_pulses_sheet(pulse_type)
+    report_unmatched_states(f"Pulses_Data.xlsx [{pulse_type}]", unmatched_pulse_states)
 
     # Filter season-wise
     df = df[df["Season"].str.lower() == season.lower()]
 
     # Coerce numeric
-    df["Year"] = df["Year"].astype(str)
     df[metric] = pd.to_numeric(df[metric], errors="coerce")
     df = df.dropna(subset=[metric])
 
-    df["State"] = df["State"].str.strip()
-    df["State"] = df["State"].replace({
-        "Orissa": "Odisha",
-        "Jammu & Kashmir": "Jammu and Kashmir",
-        "Chhattisgarh": "Chhattishgarh",
-        "Telangana": "Telengana",
-        "Tamil Nadu": "Tamilnadu",
-        "Kerela": "Kerala",
-        "Andaman & Nicobar Islands": "Andaman & Nicobar"
-    
-    })
-
     selected_year = st.sidebar.selectbox("Select Year", sorted(df["Year"].unique()))
 
     df_selected_year = df[df["Year"] == selected_year]
 
     # Load shapefile
-    gdf = gpd.read_file("India_Shapefile/india_st.shp")
+    gdf, unmatched_shape_states = load_india_states_shapefile()
+    report_unmatched_states("india_st.shp", unmatched_shape_states)
 
-    # Clean columns → very important!
-    df_selected_year["State"] = df_selected_year["State"].str.strip().str.upper()
-    gdf["State_Name"] = gdf["State_Name"].str.strip().str.upper()
-
-    # Optional → map common name mismatches
-    df_selected_year["State"] = df_selected_year["State"].replace({
-        "Orissa": "Odisha",
-        "Jammu & Kashmir": "Jammu and Kashmir",
-        "Chhattisgarh": "Chhattishgarh",
-        "Telangana": "Telengana",
-        "Tamil Nadu": "Tamilnadu",
-        "Kerela": "Kerala",
-        "Andaman & Nicobar Islands": "Andaman & Nicobar"
-        
-    })
-
-    # Merge Shapefile with selected year df
-    merged = gdf.merge(df_selected_year, left_on="State_Name", right_on="State", how="left")
+    # Merge Shapefile with selected year df on the integer state key
+    merged = gdf.merge(df_selected_year.drop(columns="State"), on="State_ID", how="left")
 
     # Plot India map
     fig, ax = plt.subplots(1, 1, figsize=(10, 12))
@@ -164,26 +154,11 @@ except Exception as e:
 def load_india_districts_shapefile():
     gdf = gpd.read_file("India_Shapefile/State/2011_Dist.shp")
     gdf = gdf.set_crs(epsg=4326, inplace=False)
-    return gdf
-
-State_Name_CORRECTIONS = {
-    "Orissa": "Odisha",
-    "Jammu & Kashmir": "Jammu and Kashmir",
-    "Chhattisgarh": "Chhattishgarh",
-    "Telangana": "Telengana",
-    "Tamil Nadu": "Tamilnadu",
-    "Kerela": "Kerala",
-    "Andaman & Nicobar Islands": "Andaman & Nicobar",
-    "Arunachal Pradesh": "Arunanchal Pradesh",
-    "Dadra & Nagar Haveli": "Dadara & Nagar Havelli",
-    "India": None,  # Special handling → we don't want user to select "India" in district map!
-    "Delhi": "NCT of Delhi"
-}
+    return attach_state_ids(gdf, "ST_NM", source="2011_Dist.shp")
 
 
-gdf_districts = load_india_districts_shapefile()
-gdf_districts["ST_NM"] = gdf_districts["ST_NM"].replace(State_Name_CORRECTIONS)
-gdf_districts["ST_NM"] = gdf_districts["ST_NM"].str.strip().str.upper()
+gdf_districts, unmatched_district_states = load_india_districts_shapefile()
+report_unmatched_states("2011_Dist.shp", unmatched_district_states)
 
 # Sidebar: State Map View
 st.sidebar.markdown("---")
@@ -191,20 +166,14 @@ st.sidebar.markdown("### 🗺️ State Map View")
 
 # Dynamic State Map View dropdown
 
-# Extract available states in current df_selected_year
-available_states = df_selected_year["State"].str.upper().unique().tolist()
+# Extract available states in current df_selected_year ("India" has no district map)
+available_states = df_selected_year.loc[df_selected_year["State_ID"] != INDIA_ID, "State"].dropna().unique().tolist()
 
 # Dropdown options → dynamic + "None" on top
 state_options = ["None"] + sorted(available_states)
 
 selected_state_map = st.sidebar.selectbox("Select State for State Map", state_options)
-
-# Auto detect STATE column
-state_col = None
-for col in gdf_districts.columns:
-    if "STATE" in col.upper() or "ST_NM" in col.upper():
-        state_col = col
-        break
+selected_state_id = STATE_IDS.get(selected_state_map, -1)
 
 # Auto detect DISTRICT column
 district_col = None
@@ -213,34 +182,23 @@ for col in gdf_districts.columns:
         district_col = col
         break
 
-# Debug: show all unique state names from district shapefile
-#st.write("States in shapefile (after replacement and uppercasing):")
-#st.write(sorted(gdf_districts[state_col].unique().tolist()))
-
-#st.write("States in Pulses DataFrame (df_selected_year):")
-#st.write(sorted(df_selected_year["State"].str.upper().unique().tolist()))
-
 
 # Proceed only if valid state selected
 if selected_state_map != "None":
 
     # Safety check
-    if state_col is None or district_col is None:
-        st.error("Could not detect STATE or DISTRICT column in shapefile!")
+    if district_col is None:
+        st.error("Could not detect DISTRICT column in shapefile!")
     else:
-        # Normalize function: remove spaces, convert to upper
-        def normalize_State_Name(s):
-            return s.upper().replace(" ", "")
-
-        # Filter for selected state safely
-        state_gdf = gdf_districts[gdf_districts[state_col].apply(normalize_State_Name) == normalize_State_Name(selected_state_map)]
+        # Filter for selected state
+        state_gdf = gdf_districts[gdf_districts["State_ID"] == selected_state_id]
 
 
         # Optional: explode in case MultiPolygon present
         state_gdf = state_gdf.explode(index_parts=False)
 
         # Prepare df_selected_year → selected state row
-        state_row = df_selected_year[df_selected_year["State"].str.upper() == selected_state_map.upper()]
+        state_row = df_selected_year[df_selected_year["State_ID"] == selected_state_id]
 
         if state_row.empty:
             st.warning(f"No data available for {selected_state_map} for {season} - {pulse_type} - {metric} in selected year.")
@@ -290,7 +248,7 @@ if selected_state_map != "None":
 
                 #
                 # Filter the main dataframe for the selected state across ALL available years
-                state_historical_df = df[df["State"].str.upper() == selected_state_map.upper()].copy()
+                state_historical_df = df[df["State_ID"] == selected_state_id].copy()
                 state_historical_df['Year'] = pd.to_numeric(state_historical_df['Year'].astype(str).str.split('-').str[0]) # <--- USE THIS NEW LINE
                 state_historical_df = state_historical_df.sort_values("Year")
                 #
@@ -388,18 +346,9 @@ if selected_state_map != "None":
 st.markdown("---")
 st.subheader("🇮🇳 Full India District Map View (Fabricated Values)")
 
-# Auto detect STATE and DISTRICT columns
-state_col = None
-district_col = None
-for col in gdf_districts.columns:
-    if "STATE" in col.upper() or "ST_NM" in col.upper():
-        state_col = col
-    if "DISTRICT" in col.upper() or "DIST_NAME" in col.upper() or "DIST_NM" in col.upper():
-        district_col = col
-
 # Check
-if state_col is None or district_col is None:
-    st.error("Could not detect STATE or DISTRICT column in shapefile!")
+if district_col is None:
+    st.error("Could not detect DISTRICT column in shapefile!")
 else:
     # Prepare a copy of gdf_districts to avoid inplace modification
     gdf_districts_full = gdf_districts.copy()
@@ -407,41 +356,22 @@ else:
     # Prepare Dummy_Value column
     gdf_districts_full["Dummy_Value"] = 0.0
 
-    # Process each state in df_selected_year
-    for State_Name in df_selected_year["State"].unique():
-        State_Name_upper = State_Name.strip().upper()
-
-        # Match in shapefile with normalization
-        def normalize_State_Name(s):
-            return s.upper().replace(" ", "")
+    # One total per state in df_selected_year, keyed by State_ID
+    state_totals = df_selected_year[df_selected_year["State_ID"] >= 0].drop_duplicates("State_ID").set_index("State_ID")[metric]
 
-        mask = gdf_districts_full[state_col].apply(normalize_State_Name) == normalize_State_Name(State_Name_upper)
-        state_gdf = gdf_districts_full[mask]
+    for state_id, state_total_value in state_totals.items():
+        mask = gdf_districts_full["State_ID"] == state_id
 
-        # If no matching districts → skip
-        if state_gdf.empty:
+        # Fabricate values across districts; no matching districts → skip
+        districts = gdf_districts_full.loc[mask, district_col].unique()
+        if len(districts) == 0:
             continue
 
-        # Get state total value from df_selected_year
-        state_row = df_selected_year[df_selected_year["State"].str.upper() == State_Name_upper]
-        if state_row.empty:
-            continue
-
-        state_total_value = state_row[metric].values[0]
-
-        # Fabricate values across districts
-        districts = state_gdf[district_col].unique().tolist()
-        n_districts = len(districts)
-
-        proportions = np.random.dirichlet(np.ones(n_districts))
-        dummy_values = proportions * state_total_value
+        proportions = np.random.dirichlet(np.ones(len(districts)))
+        dummy_values = pd.Series(proportions * state_total_value, index=districts)
 
         # Assign fabricated values to Dummy_Value column
-        for i, district_name in enumerate(districts):
-            gdf_districts_full.loc[
-                (mask) & (gdf_districts_full[district_col] == district_name),
-                "Dummy_Value"
-            ] = dummy_values[i]
+        gdf_districts_full.loc[mask, "Dummy_Value"] = gdf_districts_full.loc[mask, district_col].map(dummy_values)
 
     # Plot the full India district map
     fig_full, ax_full = plt.subplots(1, 1, figsize=(12, 14))
@@ -465,7 +395,7 @@ st.subheader("📽️ Animated District-wise Trend (Simulated Data)")
 # Filter districts for the selected state
 if selected_state_map != "None":
     filtered_districts = gdf_districts_full[
-        gdf_districts_full[state_col].str.upper() == selected_state_map.upper()
+        gdf_districts_full["State_ID"] == selected_state_id
     ][district_col].dropna().unique().tolist()
     filtered_districts = sorted(filtered_districts)
 else:
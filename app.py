@@ -1,15 +1,34 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import os
 import plotly.express as px
-import plotly.graph_objects as go
 from growth_analysis import plot_logest_growth_from_csv
 from world_map import show_world_timelapse_map
 import glob
 import json
 import numpy as np 
-import geopandas as gpd
 import matplotlib.pyplot as plt
+from catalog import CATEGORY_HIERARCHY, DATA_ROOT, PREFIX_MAP, UNIT_CONVERSIONS, category_unit, normalize_category, world_category
+from model_accuracy import ENSEMBLE_NAME, best_model_table, build_accuracy_index, category_accuracy, ensemble_forecast, ensemble_weights, top_models
+from forecast_timeline import build_forecast_timeline_figure
+from scenario_engine import load_scenarios
+from india_maps import PULSE_METRICS, PULSE_SEASONS, PULSE_SHEETS, detect_district_column, load_india_districts_shapefile, load_india_states_shapefile, load_pulses_cube, load_pulses_sheet, pulses_crosscheck, pulses_yield_conflicts, render_full_district_map_png, render_pulses_map_png
+from disk_cache import cache_stats, clear as clear_disk_cache
+from single_flight import flight_stats
+from plotly_payload import payload_stats, plotly_chart
+from line_render import downsample, render_mode
+from schema import compact_frame, memory_report, read_world_csv
+from rollup import build_rollups, check_summary, leaves, missing_parents, rollup_frames
+from derived import build_panel, derivation_summary, metric_frames, panel_categories
+from query_layer import MAX_EXPLORER_ROWS, country_standing, describe, run_select, top_countries, world_ranks
+from job_queue import DONE, FAILED, JobQueue
+from cagr import build_cagr_heatmap, india_cagr, world_cagr
+from classification import SCHEMES, build_class_catalog, class_colors, class_index, class_table, classify, plotly_class_scale
+from world_growth import build_country_growth, build_growth_choropleth, fastest_growing, growth_decades
+from state_registry import INDIA_ID, STATE_IDS
+from vector_tiles import ensure_mbtiles, start_tile_server, tile_map_html
+from constituencies import load_constituencies, load_districts, load_overlap, state_matrix_to_constituencies, state_weights
 
 
 # Page setup
@@ -84,73 +103,46 @@ if not selected_type:
     st.markdown("<h4 style='text-align:center;'>Please select <b>Production</b>, <b>Yield</b>, or <b>Area</b> to continue.</h4>", unsafe_allow_html=True)
     st.stop()
 
-# ---------- UNIT LOOKUP ----------
-unit_lookup = {
-    "Yield": {
-        "Oilseeds": "Kg./hectare", "Pulses": "Kg./hectare", "Rice": "Kg./hectare", "Wheat": "Kg./hectare",
-        "Coarse Cereals": "Kg./hectare", "Maize": "Kg./hectare", "Fruits": "MT/hectare", "Vegetables": "MT/hectare"
-    },
-    "Production": {
-        "Milk": "Million Tonne", "Meat": "Million Tonne", "Eggs": "Million Numbers", "Sugar and Products": "Lakh Tonne",
-        "Fruits": "'000 MT", "Vegetables": "'000 MT", "Foodgrains": "'000 Tonne", "Cereals": "'000 Tonne",
-        "Pulses": "'000 Tonne", "Rice": "'000 Tonne", "Wheat": "'000 Tonne", "Coarse Cereals": "'000 Tonne", "Maize": "'000 Tonne"
-    },
-    "Area": {
-        "Foodgrains": "Lakh hectare", "Cereals": "'000 hectare", "Fruits": "'000 hectare", "Oilseeds": "'000 hectare",
-        "Pulses": "'000 hectare", "Rice": "'000 hectare", "Vegetables": "'000 hectare", "Wheat": "'000 hectare",
-        "Coarse Cereals": "'000 hectare", "Maize": "'000 hectare"
-    }
-}
-unit_conversion_map = {
-    "'000 Tonne": {"Million Tonne": 0.001}, "'000 MT": {"Million Tonne": 0.001},
-    "'000 hectare": {"Million hectare": 0.001}, "Lakh hectare": {"Million hectare": 0.1},
-    "Million Numbers": {"Billion Numbers": 0.001}, "Kg./hectare": {"Tonne/hectare": 0.001}
-}
-
 # ---------- HEADER ----------
 st.markdown(f"<h1 style='text-align:center;'>🌾 India FoodCrop Data Dashboard</h1>", unsafe_allow_html=True)
 
 # ---------- PATH & PREFIX ----------
-prefix_map = {"Production": "prod_", "Yield": "yield_", "Area": "area_"}
-prefix = prefix_map[selected_type]
-base_path = f"Data/{selected_type}"
+prefix = PREFIX_MAP[selected_type]
+base_path = os.path.join(DATA_ROOT, selected_type)
 
 # ---------- FOLDERS ----------
 available_folders = [f.replace(prefix, "") for f in os.listdir(base_path) if f.startswith(prefix)]
 
-# ---------- CATEGORY HIERARCHY ----------
-category_hierarchy = {
-    "Agriculture": {
-        "Foodgrains": {
-            "Cereals": ["Rice", "Wheat", "Cereals"],
-            "Foodgrains": ["Foodgrains"],
-            "Coarse Cereals": ["Maize", "Coarse Cereals"],
-            "Pulses": ["Pulses"]
-        },
-        "Horticulture": {"Fruits": ["Fruits"], "Vegetables": ["Vegetables"]},
-        "Oilseeds": {"Oilseeds": ["Oilseeds"]},
-        "Commercial Crops": {"Sugar and Products": ["Sugar and Products"]}
-    },
-    "Allied Sectors": {
-        "Animal Products": {
-            "Eggs": ["Eggs"], "Milk": ["Milk"], "Meat": ["Meat"], "Marine and Inland Fish": ["Marine and Inland Fish"]
-        }
-    }
-}
+# ---------- CATEGORY ROLLUPS ----------
+# Parent categories summed from their children (history and every forecast model), built once
+@st.cache_data
+def load_rollups():
+    return build_rollups()
+
+# Production, Area and Yield aligned per (category, year), missing metrics derived from the other two
+@st.cache_data
+def load_metric_panel():
+    return build_panel()
+
+rollups, rollup_checks = load_rollups()
+metric_panel = load_metric_panel()
+# Parents without a folder of their own (e.g. Area → Cereals) are served from the rollup,
+# metrics without one (e.g. Yield → Foodgrains) from the derived panel
+rolled_up_folders = missing_parents(selected_type, available_folders)
+derived_folders = [c for c in panel_categories(metric_panel, selected_type) if c not in available_folders + rolled_up_folders]
 
 # ---------- SIDEBAR CATEGORY PICKER ----------
 with st.sidebar:
     st.markdown(f"<div class='sidebar-title'>{selected_type} Categories</div>", unsafe_allow_html=True)
-    sector = st.selectbox("Main Sector", list(category_hierarchy.keys()))
-    sub_sector = st.selectbox("Sub-Sector", list(category_hierarchy[sector].keys()))
+    sector = st.selectbox("Main Sector", list(CATEGORY_HIERARCHY.keys()))
+    sub_sector = st.selectbox("Sub-Sector", list(CATEGORY_HIERARCHY[sector].keys()))
 
-    def normalize(name): return name.lower().replace(" ", "").replace("_", "")
     subcat_display_to_folder = {}
-    norm_available = {normalize(f): f for f in available_folders}
+    norm_available = {normalize_category(f): f for f in available_folders + rolled_up_folders + derived_folders}
 
-    for subcat_list in category_hierarchy[sector][sub_sector].values():
+    for subcat_list in CATEGORY_HIERARCHY[sector][sub_sector].values():
         for subcat in subcat_list:
-            norm_subcat = normalize(subcat)
+            norm_subcat = normalize_category(subcat)
             if norm_subcat in norm_available:
                 subcat_display_to_folder[subcat] = norm_available[norm_subcat]
 
@@ -164,8 +156,8 @@ with st.sidebar:
     folder_path = os.path.join(base_path, folder_name)
 
 # ---------- UNIT CONVERSION PICKER ----------
-unit = unit_lookup.get(selected_type, {}).get(category, "")
-conversion_options = unit_conversion_map.get(unit, {})
+unit = category_unit(selected_type, category)
+conversion_options = UNIT_CONVERSIONS.get(unit, {})
 conversion_multiplier = 1.0
 if conversion_options:
     chosen_unit = st.sidebar.selectbox("Convert Unit", ["Original"] + list(conversion_options.keys()))
@@ -175,11 +167,17 @@ if conversion_options:
 # ---------- SAFE READ ----------
 def safe_read(filename):
     full_path = os.path.join(folder_path, filename)
-    return pd.read_csv(full_path) if os.path.exists(full_path) else None
+    return compact_frame(pd.read_csv(full_path), filename[:-len(".csv")]) if os.path.exists(full_path) else None
 
 historical_df = safe_read("historical_data.csv")
 forecast_df = safe_read("forecast_data.csv")
 wg_df = safe_read("wg_report.csv")
+if folder_key in rolled_up_folders:
+    historical_df, forecast_df = rollup_frames(rollups, selected_type, folder_key)
+    st.caption(f"{category} {selected_type} is summed from {', '.join(c.title() for c in leaves(folder_key))}.")
+elif folder_key in derived_folders:
+    historical_df, forecast_df = metric_frames(metric_panel, selected_type, folder_key)
+    st.caption(f"{category} {selected_type} is derived from its Production and Area (Yield = Production / Area).")
 
 # ---------- Apply conversion ----------
 if historical_df is not None:
@@ -191,9 +189,18 @@ if forecast_df is not None:
 if wg_df is not None and not wg_df.empty:
     wg_df["Value"] *= conversion_multiplier
 
+# ---------- MAP COLOR CLASSES ----------
+# Breaks per dataset/metric across all years, precomputed once, so every year's map shares one legend
+@st.cache_data
+def load_class_catalog():
+    return build_class_catalog()
+
+class_catalog = load_class_catalog()
+
 # ---------- WORLD MAP ----------
 with st.sidebar:    
     st.markdown("### 🌍 World View Map")
+    color_scheme = st.radio("Map Color Classes", SCHEMES, horizontal=True)
     base_world_path = os.path.join("world data", selected_type)
     file_list = glob.glob(os.path.join(base_world_path, "*.csv"))
     available_categories = {
@@ -212,150 +219,155 @@ with st.sidebar:
     if available_categories:
         selected_world_category = st.selectbox("World Map Category", list(available_categories.keys()))
         selected_file = available_categories[selected_world_category]
+        world_color = st.radio("Color World Map By", ["Value", "World rank"], horizontal=True)
 
 # ---------- MAIN WORLD RENDER ----------
+@st.cache_data
+def load_country_growth():
+    return build_country_growth()
+
 
 if selected_file:
-    df_world = pd.read_csv(selected_file)
+    df_world = read_world_csv(selected_file)
     st.markdown("---")
     st.subheader(f"🌐 {selected_world_category} {selected_type} Over Time")
-    show_world_timelapse_map(df_world, metric_title=f"{selected_world_category} {selected_type}")
+    if world_color == "World rank":
+        # Ranks come precomputed for every year from the world_ranks table
+        show_world_timelapse_map(world_ranks(selected_type, world_category(selected_file)),
+                                 metric_title=f"{selected_world_category} {selected_type}", color="Rank")
+    else:
+        world_breaks = class_catalog.get(("world", f"{selected_type}/{world_category(selected_file)}", color_scheme))
+        show_world_timelapse_map(df_world, metric_title=f"{selected_world_category} {selected_type}", breaks=world_breaks)
+    with st.expander("🏅 Top 10 countries (latest year)"):
+        st.dataframe(top_countries(selected_type, world_category(selected_file), n=10), hide_index=True)
+
+    # ---------- WHERE DOES INDIA STAND ----------
+    st.markdown(f"#### 🇮🇳 Where does India stand? (world rank in {selected_type})")
+    standing = country_standing("India", selected_type)
+    if standing.empty:
+        st.info(f"India has no {selected_type} rows in the world data.")
+    else:
+        fig_standing = px.line(
+            standing, x="Year", y="Rank", color="Category", markers=True,
+            hover_data={"Countries": True, "Percentile": ":.1%", "Share": ":.1%"},
+            labels={"Rank": "World rank (1 = largest)"}
+        )
+        fig_standing.update_yaxes(autorange="reversed")
+        fig_standing.update_layout(margin={"r": 0, "t": 20, "l": 0, "b": 0})
+        plotly_chart(fig_standing, "india_standing", use_container_width=True)
+
+    # ---------- COUNTRY DECADE GROWTH ----------
+    # Decade trend growth of every country in every world table, fitted in one batched pass
+    st.markdown(f"#### 📈 Decade-wise Trend Growth by Country ({selected_world_category} {selected_type})")
+    country_growth = load_country_growth()
+    world_key = world_category(selected_file)
+    decades = growth_decades(country_growth, selected_type, world_key)
+    if decades:
+        st.plotly_chart(build_growth_choropleth(country_growth, selected_type, world_key), use_container_width=True)
+        growth_decade = st.select_slider("Decade", decades, value=decades[-1])
+        st.markdown(f"**Fastest-growing {'countries' if selected_type == 'Yield' else 'producers'} in {growth_decade}**")
+        st.dataframe(fastest_growing(country_growth, selected_type, world_key, growth_decade), hide_index=True)
+
+    with st.expander("📐 CAGR between any two years (by country)"):
+        countries = sorted(df_world["Country"].dropna().unique())
+        cagr_country = st.selectbox("Country", countries, index=countries.index("India") if "India" in countries else 0)
+        cagr_years, cagr_values = world_cagr(selected_type, world_key, cagr_country)
+        if len(cagr_years) > 1:
+            st.plotly_chart(build_cagr_heatmap(cagr_years, cagr_values, f"{cagr_country} – {selected_world_category} {selected_type}"), use_container_width=True)
 elif selected_type:  # Only warn if type was selected but no files
     st.warning("No data files found for selected type.")
 
 # ---------- FORECAST TIMELINE ----------
 st.markdown("---")
 st.subheader("📊 Future Projections for top 3 Models")
+
+# Accuracy index over every model_rmse.csv, built once per process
+@st.cache_data
+def load_accuracy_index():
+    return build_accuracy_index()
+
+# ---------- BACKGROUND JOBS ----------
+# Long computations run on a job queue shared by every session; pages poll it instead of blocking
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
+
+@st.fragment(run_every=1.0)
+def show_job_progress(job_id, label):
+    job = get_job_queue().status(job_id)
+    if job["status"] in (DONE, FAILED):
+        st.rerun()  # full rerun so the finished result renders in place
+    st.progress(job["progress"] or 0.0, text=f"{label}: {job['message'] or job['status']}")
+
+# Result of a background job, or None while it is still running (a progress bar is shown instead)
+def job_result(kind, fn, *args, key, label):
+    jobs = get_job_queue()
+    job_id = jobs.submit(kind, fn, *args, key=key)
+    job = jobs.status(job_id)
+    if job["status"] == DONE:
+        return jobs.result(job_id)
+    if job["status"] == FAILED:
+        st.error(f"{label} failed: {job['error'].splitlines()[0]}")
+        return None
+    show_job_progress(job_id, label)
+    return None
+
+accuracy_index = load_accuracy_index()
+show_ensemble = st.sidebar.checkbox("Show RMSE-weighted ensemble", value=False)
+show_fan_chart = st.sidebar.checkbox("Show Monte Carlo fan chart", value=False)
+
+# Simulated paths for every category are precomputed in a process pool (as a background job) and cached on disk
+scenario = None
+if show_fan_chart:
+    scenario_results = job_result("scenarios", load_scenarios, key="scenarios", label="Simulating scenarios")
+    if scenario_results is not None:
+        scenario = scenario_results.get((selected_type, folder_key))
+
 if historical_df is not None and forecast_df is not None:
-    # Prepare historical data
-    historical_df = historical_df.rename(columns={"Total": "Value"})
-    historical_df["Model"] = "Historical"
-
-    # Prepare forecast data
-    forecast_long_df = forecast_df.melt(id_vars="Year", var_name="Model", value_name="Value")
-
-    # Combine all data
-    combined_df = pd.concat([historical_df, forecast_long_df], ignore_index=True)
-    combined_df = combined_df.sort_values(by=["Model", "Year"])
-
-    # --- (KEY CHANGE) Define all models and animation years upfront ---
-    all_model_names = ["Historical"] + forecast_df.columns[1:].tolist()
-    all_animation_years = sorted(combined_df["Year"].unique())
-
-    # --- Build the frames with placeholder data to ensure continuity ---
-    timeline_frames = []
-    for year in all_animation_years:
-        # Get all data up to the current animation year
-        frame_data = combined_df[combined_df["Year"] <= year].copy()
-        frame_data["FrameYear"] = year
-
-        # --- (KEY CHANGE) The robust fix:
-        # Ensure a row exists for every model in this frame. If a model has no data yet,
-        # add a placeholder with a null value so Plotly knows it exists.
-        present_models = frame_data["Model"].unique()
-        missing_models = set(all_model_names) - set(present_models)
-
-        if missing_models:
-            placeholders = []
-            for model in missing_models:
-                # Use the first historical year as a non-plotting anchor
-                placeholders.append({
-                    "Year": historical_df["Year"].min(),
-                    "Model": model,
-                    "Value": np.nan, # Use np.nan for a gap in the line
-                    "FrameYear": year
-                })
-            frame_data = pd.concat([frame_data, pd.DataFrame(placeholders)], ignore_index=True)
-
-        timeline_frames.append(frame_data)
-
-    timeline_df = pd.concat(timeline_frames, ignore_index=True)
-
-    # --- AXIS BOUNDS ---
-    full_data_range = pd.concat([
-        combined_df["Value"],
-        wg_df["Value"] if wg_df is not None and not wg_df.empty else pd.Series(dtype='float64')
-    ])
-    y_min = full_data_range.min() * 0.95
-    y_max = full_data_range.max() * 1.05
-    x_min = historical_df["Year"].min()
-    x_max = max(forecast_df["Year"].max(), 2047) if not forecast_df.empty else 2047
-
-    # --- PLOT THE ANIMATED LINE CHART ---
-    # The category_orders is still good practice to control the legend order.
-    fig_timeline = px.line(
-        timeline_df,
-        x="Year",
-        y="Value",
-        color="Model",
-        animation_frame="FrameYear",
-        animation_group="Model",
-        title=f"📊 Historical Data and Future Projections ({unit})",
-        markers=True,
-        range_y=[y_min, y_max],
-        range_x=[x_min, x_max],
-        category_orders={"Model": all_model_names}
-    )
+    # Plot the 3 lowest-RMSE models that have projections (all columns if no RMSE file)
+    plotted_models = top_models(accuracy_index, selected_type, folder_key, n=3, available=forecast_df.columns[1:])
+    if plotted_models:
+        forecast_df = forecast_df[["Year"] + plotted_models]
+        if show_ensemble and len(plotted_models) > 1:
+            weights = ensemble_weights(accuracy_index, selected_type, folder_key, plotted_models)
+            forecast_df[ENSEMBLE_NAME] = ensemble_forecast(forecast_df, weights)
+
+    fig_timeline = build_forecast_timeline_figure(historical_df, forecast_df, wg_df, unit, scenario, conversion_multiplier)
+    st.plotly_chart(fig_timeline, use_container_width=True)
 
-    # --- ADD THE STATIC WG REPORT POINTS ---
-    if wg_df is not None and not wg_df.empty:
-        fig_timeline.add_trace(go.Scatter(
-            x=wg_df["Year"],
-            y=wg_df["Value"],
-            mode="markers+text",
-            name="WG Report",
-            marker=dict(color="red", size=12, symbol="diamond"),
-            text=wg_df["Scenario"],
-            textposition="top right",
-            showlegend=True
-        ))
-
-    # --- CUSTOMIZE LAYOUT AND AESTHETICS ---
-    fig_timeline.update_layout(
-        updatemenus=[{
-            "type": "buttons",
-            "buttons": [{
-                "label": "Play",
-                "method": "animate",
-                "args": [None, {
-                    "frame": {"duration": 10, "redraw": True},  # Lower = faster (ms)
-                    "fromcurrent": True,
-                    "transition": {"duration": 1, "easing": "linear"}
-                }]
-            }, {
-                "label": "Pause",
-                "method": "animate",
-                "args": [[None], {
-                    "mode": "immediate",
-                    "frame": {"duration": 0},
-                    "transition": {"duration": 0}
-                }]
-            }]
-        }]
-    )    
-
-    fig_timeline.update_layout(
-        yaxis_title=f"Value ({unit})",
-        xaxis_title="Year",
-        legend_title="Model/Scenario",
-        font=dict(family="Poppins, sans-serif", size=12),
-        title_font_size=22,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
+with st.expander("🏆 Model accuracy (RMSE)"):
+    st.markdown(f"**{category}** – all fitted models")
+    st.dataframe(category_accuracy(accuracy_index, selected_type, folder_key).drop(columns=["Type", "Category"]), hide_index=True)
+    st.markdown(f"**Best model per {selected_type} category**")
+    st.dataframe(best_model_table(accuracy_index, selected_type), hide_index=True)
 
-    fig_timeline.update_layout({
-        'sliders': [{'currentvalue': {'prefix': 'Year: '},'pad': {'t': 20}}]
-    })
+with st.expander("🧮 Category rollup checks (shipped aggregates vs sum of children)"):
+    summary = check_summary(rollup_checks, selected_type)
+    if summary.empty:
+        st.caption(f"No {selected_type} aggregate has both a shipped file and all of its children.")
+    else:
+        st.caption("Scale is the power of ten between the shipped file's unit and its children's.")
+        st.dataframe(summary, hide_index=True)
+        flagged = rollup_checks[(rollup_checks["Type"] == selected_type) & rollup_checks["Flagged"]]
+        st.markdown(f"**Flagged years** ({len(flagged)})")
+        st.dataframe(flagged.drop(columns=["Type", "Flagged"]), hide_index=True)
 
-    st.plotly_chart(fig_timeline, use_container_width=True)
+with st.expander("➗ Derived metrics (history years shipped vs derived from the other two)"):
+    st.dataframe(derivation_summary(metric_panel), hide_index=True)
 
 # ---------- LOGEST GROWTH ----------
 st.markdown("---")
 st.subheader("📈 Decade-wise Trend Growth Rate")
 csv_path = os.path.join(folder_path, "historical_data.csv")
 if os.path.exists(csv_path):
-    fig = plot_logest_growth_from_csv(csv_path, category, conversion_multiplier)
-    st.pyplot(fig)
+    growth_col, cagr_col = st.columns(2)
+    with growth_col:
+        fig = plot_logest_growth_from_csv(csv_path, category, conversion_multiplier)
+        st.plotly_chart(fig, use_container_width=True)
+    with cagr_col:
+        # Growth between any two years; the start × end matrix is cached per series
+        cagr_years, cagr_values = india_cagr(csv_path)
+        st.plotly_chart(build_cagr_heatmap(cagr_years, cagr_values, f"CAGR between any two years – {category}"), use_container_width=True)
 
 
 # ---------- INDIA PULSES CHOROPLETH MAP ----------
@@ -365,118 +377,81 @@ st.subheader("🇮🇳 India Pulses Choropleth Map Over Time")
 with st.sidebar:
     st.markdown("---")
     st.markdown("### 🌱 Pulses Map Settings")
-    season = st.selectbox("Select Season", ["Kharif", "Rabi", "Total"])
-
-    pulse_sheets = ["Gram", "Urad", "Moong", "Masoor", "Moth", "Kulthi", "Khesari", "Peas", "Arhar"]
-    pulse_type = st.selectbox("Select Pulse Type", pulse_sheets)
-
-    metric = st.selectbox("Select Metric", ["Area", "Production", "Yield"])
-
-try:
-    
-    df = pd.read_excel(
-        "Data/Pulses_Data.xlsx",
-        sheet_name=pulse_type,
-        header=1  # Header is in second row (row 2 in Excel)
-    )
-
-    # Remove any extra spaces in column names (important!!)
-    df.columns = df.columns.str.strip()
-
-    # Rename "States/UTs" → "State"
-    df = df.rename(columns={"States/UTs": "State"})
-
-    # Filter season-wise
-    df = df[df["Season"].str.lower() == season.lower()]
-
-    # Coerce numeric
-    df["Year"] = df["Year"].astype(str)
-    df[metric] = pd.to_numeric(df[metric], errors="coerce")
-    df = df.dropna(subset=[metric])
-
-    df["State"] = df["State"].str.strip()
-    df["State"] = df["State"].replace({
-        "Orissa": "Odisha",
-        "Jammu & Kashmir": "Jammu and Kashmir",
-        "Chhattisgarh": "Chhattishgarh",
-        "Telangana": "Telengana",
-        "Tamil Nadu": "Tamilnadu",
-        "Kerela": "Kerala",
-        "Andaman & Nicobar Islands": "Andaman & Nicobar"
-    
-    })
-
-    selected_year = st.sidebar.selectbox("Select Year", sorted(df["Year"].unique()))
-
-    df_selected_year = df[df["Year"] == selected_year]
-
-    # Load shapefile
-    gdf = gpd.read_file("India_Shapefile/india_st.shp")
-
-    # Clean columns → very important!
-    df_selected_year["State"] = df_selected_year["State"].str.strip().str.upper()
-    gdf["State_Name"] = gdf["State_Name"].str.strip().str.upper()
-
-    # Optional → map common name mismatches
-    df_selected_year["State"] = df_selected_year["State"].replace({
-        "Orissa": "Odisha",
-        "Jammu & Kashmir": "Jammu and Kashmir",
-        "Chhattisgarh": "Chhattishgarh",
-        "Telangana": "Telengana",
-        "Tamil Nadu": "Tamilnadu",
-        "Kerela": "Kerala",
-        "Andaman & Nicobar Islands": "Andaman & Nicobar"
-        
-    })
-
-    # Merge Shapefile with selected year df
-    merged = gdf.merge(df_selected_year, left_on="State_Name", right_on="State", how="left")
-
-    # Plot India map
-    fig, ax = plt.subplots(1, 1, figsize=(10, 12))
-    merged.plot(
-        column=metric,
-        ax=ax,
-        legend=True,
-        cmap='YlOrRd',
-        edgecolor='black',
-        missing_kwds={"color": "white", "edgecolor": "black"}
-    )
+    season = st.selectbox("Select Season", PULSE_SEASONS)
+    pulse_type = st.selectbox("Select Pulse Type", PULSE_SHEETS)
+    metric = st.selectbox("Select Metric", PULSE_METRICS)
+    map_renderer = st.radio("Map Renderer", ["Static image", "Vector tiles"], horizontal=True)
+
+# Tiles are cut into .cache/india.mbtiles (again whenever the shapefiles change) and served next to
+# the app; TILE_SERVER_PORT pins the port (e.g. behind TILE_PUBLIC_URL), otherwise a free one is used
+@st.cache_resource
+def tile_server_url():
+    ensure_mbtiles()
+    public_url = os.environ.get("TILE_PUBLIC_URL")
+    local_url = start_tile_server(port=int(os.environ.get("TILE_SERVER_PORT", 0)))
+    return public_url or local_url
+
+def report_unmatched_states(source, unmatched):
+    if unmatched:
+        st.warning(f"State names in {source} not found in the state registry: {', '.join(unmatched)}")
+
+_, unmatched_pulse_states = load_pulses_sheet(pulse_type)
+report_unmatched_states(f"Pulses_Data.xlsx [{pulse_type}]", unmatched_pulse_states)
+
+# Every (pulse, season, metric) is a State_ID × year slice of the pulses cube; the year and its rows
+# don't depend on the shapefile, so a map failure below can't leave them undefined
+pulses_cube = load_pulses_cube()
+selected_year = st.sidebar.selectbox("Select Year", pulses_cube.labels_with_data(pulse_type, season, metric))
+
+# Some pulses are not grown in every season (e.g. Gram has no Kharif rows); the year-based views are skipped
+if selected_year is None:
+    df_selected_year = None
+    st.info(f"Pulses_Data.xlsx has no {season} {metric.lower()} figures for {pulse_type}; pick another season or pulse.")
+else:
+    df_selected_year = pulses_cube.year_frame(pulse_type, season, metric, selected_year)
+    pulse_breaks = class_catalog.get(("pulses", f"{pulse_type}/{season}/{metric}", color_scheme))
+    if df_selected_year["Derived"].any():
+        st.caption(f"{df_selected_year['Derived'].sum()} of {len(df_selected_year)} values are derived at ingest "
+                   "(Total = Kharif + Rabi, India = sum of states, Yield = Production / Area).")
+
+    try:
+        _, unmatched_shape_states = load_india_states_shapefile()
+        report_unmatched_states("india_st.shp", unmatched_shape_states)
+
+        if map_renderer == "Vector tiles":
+            # Browser loads only the tiles in view; values are joined on State_ID client-side
+            state_values = df_selected_year.set_index("State_ID")[metric]
+            components.html(
+                tile_map_html(
+                    tile_server_url(), "states", state_values.to_dict(),
+                    (state_values.min(), state_values.max()) if not state_values.empty else (0, 1),
+                    title=f"{pulse_type} - {season} - {metric} in {selected_year}",
+                    breaks=pulse_breaks,
+                    colors=class_colors(len(pulse_breaks) - 1) if pulse_breaks is not None else ("#ffffb2", "#bd0026")
+                ),
+                height=620
+            )
+        else:
+            # Rendered PNG is cached on disk per (pulse, season, metric, year)
+            st.image(render_pulses_map_png(pulse_type, season, metric, selected_year, pulse_breaks))
 
-    plt.title(f"{pulse_type} - {season} - {metric} in {selected_year}")
-    st.pyplot(fig)
+    except Exception as e:
+        st.error(f"An error occurred: {e}")
 
-except Exception as e:
-    st.error(f"An error occurred: {e}")
+with st.expander("🧮 Pulses cross-check (nine sheets vs national pulses production)"):
+    crosscheck = pulses_crosscheck(load_pulses_cube())
+    st.caption("All-India Total production summed over the nine sheets against Data/Production/prod_pulses. "
+               "The sheets cover the major pulses only, so coverage below 100% is expected; years above it are flagged.")
+    st.dataframe(crosscheck, hide_index=True)
+    conflicts = pulses_yield_conflicts(load_pulses_cube())
+    st.markdown(f"**Shipped yields off Production / Area by more than 1%** ({len(conflicts)}; the shipped value is shown)")
+    st.dataframe(conflicts, hide_index=True)
 
 
 # ---------- STATE MAP VIEW ----------
 
-# Load full India District shapefile (load once → top of file / cache)
-@st.cache_data
-def load_india_districts_shapefile():
-    gdf = gpd.read_file("India_Shapefile/State/2011_Dist.shp")
-    gdf = gdf.set_crs(epsg=4326, inplace=False)
-    return gdf
-
-STATE_NAME_CORRECTIONS = {
-    "Orissa": "Odisha",
-    "Jammu & Kashmir": "Jammu and Kashmir",
-    "Chhattisgarh": "Chhattishgarh",
-    "Telangana": "Telengana",
-    "Tamil Nadu": "Tamilnadu",
-    "Kerela": "Kerala",
-    "Andaman & Nicobar Islands": "Andaman & Nicobar",
-    "Arunachal Pradesh": "Arunanchal Pradesh",
-    "Dadra & Nagar Haveli": "Dadara & Nagar Havelli",
-    "India": None,  # Special handling → we don't want user to select "India" in district map!
-    "Delhi": "NCT of Delhi"
-}
-
-
-gdf_districts = load_india_districts_shapefile()
-gdf_districts["ST_NM"] = gdf_districts["ST_NM"].replace(STATE_NAME_CORRECTIONS)
-gdf_districts["ST_NM"] = gdf_districts["ST_NM"].str.strip().str.upper()
+gdf_districts, unmatched_district_states = load_india_districts_shapefile()
+report_unmatched_states("2011_Dist.shp", unmatched_district_states)
 
 # Sidebar: State Map View
 st.sidebar.markdown("---")
@@ -484,56 +459,36 @@ st.sidebar.markdown("### 🗺️ State Map View")
 
 # Dynamic State Map View dropdown
 
-# Extract available states in current df_selected_year
-available_states = df_selected_year["State"].str.upper().unique().tolist()
+# Extract available states in current df_selected_year ("India" has no district map)
+available_states = [] if df_selected_year is None else \
+    df_selected_year.loc[df_selected_year["State_ID"] != INDIA_ID, "State"].dropna().unique().tolist()
 
 # Dropdown options → dynamic + "None" on top
 state_options = ["None"] + sorted(available_states)
 
 selected_state_map = st.sidebar.selectbox("Select State for State Map", state_options)
-
-# Auto detect STATE column
-state_col = None
-for col in gdf_districts.columns:
-    if "STATE" in col.upper() or "ST_NM" in col.upper():
-        state_col = col
-        break
+selected_state_id = STATE_IDS.get(selected_state_map, -1)
 
 # Auto detect DISTRICT column
-district_col = None
-for col in gdf_districts.columns:
-    if "DISTRICT" in col.upper() or "DIST_NAME" in col.upper() or "DIST_NM" in col.upper():
-        district_col = col
-        break
-
-# Debug: show all unique state names from district shapefile
-#st.write("States in shapefile (after replacement and uppercasing):")
-#st.write(sorted(gdf_districts[state_col].unique().tolist()))
-
-#st.write("States in Pulses DataFrame (df_selected_year):")
-#st.write(sorted(df_selected_year["State"].str.upper().unique().tolist()))
+district_col = detect_district_column(gdf_districts)
 
 
 # Proceed only if valid state selected
 if selected_state_map != "None":
 
     # Safety check
-    if state_col is None or district_col is None:
-        st.error("Could not detect STATE or DISTRICT column in shapefile!")
+    if district_col is None:
+        st.error("Could not detect DISTRICT column in shapefile!")
     else:
-        # Normalize function: remove spaces, convert to upper
-        def normalize_state_name(s):
-            return s.upper().replace(" ", "")
-
-        # Filter for selected state safely
-        state_gdf = gdf_districts[gdf_districts[state_col].apply(normalize_state_name) == normalize_state_name(selected_state_map)]
+        # Filter for selected state
+        state_gdf = gdf_districts[gdf_districts["State_ID"] == selected_state_id]
 
 
         # Optional: explode in case MultiPolygon present
         state_gdf = state_gdf.explode(index_parts=False)
 
         # Prepare df_selected_year → selected state row
-        state_row = df_selected_year[df_selected_year["State"].str.upper() == selected_state_map.upper()]
+        state_row = df_selected_year[df_selected_year["State_ID"] == selected_state_id]
 
         if state_row.empty:
             st.warning(f"No data available for {selected_state_map} for {season} - {pulse_type} - {metric} in selected year.")
@@ -583,9 +538,8 @@ if selected_state_map != "None":
 
                 #
                 # Filter the main dataframe for the selected state across ALL available years
-                state_historical_df = df[df["State"].str.upper() == selected_state_map.upper()].copy()
-                state_historical_df['Year'] = pd.to_numeric(state_historical_df['Year'].astype(str).str.split('-').str[0]) # <--- USE THIS NEW LINE
-                state_historical_df = state_historical_df.sort_values("Year")
+                state_historical_df = pulses_cube.state_series(pulse_type, season, metric, selected_state_id)
+                state_historical_df["State"] = selected_state_map
                 #
 
                 # Define units for the pulse metrics for clearer axis labels
@@ -600,6 +554,8 @@ if selected_state_map != "None":
                 if not state_historical_df.empty and state_historical_df[metric].notna().any():
                     
                     # --- Prepare data for animation ---
+                    # Long series are LTTB-downsampled first (and drawn with WebGL)
+                    state_historical_df = downsample(state_historical_df, "Year", metric)
                     # This creates a cumulative dataset for each year, which is necessary for the animation.
                     all_years = sorted(state_historical_df["Year"].unique())
                     animation_frames = []
@@ -626,6 +582,7 @@ if selected_state_map != "None":
                         animation_group="State",       # Ensures the line is continuous
                         title=f"Animated Trend of {metric} for {pulse_type} ({season}) in {selected_state_map}",
                         markers=True,
+                        render_mode=render_mode(state_historical_df),
                         labels={"Year": "Year", metric: y_axis_title, "FrameYear": "Year"},
                         range_y=[y_min_state, y_max_state],
                         range_x=[x_min_state, x_max_state]
@@ -672,7 +629,7 @@ if selected_state_map != "None":
                         'sliders': [{'currentvalue': {'prefix': 'Year: '}, 'pad': {'t': 20}}]
                     })
 
-                    st.plotly_chart(fig_state_trend, use_container_width=True)
+                    plotly_chart(fig_state_trend, "state_trend", use_container_width=True)
                 else:
                     st.warning(f"No historical data with values for '{metric}' is available to plot a trend for {selected_state_map}.")
 
@@ -684,81 +641,76 @@ if selected_state_map != "None":
 st.markdown("---")
 st.subheader("🇮🇳 Full India District Map View (Fabricated Values)")
 
-# Auto detect STATE and DISTRICT columns
-state_col = None
-district_col = None
-for col in gdf_districts.columns:
-    if "STATE" in col.upper() or "ST_NM" in col.upper():
-        state_col = col
-    if "DISTRICT" in col.upper() or "DIST_NAME" in col.upper() or "DIST_NM" in col.upper():
-        district_col = col
-
 # Check
-if state_col is None or district_col is None:
-    st.error("Could not detect STATE or DISTRICT column in shapefile!")
+if district_col is None:
+    st.error("Could not detect DISTRICT column in shapefile!")
+elif selected_year is None:
+    st.info(f"No {season} {metric.lower()} year to fabricate district values for {pulse_type}.")
 else:
-    # Prepare a copy of gdf_districts to avoid inplace modification
-    gdf_districts_full = gdf_districts.copy()
-
-    # Prepare Dummy_Value column
-    gdf_districts_full["Dummy_Value"] = 0.0
-
-    # Process each state in df_selected_year
-    for state_name in df_selected_year["State"].unique():
-        state_name_upper = state_name.strip().upper()
+    # Fabricated allocation + render runs in the background, cached on disk per (pulse, season, metric, year)
+    district_png = job_result(
+        "district_map", render_full_district_map_png, pulse_type, season, metric, selected_year,
+        key=f"district_map:{pulse_type}:{season}:{metric}:{selected_year}", label="Rendering district map"
+    )
+    if district_png is not None:
+        st.image(district_png)
 
-        # Match in shapefile with normalization
-        def normalize_state_name(s):
-            return s.upper().replace(" ", "")
+# ---------- PARLIAMENTARY CONSTITUENCY VIEW ----------
+st.markdown("---")
+st.subheader("🏛️ Parliamentary Constituency View (Area-weighted from State Values)")
+
+# District ↔ constituency overlay is cached on disk; this only rebuilds the sparse weights
+@st.cache_resource
+def load_constituency_layer(how):
+    constituencies = load_constituencies()
+    districts = load_districts()
+    overlap, district_area, _ = load_overlap(districts, constituencies)
+    weights = state_weights(overlap, district_area, districts["State_ID"].to_numpy(), how=how)
+    geojson = constituencies[["PC_ID", "PC_NAME", "geometry"]].to_crs(epsg=4326).__geo_interface__
+    return constituencies.drop(columns="geometry"), weights, geojson
 
-        mask = gdf_districts_full[state_col].apply(normalize_state_name) == normalize_state_name(state_name_upper)
-        state_gdf = gdf_districts_full[mask]
+try:
+    # Yield is intensive → area-weighted mean; Area/Production are split by area share
+    pc_how = "mean" if metric == "Yield" else "sum"
+    constituencies, pc_weights, pc_geojson = load_constituency_layer(pc_how)
 
-        # If no matching districts → skip
-        if state_gdf.empty:
-            continue
+    # Every year is re-aggregated with one sparse multiply of the cube slice
+    pc_df = state_matrix_to_constituencies(pulses_cube.slice(pulse_type, season, metric), pulses_cube.year_labels, metric,
+                                           pc_weights, constituencies, how=pc_how)
+    pc_df = pc_df.dropna(subset=[metric]).sort_values("Year")
 
-        # Get state total value from df_selected_year
-        state_row = df_selected_year[df_selected_year["State"].str.upper() == state_name_upper]
-        if state_row.empty:
-            continue
-
-        state_total_value = state_row[metric].values[0]
-
-        # Fabricate values across districts
-        districts = state_gdf[district_col].unique().tolist()
-        n_districts = len(districts)
-
-        proportions = np.random.dirichlet(np.ones(n_districts))
-        dummy_values = proportions * state_total_value
-
-        # Assign fabricated values to Dummy_Value column
-        for i, district_name in enumerate(districts):
-            gdf_districts_full.loc[
-                (mask) & (gdf_districts_full[district_col] == district_name),
-                "Dummy_Value"
-            ] = dummy_values[i]
-
-    # Plot the full India district map
-    fig_full, ax_full = plt.subplots(1, 1, figsize=(12, 14))
-    gdf_districts_full.plot(
-        column="Dummy_Value",
-        ax=ax_full,
-        legend=True,
-        cmap='YlOrRd',
-        edgecolor='black',
-        missing_kwds={"color": "white", "edgecolor": "black"}
-    )
-    ax_full.set_title(f"Full India District Map - {metric} ({season}, {pulse_type}, {selected_year})", fontsize=16)
+    if pc_df.empty:
+        st.warning(f"No constituency overlaps state data for {pulse_type} ({season}).")
+    else:
+        # Constituency values are re-aggregated here, so their classes span all years of this view
+        pc_breaks = classify(pc_df[metric], color_scheme)
+        pc_scale, pc_range, pc_colorbar = plotly_class_scale(pc_breaks)
+        fig_pc = px.choropleth(
+            pc_df.assign(Class=class_index(pc_df[metric], pc_breaks)),
+            geojson=pc_geojson,
+            locations="PC_ID",
+            featureidkey="properties.PC_ID",
+            color="Class",
+            hover_name="PC_NAME",
+            hover_data=[metric],
+            animation_frame="Year",
+            color_continuous_scale=pc_scale,
+            range_color=pc_range,
+            title=f"{pulse_type} - {season} - {metric} by Parliamentary Constituency"
+        )
+        fig_pc.update_geos(fitbounds="locations", visible=False)
+        fig_pc.update_layout(margin={"r": 0, "t": 40, "l": 0, "b": 0}, coloraxis_colorbar=dict(title=metric, **pc_colorbar))
+        plotly_chart(fig_pc, "constituency_choropleth", use_container_width=True)
 
-    st.pyplot(fig_full)
+except Exception as e:
+    st.error(f"Could not build constituency view: {e}")
 
 # ---------- DISTRICT-WISE LINE PLOT (Random Historical Data) ----------
 # ---------- DISTRICT-WISE ANIMATED HISTORICAL PLOT (RANDOM VALUES) ----------
 st.markdown("---")
 st.subheader("📽️ Animated District-wise Trend (Simulated Data)")
 
-all_districts = sorted(gdf_districts_full[district_col].dropna().unique().tolist())
+all_districts = sorted(gdf_districts[district_col].dropna().unique().tolist())
 
 # Sidebar dropdown to select a district
 selected_district = st.sidebar.selectbox("🎯 Select a District for Trend Animation", all_districts)
@@ -774,9 +726,11 @@ district_trend_df = pd.DataFrame({
     "District": selected_district
 })
 
+district_trend_df = downsample(district_trend_df, "Year", "Value")
+
 # Prepare cumulative animation frames
 animation_frames = []
-for year in years:
+for year in district_trend_df["Year"]:
     frame_df = district_trend_df[district_trend_df["Year"] <= year].copy()
     frame_df["FrameYear"] = year
     animation_frames.append(frame_df)
@@ -796,6 +750,7 @@ fig_district_trend = px.line(
     animation_group="District",
     title=f"Animated Trend for {selected_district} (Simulated, 2000–2023)",
     markers=True,
+    render_mode=render_mode(district_trend_df),
     labels={"Year": "Year", "Value": "Simulated Value", "FrameYear": "Year"},
     range_y=[y_min, y_max],
     range_x=[years.min(), years.max()]
@@ -839,12 +794,40 @@ fig_district_trend.update_layout(
     }]
 )
 
-st.plotly_chart(fig_district_trend, use_container_width=True)
-
-
-
-
-
-
-
+plotly_chart(fig_district_trend, "district_trend", use_container_width=True)
 
+# ---------- SQL EXPLORER ----------
+st.markdown("---")
+with st.expander("🧮 SQL Explorer (DuckDB over every dashboard dataset)"):
+    st.caption("Tables: history, forecasts, wg, pulses, world, world_countries, world_ranks. Read-only; one SELECT per run.")
+    st.dataframe(describe(), hide_index=True, height=200)
+    sql = st.text_area(
+        "Query",
+        "SELECT Country, sum(Value) AS Total\nFROM world\nWHERE Type = 'Production' AND Category = 'cereals' AND Year >= 2000\n"
+        "GROUP BY Country\nORDER BY Total DESC\nLIMIT 10",
+        height=160
+    )
+    if st.button("Run query"):
+        try:
+            result, elapsed = run_select(sql)
+            st.caption(f"{len(result)} rows in {elapsed * 1000:.1f} ms (capped at {MAX_EXPLORER_ROWS:,})")
+            st.dataframe(result, hide_index=True)
+        except Exception as e:
+            st.error(str(e))
+
+# ---------- CACHE DEBUG PANEL ----------
+with st.sidebar.expander("🛠️ Cache debug"):
+    st.json(cache_stats())
+    st.caption("Single-flight (coalesced concurrent requests)")
+    st.json(flight_stats())
+    st.caption("Plotly payload bytes (before → after optimization)")
+    st.json(payload_stats())
+    st.caption("Table memory at ingest (before → after compaction)")
+    st.dataframe(memory_report(), hide_index=True)
+    st.caption("Map color classes (precomputed breaks)")
+    st.dataframe(class_table(class_catalog), hide_index=True)
+    st.caption("Background job durations (seconds)")
+    st.dataframe(get_job_queue().duration_summary(), hide_index=True)
+    if st.button("Clear disk cache"):
+        clear_disk_cache()
+        st.rerun()
@@ -0,0 +1,71 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from cagr import build_cagr_heatmap, cagr_matrix
+
+SIZES = (25, 75, 150)
+REPEAT = 20
+
+
+def random_series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.arange(1950, 1950 + n), 1000 * np.exp(np.cumsum(rng.normal(0.02, 0.05, size=n)))
+
+
+# Reference: the hand calculation, one pair at a time
+def cagr_loop(years, values):
+    n = len(years)
+    matrix = np.full((n, n), np.nan)
+    for i in range(n):
+        for j in range(i + 1, n):
+            matrix[i, j] = ((values[j] / values[i]) ** (1 / (years[j] - years[i])) - 1) * 100
+    return matrix
+
+
+def best_ms(fn, *args, repeat=REPEAT):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(*args)
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+# Cost of computing (vectorized vs per-pair loop) and serving (heatmap build, JSON size) an n × n matrix
+def run(sizes=SIZES):
+    rows = []
+    years, values = random_series(5)
+    build_cagr_heatmap(years, cagr_matrix(years, values), "warm-up")  # warm up plotly's validators
+    for n in sizes:
+        years, values = random_series(n)
+        matrix = cagr_matrix(years, values)
+        assert np.allclose(matrix, cagr_loop(years, values), equal_nan=True)
+
+        started = time.perf_counter()
+        fig = build_cagr_heatmap(years, matrix, f"{n} × {n}")
+        built = time.perf_counter()
+        spec = pio.to_json(fig, validate=False)
+        serialized = time.perf_counter()
+        rows.append({
+            "Years": n, "Cells": n * (n - 1) // 2,
+            "Vectorized (ms)": best_ms(cagr_matrix, years, values),
+            "Loop (ms)": best_ms(cagr_loop, years, values, repeat=3),
+            "Heatmap build (ms)": (built - started) * 1000,
+            "Serialize (ms)": (serialized - built) * 1000,
+            "Payload (KB)": len(spec) / 1024,
+        })
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark computing and serving start × end CAGR matrices.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    args = parser.parse_args()
+    print(run(args.sizes).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
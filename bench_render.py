@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+from line_render import MAX_POINTS_PER_TRACE, downsample
+
+SIZES = (1_000, 10_000, 100_000)
+HTML_PATH = os.path.join(".cache", "render_benchmark.html")
+
+# Each case: (label, LTTB applied, px render_mode)
+CASES = [("SVG", False, "svg"), ("WebGL", False, "webgl"), ("LTTB + SVG", True, "svg"), ("LTTB + WebGL", True, "webgl")]
+
+
+def random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Year": np.arange(n), "Value": 1000 + np.cumsum(rng.normal(size=n))})
+
+
+def build(df, lttb, mode):
+    if lttb:
+        df = downsample(df, "Year", "Value", max_points=MAX_POINTS_PER_TRACE)
+    return px.line(df, x="Year", y="Value", markers=True, render_mode=mode)
+
+
+# Server-side cost of each case: figure build and JSON serialization time, payload size
+def run(sizes=SIZES):
+    rows, specs = [], []
+    build(random_walk(10), False, "svg")  # warm up plotly's validators so the first case isn't penalized
+    for n in sizes:
+        df = random_walk(n)
+        for label, lttb, mode in CASES:
+            started = time.perf_counter()
+            fig = build(df, lttb, mode)
+            built = time.perf_counter()
+            spec = pio.to_json(fig, validate=False)
+            serialized = time.perf_counter()
+            rows.append({
+                "Points": n, "Case": label, "Points drawn": len(fig.data[0].x),
+                "Build (ms)": (built - started) * 1000, "Serialize (ms)": (serialized - built) * 1000,
+                "Payload (KB)": len(spec) / 1024,
+            })
+            specs.append({"points": n, "case": label, "spec": json.loads(spec)})
+    return pd.DataFrame(rows), specs
+
+
+# Browser render time needs a browser: this page draws every case with Plotly.newPlot and
+# tabulates the time each call took (open it locally; plotly.js is inlined, no network needed)
+def write_html(specs, path=HTML_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Line render benchmark</title>
+<script>{get_plotlyjs()}</script></head>
+<body><h3>Plotly.newPlot time per case</h3><table id="results" border="1" cellpadding="4">
+<tr><th>Points</th><th>Case</th><th>Render (ms)</th></tr></table><div id="charts"></div>
+<script>
+const cases = {json.dumps(specs)};
+(async () => {{
+  for (const c of cases) {{
+    const div = document.createElement("div");
+    div.style.height = "300px";
+    document.getElementById("charts").appendChild(div);
+    const started = performance.now();
+    await Plotly.newPlot(div, c.spec.data, c.spec.layout);
+    const elapsed = performance.now() - started;
+    document.getElementById("results").insertAdjacentHTML("beforeend",
+      `<tr><td>${{c.points}}</td><td>${{c.case}}</td><td>${{elapsed.toFixed(1)}}</td></tr>`);
+  }}
+}})();
+</script></body></html>""")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SVG vs WebGL vs LTTB line charts.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--html", default=HTML_PATH, help="browser render-time page to write")
+    args = parser.parse_args()
+
+    results, specs = run(args.sizes)
+    print(results.round(1).to_string(index=False))
+    print(f"Browser render times: open {write_html(specs, args.html)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from catalog import WORLD_ROOT, iter_world_files
+from disk_cache import disk_cached
+from plotly_payload import optimize_figure
+from query_layer import query
+
+
+# ---------- CAGR MATRIX ----------
+# Compound annual growth (%) between every start year (rows) and later end year (columns) in one
+# broadcast over log values: (ln v_end − ln v_start) / (end − start). Cells with end ≤ start, or a
+# missing/non-positive value at either end, are NaN. CAGR is scale-free, so unit conversion doesn't matter.
+def cagr_matrix(years, values):
+    years = np.asarray(years, dtype=float)
+    values = np.asarray(values, dtype=float)
+    logs = np.log(np.where(values > 0, values, np.nan))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = (logs[None, :] - logs[:, None]) / (years[None, :] - years[:, None])
+    rate[np.tril_indices(len(years))] = np.nan
+    return (np.exp(rate) - 1) * 100
+
+
+# Matrices are cached per series: India series by CSV file, world series by (type, category, country)
+# and the world CSV that series is read from
+@disk_cached(depends_on=lambda csv_path: [csv_path])
+def india_cagr(csv_path):
+    df = pd.read_csv(csv_path)
+    df = df[df["Year"].astype(str).str.match(r"^\d{4}$")]
+    df = df.assign(Year=df["Year"].astype(int)).dropna(subset=["Total"]).sort_values("Year")
+    return df["Year"].to_numpy(), cagr_matrix(df["Year"], df["Total"])
+
+
+@disk_cached(depends_on=lambda data_type, category, country: [
+    path for t, c, path in iter_world_files(WORLD_ROOT) if (t, c) == (data_type, category)
+])
+def world_cagr(data_type, category, country):
+    df = query("SELECT Year, Value FROM world WHERE Type = $type AND Category = $category AND Country = $country "
+               "AND Value IS NOT NULL ORDER BY Year", {"type": data_type, "category": category, "country": country})
+    return df["Year"].to_numpy(), cagr_matrix(df["Year"], df["Value"])
+
+
+# ---------- HEATMAP ----------
+# Start × end heatmap on a diverging scale centred on 0 %, clipped at the 95th percentile so the
+# extreme rates of one- and two-year spans don't wash out the rest
+def build_cagr_heatmap(years, matrix, title):
+    finite = np.abs(matrix[np.isfinite(matrix)])
+    limit = float(np.percentile(finite, 95)) if finite.size else 1.0
+    fig = go.Figure(go.Heatmap(
+        x=years, y=years, z=matrix,
+        zmid=0, zmin=-limit, zmax=limit, colorscale="RdYlGn",
+        colorbar=dict(title="CAGR (%)"),
+        hovertemplate="%{y} → %{x}: %{z:.2f}% per year<extra></extra>"
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title="End year",
+        yaxis_title="Start year",
+        yaxis=dict(autorange="reversed"),
+        margin={"r": 40, "t": 60, "l": 40, "b": 40}
+    )
+    return optimize_figure(fig, "cagr_heatmap")
@@ -0,0 +1,109 @@
+import os
+
+# ---------- DATA LAYOUT ----------
+# Data/<Type>/<prefix><category>/{historical_data,forecast_data,model_rmse,wg_report}.csv
+DATA_ROOT = "Data"
+DATA_TYPES = ["Production", "Yield", "Area"]
+PREFIX_MAP = {"Production": "prod_", "Yield": "yield_", "Area": "area_"}
+
+
+def category_folder(data_type, category, root=DATA_ROOT):
+    return os.path.join(root, data_type, f"{PREFIX_MAP[data_type]}{category}")
+
+
+# Yields (data_type, category, folder_path) for every category folder on disk;
+# `category` is the folder name without its prefix, e.g. "coarse cereals".
+def iter_category_folders(root=DATA_ROOT, data_types=DATA_TYPES):
+    for data_type in data_types:
+        base_path = os.path.join(root, data_type)
+        if not os.path.isdir(base_path):
+            continue
+        prefix = PREFIX_MAP[data_type]
+        for name in sorted(os.listdir(base_path)):
+            folder = os.path.join(base_path, name)
+            if name.startswith(prefix) and os.path.isdir(folder):
+                yield data_type, name[len(prefix):], folder
+
+
+# ---------- WORLD DATA LAYOUT ----------
+# world data/<Type>/<prefix><category>_country.csv with Country, Year, Unit, Value
+WORLD_ROOT = "world data"
+
+
+def world_category(path):
+    name = os.path.basename(path)
+    for prefix in PREFIX_MAP.values():
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    return name.replace("_country.csv", "").replace("_", " ")
+
+
+def iter_world_files(root=WORLD_ROOT, data_types=DATA_TYPES):
+    for data_type in data_types:
+        base_path = os.path.join(root, data_type)
+        if not os.path.isdir(base_path):
+            continue
+        for name in sorted(os.listdir(base_path)):
+            if name.endswith("_country.csv"):
+                path = os.path.join(base_path, name)
+                yield data_type, world_category(path), path
+
+
+# ---------- CATEGORY HIERARCHY ----------
+# Sector → sub-sector → {group: category display names} as the sidebar offers them
+CATEGORY_HIERARCHY = {
+    "Agriculture": {
+        "Foodgrains": {
+            "Cereals": ["Rice", "Wheat", "Cereals"],
+            "Foodgrains": ["Foodgrains"],
+            "Coarse Cereals": ["Maize", "Coarse Cereals"],
+            "Pulses": ["Pulses"]
+        },
+        "Horticulture": {"Fruits": ["Fruits"], "Vegetables": ["Vegetables"]},
+        "Oilseeds": {"Oilseeds": ["Oilseeds"]},
+        "Commercial Crops": {"Sugar and Products": ["Sugar and Products"]}
+    },
+    "Allied Sectors": {
+        "Animal Products": {
+            "Eggs": ["Eggs"], "Milk": ["Milk"], "Meat": ["Meat"], "Marine and Inland Fish": ["Marine and Inland Fish"]
+        }
+    }
+}
+
+
+# ---------- UNITS ----------
+# Unit of each category's files, by display name as in the sidebar's category hierarchy
+UNITS = {
+    "Yield": {
+        "Oilseeds": "Kg./hectare", "Pulses": "Kg./hectare", "Rice": "Kg./hectare", "Wheat": "Kg./hectare",
+        "Coarse Cereals": "Kg./hectare", "Maize": "Kg./hectare", "Fruits": "MT/hectare", "Vegetables": "MT/hectare",
+        "Cereals": "Kg./hectare", "Foodgrains": "Kg./hectare"
+    },
+    "Production": {
+        "Milk": "Million Tonne", "Meat": "Million Tonne", "Eggs": "Million Numbers", "Sugar and Products": "Lakh Tonne",
+        "Fruits": "'000 MT", "Vegetables": "'000 MT", "Foodgrains": "Lakh Tonne", "Cereals": "'000 Tonne",
+        "Pulses": "'000 Tonne", "Rice": "'000 Tonne", "Wheat": "'000 Tonne", "Coarse Cereals": "'000 Tonne", "Maize": "'000 Tonne"
+    },
+    "Area": {
+        "Foodgrains": "Lakh hectare", "Cereals": "'000 hectare", "Fruits": "'000 hectare", "Oilseeds": "'000 hectare",
+        "Pulses": "'000 hectare", "Rice": "'000 hectare", "Vegetables": "'000 hectare", "Wheat": "'000 hectare",
+        "Coarse Cereals": "'000 hectare", "Maize": "'000 hectare"
+    }
+}
+# Unit → {converted unit: multiplier}
+UNIT_CONVERSIONS = {
+    "'000 Tonne": {"Million Tonne": 0.001}, "'000 MT": {"Million Tonne": 0.001}, "Lakh Tonne": {"Million Tonne": 0.1},
+    "'000 hectare": {"Million hectare": 0.001}, "Lakh hectare": {"Million hectare": 0.1},
+    "Million Numbers": {"Billion Numbers": 0.001}, "Kg./hectare": {"Tonne/hectare": 0.001}
+}
+
+
+def normalize_category(name):
+    return name.lower().replace(" ", "").replace("_", "")
+
+
+# Unit of a category given by display name or folder name ("" if unknown)
+def category_unit(data_type, category):
+    units = {normalize_category(name): unit for name, unit in UNITS.get(data_type, {}).items()}
+    return units.get(normalize_category(category), "")
@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+from matplotlib import colormaps
+from matplotlib.colors import to_hex
+from catalog import WORLD_ROOT, iter_world_files
+from disk_cache import disk_cached
+from india_maps import PULSE_METRICS, PULSE_SEASONS, PULSE_SHEETS, PULSES_XLSX, build_pulses_cube
+from query_layer import query
+from state_registry import INDIA_ID
+
+SCHEMES = ["Quantile", "Jenks", "Log"]
+N_CLASSES = 7
+JENKS_SAMPLE = 512  # Jenks runs on this many quantiles of the data; O(k·n²) on the full data is too slow
+
+
+# ---------- BREAKS ----------
+# Each scheme → sorted class boundaries [b0 = min, ..., bk = max]; class i holds b_i ≤ v < b_i+1
+# (the last class includes bk). Fewer than k classes come back when the data has few distinct values.
+def quantile_breaks(values, k=N_CLASSES):
+    return np.unique(np.quantile(values, np.linspace(0, 1, k + 1)))
+
+
+# Geometric steps between the smallest positive value and the max; zeros fall into the first class
+def log_breaks(values, k=N_CLASSES):
+    positive = values[values > 0]
+    if positive.size == 0 or positive.min() == values.max():
+        return quantile_breaks(values, k)
+    breaks = np.geomspace(positive.min(), values.max(), k + 1)
+    breaks[0] = values.min()
+    return np.unique(breaks)
+
+
+# Breaks of classes given by the index of each class's first value (after the first class): the
+# midpoint between the last value of one class and the first of the next, so a class holding a single
+# value (e.g. just the max) never collapses into its neighbour's break
+def _start_breaks(sample, starts):
+    return np.concatenate([[sample[0]], (sample[starts - 1] + sample[starts]) / 2, [sample[-1]]])
+
+
+# Fisher-Jenks natural breaks: the k classes with the least total within-class squared deviation,
+# by dynamic programming over all (class start, class end) pairs of the sorted sample at once.
+# At least k distinct values always give exactly k classes.
+def jenks_breaks(values, k=N_CLASSES):
+    sample = np.sort(values) if len(values) <= JENKS_SAMPLE else np.quantile(values, np.linspace(0, 1, JENKS_SAMPLE))
+    sample = np.unique(sample)
+    n = len(sample)
+    if n == 1:
+        return sample
+    if n <= k:
+        return _start_breaks(sample, np.arange(1, n))  # one class per value
+
+    sum1 = np.concatenate([[0.0], np.cumsum(sample)])
+    sum2 = np.concatenate([[0.0], np.cumsum(sample ** 2)])
+    start, end = np.arange(n)[:, None], np.arange(n)[None, :]
+    count = end - start + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        deviation = (sum2[end + 1] - sum2[start]) - (sum1[end + 1] - sum1[start]) ** 2 / count
+    deviation[count <= 0] = np.inf  # deviation[a, b]: squared deviation of sample[a..b] as one class
+
+    cost = deviation[0].copy()  # best cost of sample[..i] in the classes so far
+    class_start = np.zeros((k, n), dtype=int)
+    for j in range(1, k):
+        total = cost[:-1, None] + deviation[1:, :]  # previous classes end at m, class j is sample[m+1..i]
+        total[: j - 1] = np.inf                     # the first j classes need at least j values
+        best = np.argmin(total, axis=0)
+        cost = total[best, np.arange(n)]
+        class_start[j] = best + 1
+
+    starts, last = [], n - 1
+    for j in range(k - 1, 0, -1):
+        first = class_start[j, last]
+        starts.append(first)
+        last = first - 1
+    return _start_breaks(sample, np.array(starts[::-1]))
+
+
+BREAKS = {"Quantile": quantile_breaks, "Jenks": jenks_breaks, "Log": log_breaks}
+
+
+# Breaks of finite values (None if there are none); a single distinct value still gets one class
+def classify(values, scheme, k=N_CLASSES):
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return None
+    breaks = BREAKS[scheme](values, k)
+    return breaks if len(breaks) > 1 else np.array([breaks[0], breaks[0] + 1])
+
+
+# ---------- CLASS CATALOG ----------
+# Breaks of every scheme for every dataset/metric, computed across all years once at ingest so that
+# maps of different years share one legend. Keys:
+#   ("world", "<Type>/<category>")              world tables, all countries and years
+#   ("pulses", "<pulse>/<season>/<metric>")     pulses cube, all states (not the India row) and years
+# → {(dataset, key, scheme): breaks}
+@disk_cached(depends_on=lambda k=N_CLASSES: [PULSES_XLSX] + [path for _, _, path in iter_world_files(WORLD_ROOT)])
+def build_class_catalog(k=N_CLASSES):
+    sources = {}
+    world = query("SELECT Type, Category, Value FROM world WHERE Value IS NOT NULL")
+    for (data_type, category), values in world.groupby(["Type", "Category"])["Value"]:
+        sources[("world", f"{data_type}/{category}")] = values.to_numpy()
+
+    cube = build_pulses_cube()
+    states = np.array([i for i in range(cube.values.shape[3]) if i != INDIA_ID])
+    for pulse in PULSE_SHEETS:
+        for season in PULSE_SEASONS:
+            for metric in PULSE_METRICS:
+                sources[("pulses", f"{pulse}/{season}/{metric}")] = cube.slice(pulse, season, metric)[states].ravel()
+
+    catalog = {}
+    for (dataset, key), values in sources.items():
+        for scheme in SCHEMES:
+            breaks = classify(values, scheme, k)
+            if breaks is not None:
+                catalog[(dataset, key, scheme)] = tuple(float(b) for b in breaks)
+    return catalog
+
+
+def class_table(catalog):
+    return pd.DataFrame(
+        [{"Dataset": d, "Key": key, "Scheme": s, "Classes": len(b) - 1, "Breaks": ", ".join(f"{v:,.4g}" for v in b)}
+         for (d, key, s), b in catalog.items()]
+    )
+
+
+# ---------- RENDERING ----------
+def class_colors(n, cmap="YlOrRd"):
+    return [to_hex(colormaps[cmap](x)) for x in np.linspace(0, 1, n)]
+
+
+# Class index of each value (NaN stays NaN); values outside the catalogued range clip to the end classes
+def class_index(values, breaks):
+    values = np.asarray(values, dtype=float)
+    index = np.clip(np.searchsorted(breaks, values, side="right") - 1, 0, len(breaks) - 2).astype(float)
+    index[np.isnan(values)] = np.nan
+    return index
+
+
+def class_labels(breaks):
+    return [f"{lo:,.3g} – {hi:,.3g}" for lo, hi in zip(breaks[:-1], breaks[1:])]
+
+
+# Plotly colours by class index: one flat band per class on the colour bar, labelled with its range
+def plotly_class_scale(breaks, cmap="YlOrRd"):
+    n = len(breaks) - 1
+    colors = class_colors(n, cmap)
+    scale = []
+    for i, color in enumerate(colors):
+        scale += [[i / n, color], [(i + 1) / n, color]]
+    colorbar = dict(tickvals=list(range(n)), ticktext=class_labels(breaks))
+    return scale, [-0.5, n - 0.5], colorbar
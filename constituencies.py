@@ -0,0 +1,141 @@
+import os
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from scipy import sparse
+from state_registry import CANONICAL_STATES, attach_state_ids
+
+PC_SHAPEFILE = "India_Shapefile/S01_PC.shp"
+DISTRICT_SHAPEFILE = "India_Shapefile/State/2011_Dist.shp"
+OVERLAP_CACHE_PATH = os.path.join(".cache", "district_pc_overlap.npz")
+
+# Areas are measured in an equal-area projection for India (WGS 84 / India NSF LCC)
+AREA_CRS = "EPSG:7755"
+
+
+def load_constituencies(path=PC_SHAPEFILE):
+    gdf = gpd.read_file(path)
+    if gdf.crs is None:
+        gdf = gdf.set_crs(epsg=4326)
+    gdf, _ = attach_state_ids(gdf, "ST_NAME", source=os.path.basename(path))
+    gdf["PC_ID"] = np.arange(len(gdf), dtype="int32")
+    return gdf
+
+
+def load_districts(path=DISTRICT_SHAPEFILE):
+    gdf = gpd.read_file(path).set_crs(epsg=4326, allow_override=True)
+    gdf, _ = attach_state_ids(gdf, "ST_NM", source=os.path.basename(path))
+    return gdf.reset_index(drop=True)
+
+
+# ---------- OVERLAP MATRIX ----------
+# Overlay districts with constituencies once and keep only the intersection areas:
+# a sparse (n_districts × n_constituencies) matrix plus each polygon's own area.
+def build_overlap(districts, constituencies):
+    d = districts[["geometry"]].to_crs(AREA_CRS)
+    p = constituencies[["geometry"]].to_crs(AREA_CRS)
+    d["d_idx"] = np.arange(len(d))
+    p["p_idx"] = np.arange(len(p))
+
+    pieces = gpd.overlay(d, p, how="intersection", keep_geom_type=True)
+    overlap = sparse.csr_matrix(
+        (pieces.geometry.area.to_numpy(), (pieces["d_idx"].to_numpy(), pieces["p_idx"].to_numpy())),
+        shape=(len(d), len(p))
+    )
+    return overlap, d.geometry.area.to_numpy(), p.geometry.area.to_numpy()
+
+
+def _save_overlap(path, overlap, district_area, pc_area):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez_compressed(
+        tmp_path,
+        data=overlap.data, indices=overlap.indices, indptr=overlap.indptr, shape=overlap.shape,
+        district_area=district_area, pc_area=pc_area
+    )
+    os.replace(tmp_path, path)
+
+
+def _load_overlap(path):
+    with np.load(path) as f:
+        overlap = sparse.csr_matrix((f["data"], f["indices"], f["indptr"]), shape=tuple(f["shape"]))
+        return overlap, f["district_area"], f["pc_area"]
+
+
+# Cached overlay: rebuilt only when either shapefile is newer than the cache file
+def load_overlap(districts, constituencies, cache_path=OVERLAP_CACHE_PATH,
+                 sources=(DISTRICT_SHAPEFILE, PC_SHAPEFILE)):
+    source_mtime = max(os.path.getmtime(s) for s in sources if os.path.exists(s))
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= source_mtime:
+        overlap, district_area, pc_area = _load_overlap(cache_path)
+        if overlap.shape == (len(districts), len(constituencies)):
+            return overlap, district_area, pc_area
+
+    overlap, district_area, pc_area = build_overlap(districts, constituencies)
+    _save_overlap(cache_path, overlap, district_area, pc_area)
+    return overlap, district_area, pc_area
+
+
+# ---------- WEIGHTS ----------
+# how="sum": extensive values (area, production) are split by the share of each
+#            source polygon that falls inside a constituency.
+# how="mean": intensive values (yield) become an area-weighted mean per constituency.
+def _normalize(overlap, source_area, how):
+    if how == "sum":
+        scale = np.divide(1.0, source_area, out=np.zeros_like(source_area, dtype=float), where=source_area > 0)
+        return sparse.diags(scale) @ overlap
+    covered = np.asarray(overlap.sum(axis=0)).ravel()
+    scale = np.divide(1.0, covered, out=np.zeros_like(covered, dtype=float), where=covered > 0)
+    return overlap @ sparse.diags(scale)
+
+
+def district_weights(overlap, district_area, how="sum"):
+    return _normalize(overlap, district_area, how).tocsr()
+
+
+# Collapse district rows onto registry State_IDs: (len(CANONICAL_STATES) × n_constituencies)
+def state_weights(overlap, district_area, district_state_ids, how="sum"):
+    ids = np.asarray(district_state_ids)
+    valid = ids >= 0
+    to_state = sparse.csr_matrix(
+        (np.ones(valid.sum()), (ids[valid], np.flatnonzero(valid))),
+        shape=(len(CANONICAL_STATES), len(ids))
+    )
+    state_overlap = to_state @ overlap
+    state_area = to_state @ district_area
+    return _normalize(state_overlap, state_area, how).tocsr()
+
+
+# values: (n_sources,) or (n_sources, n_frames) → (n_constituencies,) or (n_constituencies, n_frames).
+# NaN sources contribute nothing; with how="mean" the weights of the remaining sources are
+# renormalised per constituency so a missing state doesn't drag the mean towards 0.
+def reaggregate(weights, values, how="sum"):
+    values = np.asarray(values, dtype=float)
+    out = np.asarray(weights.T @ np.nan_to_num(values))
+    if how == "mean":
+        coverage = np.asarray(weights.T @ (~np.isnan(values)).astype(float))
+        out = np.divide(out, coverage, out=np.full_like(out, np.nan), where=coverage > 0)
+    return out
+
+
+# Re-aggregate a long State_ID/Year/value table to constituencies for every year in one multiply
+def state_frames_to_constituencies(df, value_col, weights, constituencies, year_col="Year", how="sum"):
+    df = df[df["State_ID"] >= 0]
+    wide = df.pivot_table(index="State_ID", columns=year_col, values=value_col, aggfunc="first")
+    matrix = np.full((len(CANONICAL_STATES), wide.shape[1]), np.nan)
+    matrix[wide.index.to_numpy()] = wide.to_numpy()
+    return state_matrix_to_constituencies(matrix, wide.columns, value_col, weights, constituencies, year_col, how)
+
+
+# Same from a ready State_ID × year matrix (e.g. a pulses cube slice) with one label per column;
+# how must match the one the weights were built with
+def state_matrix_to_constituencies(matrix, year_labels, value_col, weights, constituencies, year_col="Year", how="sum"):
+    pc_values = reaggregate(weights, matrix, how)
+    # Constituencies with no overlapping source data stay empty rather than 0
+    has_data = np.asarray(weights.T @ (~np.isnan(matrix)).astype(float)) > 0
+    pc_values[~has_data] = np.nan
+
+    out = pd.DataFrame(pc_values, columns=year_labels)
+    out["PC_ID"] = constituencies["PC_ID"].to_numpy()
+    out["PC_NAME"] = constituencies["PC_NAME"].to_numpy()
+    return out.melt(id_vars=["PC_ID", "PC_NAME"], var_name=year_col, value_name=value_col)
@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from catalog import DATA_ROOT, DATA_TYPES
+from disk_cache import disk_cached
+from rollup import HISTORY, build_rollups, load_series, source_files
+
+METRICS = ["Production", "Area", "Yield"]
+DEFAULT_YIELD_SCALE = 1000.0  # '000 tonnes / '000 hectares (or lakh / lakh) → Kg./hectare, as in every grain yield file
+
+
+# ---------- ALIGNED PANEL ----------
+# Production, Area and Yield of every category on one (Category, Series, Year) index: shipped files
+# first, parents with no file of their own from the rollup, then each metric still missing derived
+# from the other two in one vectorized pass:
+#   Yield = Production / Area × scale,  Area = Production / Yield × scale,  Production = Area × Yield / scale
+# `scale` turns each category's units into its yield unit. It is the power of ten fitted on the years
+# where all three are shipped (1000 for grains in kg/ha, 1 for fruits and vegetables in MT/ha), or
+# DEFAULT_YIELD_SCALE where no yield is shipped. Forecasts only combine series of the same model.
+# → (Category, Series, Year, Production, Area, Yield, Production derived, Area derived, Yield derived)
+@disk_cached(depends_on=lambda root=DATA_ROOT: source_files(root, DATA_TYPES))
+def build_panel(root=DATA_ROOT):
+    shipped = load_series(root, DATA_TYPES)
+    rollups, _ = build_rollups(root)
+    shipped_keys = pd.MultiIndex.from_frame(shipped[["Type", "Category"]].drop_duplicates())
+    rolled_up = rollups[~pd.MultiIndex.from_frame(rollups[["Type", "Category"]]).isin(shipped_keys)]
+
+    panel = pd.concat([shipped, rolled_up], ignore_index=True)
+    panel = panel.pivot(index=["Category", "Series", "Year"], columns="Type", values="Value")
+    panel = panel.reindex(columns=METRICS).rename_axis(columns=None)
+
+    production, area, yields = (panel[metric].to_numpy() for metric in METRICS)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        implied = pd.Series(np.log10(yields * area / production), index=panel.index).replace([np.inf, -np.inf], np.nan)
+        log_scale = implied.xs(HISTORY, level="Series").groupby(level="Category").median().round()
+        scale = 10.0 ** log_scale.reindex(panel.index.get_level_values("Category")).fillna(np.log10(DEFAULT_YIELD_SCALE)).to_numpy()
+        candidates = {
+            "Production": area * yields / scale,
+            "Area": production / yields * scale,
+            "Yield": production / area * scale,
+        }
+
+    for metric, values in candidates.items():
+        fill = panel[metric].isna().to_numpy() & np.isfinite(values)
+        panel[metric] = np.where(fill, values, panel[metric])
+        panel[f"{metric} derived"] = fill
+    return panel.reset_index()
+
+
+# ---------- SERVING ----------
+# Categories with a history for `metric`, shipped or derived
+def panel_categories(panel, metric):
+    history = panel[(panel["Series"] == HISTORY) & panel[metric].notna()]
+    return sorted(history["Category"].unique())
+
+
+# One metric of one category shaped like its CSVs would be → (historical_df [Year, Total], forecast_df [Year, <models>])
+def metric_frames(panel, metric, category):
+    df = panel[(panel["Category"] == category) & panel[metric].notna()]
+    history = df[df["Series"] == HISTORY][["Year", metric]].rename(columns={metric: "Total"}).reset_index(drop=True)
+    forecasts = df[df["Series"] != HISTORY].pivot(index="Year", columns="Series", values=metric)
+    return (history if not history.empty else None), forecasts.rename_axis(columns=None).reset_index()
+
+
+# Per (category, metric): how many history years are shipped vs derived
+def derivation_summary(panel):
+    history = panel[panel["Series"] == HISTORY]
+    counts = {}
+    for metric in METRICS:
+        present = history[metric].notna()
+        counts[f"{metric} shipped"] = (present & ~history[f"{metric} derived"]).groupby(history["Category"]).sum()
+        counts[f"{metric} derived"] = history[f"{metric} derived"].groupby(history["Category"]).sum()
+    return pd.DataFrame(counts).rename_axis("Category").reset_index()
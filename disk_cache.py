@@ -0,0 +1,249 @@
+import ast
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.environ.get("DASHBOARD_CACHE_DIR", os.path.join(".cache", "disk"))
+MAX_BYTES = int(float(os.environ.get("DASHBOARD_CACHE_MAX_MB", "512")) * 1024 * 1024)
+RESYNC_SECONDS = 300  # other processes write too: the size estimate is re-measured at least this often
+
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+_size = {"bytes": None, "measured_at": 0.0}  # running estimate of the cache's size on disk
+
+
+def _count(name, n=1):
+    with _lock:
+        _stats[name] += n
+
+
+# ---------- KEYS ----------
+# Stable content hash of call arguments: frames/arrays by their data, containers recursively
+def _feed(h, obj):
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        h.update(type(obj).__name__.encode())
+        h.update(repr(obj.columns.tolist() if isinstance(obj, pd.DataFrame) else obj.name).encode())
+        try:
+            h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+        except TypeError:
+            h.update(pickle.dumps(obj))
+    elif isinstance(obj, np.ndarray):
+        h.update(f"{obj.dtype}{obj.shape}".encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"{")
+        for k in sorted(obj, key=repr):
+            _feed(h, k)
+            _feed(h, obj[k])
+        h.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for item in obj:
+            _feed(h, item)
+        h.update(b"]")
+    elif obj is None or isinstance(obj, (str, int, float, bool, np.generic)):
+        h.update(repr(obj).encode())
+    else:
+        h.update(pickle.dumps(obj))
+
+
+def call_key(name, args, kwargs, extra=None):
+    h = hashlib.sha256(name.encode())
+    _feed(h, args)
+    _feed(h, kwargs)
+    if extra is not None:
+        _feed(h, extra)
+    return h.hexdigest()[:32]
+
+
+def _file_token(path):
+    try:
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return (path, None, None)
+
+
+# The file plus every project module it imports, transitively (modules found next to it; installed
+# packages are not followed)
+def _local_modules(filename):
+    directory = os.path.dirname(os.path.abspath(filename))
+    seen, pending = set(), [os.path.abspath(filename)]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        try:
+            with open(path, "rb") as f:
+                tree = ast.parse(f.read())
+        except (OSError, SyntaxError, ValueError):
+            continue
+        seen.add(path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                candidate = os.path.join(directory, f"{name.split('.')[0]}.py")
+                if os.path.exists(candidate):
+                    pending.append(candidate)
+    return sorted(seen)
+
+
+# Code version = hash of the defining file and the project modules it depends on, so edits to
+# helpers elsewhere (plotly_payload, frame_budget, ...) also invalidate
+@functools.lru_cache(maxsize=None)
+def _code_version(filename):
+    paths = _local_modules(filename)
+    if not paths:
+        return "unknown"
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(os.path.basename(path).encode())
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+
+# ---------- STORAGE ----------
+def _entry_path(namespace, key):
+    return os.path.join(CACHE_DIR, namespace, f"{key}.pkl")
+
+
+def _read(path):
+    with open(path, "rb") as f:
+        value = pickle.load(f)
+    os.utime(path)  # mtime doubles as last-access time for LRU eviction
+    return value
+
+
+# Write to a temp file in the same directory, then atomically rename into place
+def _write(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _entries(root=None):
+    root = root or CACHE_DIR
+    out = []
+    for dirpath, _, files in os.walk(root):
+        for name in files:
+            if name.endswith(".pkl"):
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                out.append((stat.st_mtime, stat.st_size, path))
+    return out
+
+
+# Drop least-recently-used entries until the cache fits the byte budget
+def evict(max_bytes=None):
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    with _lock:
+        _size.update(bytes=total, measured_at=time.time())
+    if evicted:
+        _count("evictions", evicted)
+    return evicted
+
+
+# After a write of `size` bytes: the directory is only walked (by evict) when the running estimate
+# crosses the budget, or when the estimate is missing or older than RESYNC_SECONDS
+def _after_write(size):
+    with _lock:
+        stale = _size["bytes"] is None or time.time() - _size["measured_at"] > RESYNC_SECONDS
+        if not stale:
+            _size["bytes"] += size
+            if _size["bytes"] <= MAX_BYTES:
+                return
+    evict()
+
+
+def clear():
+    for _, _, path in _entries():
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    with _lock:
+        _size.update(bytes=None)
+
+
+def cache_stats():
+    entries = _entries()
+    with _lock:
+        stats = dict(_stats)
+    stats.update({
+        "entries": len(entries),
+        "size_mb": round(sum(size for _, size, _ in entries) / 1024 / 1024, 2),
+        "budget_mb": round(MAX_BYTES / 1024 / 1024, 2),
+    })
+    return stats
+
+
+# ---------- DECORATOR ----------
+# Persist results on disk keyed by (function, input hash, code version).
+# depends_on(*args, **kwargs) may list files whose mtime/size should join the key.
+def disk_cached(depends_on=None, namespace=None):
+    def decorator(fn):
+        name = namespace or fn.__qualname__.replace("<", "").replace(">", "")
+        version = _code_version(inspect.getsourcefile(fn) or fn.__code__.co_filename)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            files = [_file_token(p) for p in depends_on(*args, **kwargs)] if depends_on is not None else None
+            path = _entry_path(name, call_key(f"{name}:{version}", args, kwargs, files))
+
+            if os.path.exists(path):
+                try:
+                    value = _read(path)
+                    _count("hits")
+                    return value
+                except Exception:
+                    _count("errors")
+
+            _count("misses")
+            value = fn(*args, **kwargs)
+            try:
+                _write(path, value)
+                _count("writes")
+                _after_write(os.path.getsize(path))
+            except Exception:
+                _count("errors")
+            return value
+
+        wrapper.cache_key_name = name
+        return wrapper
+    return decorator
+
@@ -0,0 +1,381 @@
+import argparse
+import copy
+import io
+import json
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+from PIL import Image
+from catalog import DATA_ROOT, DATA_TYPES, WORLD_ROOT, category_folder, category_unit, iter_category_folders, iter_world_files
+from classification import SCHEMES, build_class_catalog
+from derived import build_panel, metric_frames, panel_categories
+from disk_cache import _code_version, _file_token, call_key
+from forecast_timeline import build_forecast_timeline_figure
+from india_maps import (PULSE_METRICS, PULSE_SEASONS, PULSE_SHEETS, PULSES_XLSX, STATES_SHAPEFILE,
+                        build_pulses_cube, render_pulses_map_png)
+from model_accuracy import build_accuracy_index, top_models
+from rollup import build_rollups, missing_parents, rollup_frames
+from schema import compact_frame, read_world_csv
+from world_map import build_world_timelapse_figure
+
+EXPORT_ROOT = "generated_maps"
+MANIFEST = "manifest.json"
+KINDS = ["pulses", "world", "forecast"]
+FORMATS = ["png", "gif", "mp4", "html"]
+FRAME_MS = 400            # per frame in GIF/MP4/HTML playback
+FIGURE_SIZE = (1100, 650)  # plotly stills, px
+SCHEME = "Quantile"
+# Edits to any of these re-export everything
+RENDER_MODULES = ["export_maps.py", "india_maps.py", "world_map.py", "forecast_timeline.py", "plotly_payload.py",
+                  "frame_budget.py", "line_render.py", "classification.py", "schema.py"]
+
+
+# ---------- TIMELINE INPUTS ----------
+# Every category app.py can serve a timeline for, with where its frames come from
+def timeline_categories(data_type, panel, root=DATA_ROOT):
+    shipped = [c for _, c, folder in iter_category_folders(root, [data_type])
+               if os.path.exists(os.path.join(folder, "historical_data.csv"))
+               and os.path.exists(os.path.join(folder, "forecast_data.csv"))]
+    rolled_up = missing_parents(data_type, shipped, root)
+    derived = [c for c in panel_categories(panel, data_type) if c not in shipped + rolled_up]
+    return [(c, "shipped") for c in shipped] + [(c, "rollup") for c in rolled_up] + [(c, "derived") for c in derived]
+
+
+# Timeline inputs as app.py serves them by default: unit-converted by `multiplier`, forecasts cut to
+# the 3 lowest-RMSE models with projections → (historical_df, forecast_df, wg_df) or None
+def timeline_inputs(data_type, category, source, rollups, panel, accuracy, multiplier=1.0, root=DATA_ROOT):
+    wg_df = None
+    if source == "rollup":
+        historical_df, forecast_df = rollup_frames(rollups, data_type, category)
+    elif source == "derived":
+        historical_df, forecast_df = metric_frames(panel, data_type, category)
+    else:
+        folder = category_folder(data_type, category, root)
+        def read(name):
+            path = os.path.join(folder, f"{name}.csv")
+            return compact_frame(pd.read_csv(path), name) if os.path.exists(path) else None
+        historical_df, forecast_df, wg_df = read("historical_data"), read("forecast_data"), read("wg_report")
+    if historical_df is None:
+        return None
+
+    historical_df["Total"] *= multiplier
+    forecast_df.iloc[:, 1:] *= multiplier
+    if wg_df is not None and not wg_df.empty:
+        wg_df["Value"] *= multiplier
+    plotted_models = top_models(accuracy, data_type, category, n=3, available=forecast_df.columns[1:])
+    if plotted_models:
+        forecast_df = forecast_df[["Year"] + plotted_models]
+    return historical_df, forecast_df, wg_df
+
+
+# ---------- TASKS ----------
+# A task is one animation: {kind, name, title, params, inputs}; its key hashes the params (frames and
+# arrays by content), the input files' mtime/size and the rendering code, so unchanged ones are skipped
+def code_version(modules=RENDER_MODULES):
+    return [_code_version(path) for path in modules]
+
+
+def task_key(task, modules=RENDER_MODULES):
+    files = [_file_token(path) for path in task["inputs"]]
+    return call_key(f"{task['kind']}:{task['name']}", task["params"], {}, [files, code_version(modules)])
+
+
+def pulse_tasks(catalog, scheme):
+    cube = build_pulses_cube()
+    for pulse in PULSE_SHEETS:
+        for season in PULSE_SEASONS:
+            for metric in PULSE_METRICS:
+                labels = cube.labels_with_data(pulse, season, metric)
+                if not labels:
+                    continue
+                breaks = catalog.get(("pulses", f"{pulse}/{season}/{metric}", scheme))
+                yield {
+                    "kind": "pulses", "name": f"{pulse}/{season}/{metric}", "title": f"{pulse} - {season} - {metric}",
+                    "params": (pulse, season, metric, labels, breaks, cube.slice(pulse, season, metric)),
+                    "inputs": [PULSES_XLSX, STATES_SHAPEFILE]
+                }
+
+
+def world_tasks(catalog, scheme, root=WORLD_ROOT):
+    for data_type, category, path in iter_world_files(root):
+        df = read_world_csv(path)
+        title = f"{category.title()} {data_type}"
+        yield {
+            "kind": "world", "name": f"{data_type}/{category}", "title": title,
+            "params": (df, title, catalog.get(("world", f"{data_type}/{category}", scheme))),
+            "inputs": [path]
+        }
+
+
+def forecast_tasks(root=DATA_ROOT):
+    rollups, _ = build_rollups(root)
+    panel = build_panel(root)
+    accuracy = build_accuracy_index(root)
+    for data_type in DATA_TYPES:
+        for category, source in timeline_categories(data_type, panel, root):
+            inputs = timeline_inputs(data_type, category, source, rollups, panel, accuracy, root=root)
+            if inputs is None:
+                continue
+            yield {
+                "kind": "forecast", "name": f"{data_type}/{category}", "title": f"{category.title()} {data_type}",
+                "params": inputs + (category_unit(data_type, category),),
+                "inputs": []  # params carry the data itself
+            }
+
+
+def build_tasks(kinds=KINDS, scheme=SCHEME):
+    catalog = build_class_catalog() if {"pulses", "world"} & set(kinds) else {}
+    tasks = []
+    if "pulses" in kinds:
+        tasks += pulse_tasks(catalog, scheme)
+    if "world" in kinds:
+        tasks += world_tasks(catalog, scheme)
+    if "forecast" in kinds:
+        tasks += forecast_tasks()
+    return tasks
+
+
+def task_dir(task, root=EXPORT_ROOT):
+    return os.path.join(root, task["kind"], task["name"].replace("/", "_").replace(" ", "-").lower())
+
+
+# ---------- RENDERING ----------
+# One static figure per animation frame: the frame's trace updates applied to the base traces, with
+# the slider parked on that frame. Frames only carry what changes (see plotly_payload), so applying
+# each to the base figure is the same as playing up to it.
+def plotly_stills(fig):
+    spec = fig.to_dict()
+    frames = spec.pop("frames", None) or [{}]
+    spec["layout"].pop("updatemenus", None)
+    stills = []
+    for i, frame in enumerate(frames):
+        data, layout = copy.deepcopy(spec["data"]), copy.deepcopy(spec["layout"])
+        for index, trace in zip(frame.get("traces", range(len(frame.get("data", [])))), frame.get("data", [])):
+            data[index].update(trace)
+        layout.update(frame.get("layout", {}))
+        for slider in layout.get("sliders", []):
+            slider["active"] = i
+        stills.append(go.Figure({"data": data, "layout": layout}, _validate=False))
+    return stills
+
+
+def plotly_frames_png(fig, size=FIGURE_SIZE):
+    width, height = size
+    return [pio.to_image(still, format="png", width=width, height=height) for still in plotly_stills(fig)]
+
+
+# Frames padded onto one white canvas of even size (matplotlib's tight bbox varies per year; H.264 needs even sides)
+def uniform_frames(pngs):
+    images = [Image.open(io.BytesIO(png)).convert("RGB") for png in pngs]
+    width = max(image.width for image in images) + max(image.width for image in images) % 2
+    height = max(image.height for image in images) + max(image.height for image in images) % 2
+    canvases = []
+    for image in images:
+        canvas = Image.new("RGB", (width, height), "white")
+        canvas.paste(image, ((width - image.width) // 2, (height - image.height) // 2))
+        canvases.append(canvas)
+    return canvases
+
+
+def write_frames(images, out_dir):
+    frames_dir = os.path.join(out_dir, "frames")
+    shutil.rmtree(frames_dir, ignore_errors=True)
+    os.makedirs(frames_dir)
+    for i, image in enumerate(images, start=1):
+        image.save(os.path.join(frames_dir, f"{i:04d}.png"))
+    return frames_dir
+
+
+def write_gif(images, path, frame_ms=FRAME_MS):
+    images[0].save(path, save_all=True, append_images=images[1:], duration=frame_ms, loop=0, optimize=True)
+
+
+# MP4 needs an ffmpeg binary on PATH
+def write_mp4(frames_dir, path, frame_ms=FRAME_MS):
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg not found on PATH")
+    subprocess.run([
+        ffmpeg, "-y", "-loglevel", "error", "-framerate", f"{1000 / frame_ms:g}",
+        "-i", os.path.join(frames_dir, "%04d.png"), "-pix_fmt", "yuv420p", "-c:v", "libx264", path
+    ], check=True)
+
+
+# Slider + play button over the exported PNG frames; no server needed
+SLIDESHOW_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body style="font-family: sans-serif; text-align: center;">
+<h2>{title}</h2>
+<div><button id="play">Play</button> <input id="year" type="range" min="0" max="{last}" value="0"> <span id="label"></span></div>
+<img id="frame" style="max-width: 100%;">
+<script>
+const labels = {labels};
+const frame = document.getElementById("frame"), slider = document.getElementById("year"), label = document.getElementById("label");
+function show(i) {{ slider.value = i; label.textContent = labels[i]; frame.src = "frames/" + String(i + 1).padStart(4, "0") + ".png"; }}
+let timer = null;
+document.getElementById("play").onclick = () => {{
+  if (timer) {{ clearInterval(timer); timer = null; return; }}
+  timer = setInterval(() => show((Number(slider.value) + 1) % labels.length), {frame_ms});
+}};
+slider.oninput = () => show(Number(slider.value));
+show(0);
+</script>
+</body></html>
+"""
+
+
+def write_slideshow(path, title, labels, frame_ms=FRAME_MS):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(SLIDESHOW_HTML.format(title=title, labels=json.dumps(labels), last=len(labels) - 1, frame_ms=frame_ms))
+
+
+def build_task_figure(task):
+    if task["kind"] == "world":
+        df, title, breaks = task["params"]
+        fig = build_world_timelapse_figure(df, metric_title=title, breaks=breaks)
+    else:
+        historical_df, forecast_df, wg_df, unit = task["params"]
+        fig = build_forecast_timeline_figure(historical_df, forecast_df, wg_df, unit)
+    return fig.update_layout(title_text=task["title"])
+
+
+# ---------- EXPORT ----------
+# Renders one task into its directory → (formats written, notes on formats that failed)
+def export_task(task, root=EXPORT_ROOT, formats=FORMATS, frame_ms=FRAME_MS):
+    out_dir = task_dir(task, root)
+    written, notes = [], []
+
+    if task["kind"] == "pulses":
+        pulse, season, metric, labels, breaks, _ = task["params"]
+        pngs = [render_pulses_map_png(pulse, season, metric, label, breaks=breaks) for label in labels]
+        os.makedirs(out_dir, exist_ok=True)
+    else:
+        fig = build_task_figure(task)
+        os.makedirs(out_dir, exist_ok=True)
+        if "html" in formats:
+            # plotly.js is shared from the export root rather than inlined into every page
+            fig.write_html(os.path.join(out_dir, "index.html"), include_plotlyjs="../../plotly.min.js", auto_play=False)
+            written.append("html")
+        pngs = None
+        if {"png", "gif", "mp4"} & set(formats):
+            try:
+                pngs = plotly_frames_png(fig)
+            except Exception as e:  # kaleido (and its browser) is only needed here
+                notes.append(f"png/gif/mp4: {str(e).strip().splitlines()[0]}")
+
+    if pngs:
+        images = uniform_frames(pngs)
+        frames_dir = write_frames(images, out_dir)
+        written.append("png")  # the GIF, MP4 and slideshow are built from these
+        if "gif" in formats:
+            write_gif(images, os.path.join(out_dir, "animation.gif"), frame_ms)
+            written.append("gif")
+        if "mp4" in formats:
+            try:
+                write_mp4(frames_dir, os.path.join(out_dir, "animation.mp4"), frame_ms)
+                written.append("mp4")
+            except (RuntimeError, subprocess.CalledProcessError) as e:
+                notes.append(f"mp4: {e}")
+        if "html" in formats and task["kind"] == "pulses":
+            write_slideshow(os.path.join(out_dir, "index.html"), task["title"], labels, frame_ms)
+            written.append("html")
+    return written, notes
+
+
+def _export_job(job):
+    task, root, formats, frame_ms = job
+    try:
+        return export_task(task, root, formats, frame_ms)
+    except Exception as e:
+        return [], [f"failed: {e}"]
+
+
+def load_manifest(root=EXPORT_ROOT):
+    path = os.path.join(root, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, root=EXPORT_ROOT):
+    path = os.path.join(root, MANIFEST)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+
+# A task is skipped when its key and frame duration are unchanged (the GIF, MP4 and slideshow bake
+# frame_ms in) and every requested format was attempted last time. Formats that could not be written
+# then (no kaleido/ffmpeg) are not retried for unchanged inputs; --force retries them.
+def is_current(entry, key, formats, frame_ms=FRAME_MS):
+    return (entry is not None and entry["key"] == key and entry.get("frame_ms") == frame_ms
+            and set(formats) <= set(entry.get("attempted", entry["formats"])))
+
+
+# Exports every task in a process pool, skipping unchanged ones → one summary row per task
+def export_all(tasks, root=EXPORT_ROOT, formats=FORMATS, frame_ms=FRAME_MS, workers=None, force=False, progress=None):
+    os.makedirs(root, exist_ok=True)
+    plotly_js = os.path.join(root, "plotly.min.js")
+    if "html" in formats and not os.path.exists(plotly_js):
+        with open(plotly_js, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+
+    manifest = load_manifest(root)
+    rows, jobs = [], {}
+    for task in tasks:
+        id_, key = f"{task['kind']}/{task['name']}", task_key(task)
+        if not force and is_current(manifest.get(id_), key, formats, frame_ms):
+            rows.append({"Task": id_, "Status": "skipped", "Formats": ", ".join(manifest[id_]["formats"]),
+                         "Notes": "; ".join(manifest[id_].get("notes", []))})
+        else:
+            jobs[id_] = (task, key)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_export_job, (task, root, formats, frame_ms)): id_ for id_, (task, _) in jobs.items()}
+        for i, future in enumerate(as_completed(futures), start=1):
+            id_ = futures[future]
+            written, notes = future.result()
+            if written:
+                manifest[id_] = {"key": jobs[id_][1], "formats": written, "attempted": sorted(formats),
+                                 "frame_ms": frame_ms, "notes": notes}
+                save_manifest(manifest, root)
+            rows.append({"Task": id_, "Status": "exported" if written else "failed",
+                         "Formats": ", ".join(written), "Notes": "; ".join(notes)})
+            if progress is not None:
+                progress(i / len(futures), f"Exported {id_}")
+    return pd.DataFrame(rows, columns=["Task", "Status", "Formats", "Notes"]).sort_values("Task", ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export every pulses map sequence, world timelapse and forecast timeline to PNG frames, "
+                    "GIF/MP4 and HTML under generated_maps/. PNG frames of plotly figures need kaleido; "
+                    "MP4 needs ffmpeg on PATH.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=KINDS)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--scheme", choices=SCHEMES, default=SCHEME, help="map colour classes")
+    parser.add_argument("--frame-ms", type=int, default=FRAME_MS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--root", default=EXPORT_ROOT)
+    parser.add_argument("--force", action="store_true", help="re-export tasks whose inputs are unchanged (and retry formats that failed)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tasks = build_tasks(args.kinds, args.scheme)
+    summary = export_all(tasks, args.root, args.formats, args.frame_ms, args.workers, args.force,
+                         progress=lambda fraction, message: print(f"[{fraction:4.0%}] {message}", flush=True))
+    print(summary.to_string(index=False))
+    print(summary["Status"].value_counts().to_string())
+    print(f"{len(tasks)} tasks in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from disk_cache import disk_cached
+from single_flight import coalesced
+from plotly_payload import optimize_figure
+from line_render import downsample, render_mode
+from frame_budget import decade_years, frame_limit, mean_gap, play_args, select_frames
+
+
+# Animated historical + forecast timeline with the static WG (and optional Monte Carlo) overlays.
+# Inputs are already unit-converted, except `scenario` bands which are scaled by conversion_multiplier.
+@coalesced()
+@disk_cached()
+def build_forecast_timeline_figure(historical_df, forecast_df, wg_df, unit, scenario=None, conversion_multiplier=1.0):
+    # Prepare historical data
+    historical_df = historical_df.rename(columns={"Total": "Value"})
+    historical_df["Model"] = "Historical"
+
+    # Prepare forecast data
+    forecast_long_df = forecast_df.melt(id_vars="Year", var_name="Model", value_name="Value")
+
+    # Combine all data
+    combined_df = pd.concat([historical_df, forecast_long_df], ignore_index=True)
+    combined_df = combined_df.sort_values(by=["Model", "Year"])
+    combined_df = downsample(combined_df, "Year", "Value", group="Model")  # LTTB caps points per model
+
+    # --- (KEY CHANGE) Define all models and animation years upfront ---
+    all_model_names = ["Historical"] + forecast_df.columns[1:].tolist()
+    all_years = sorted(combined_df["Year"].unique())
+
+    # Frame budget: frames are cumulative, so each carries up to len(combined_df) points.
+    # Decade boundaries, WG target years and the last observed year always get a frame.
+    key_years = decade_years(all_years) + [historical_df["Year"].max()]
+    if wg_df is not None and not wg_df.empty:
+        key_years += wg_df["Year"].tolist()
+    all_animation_years = select_frames(all_years, frame_limit(len(combined_df)), keep=key_years)
+
+    # --- Build the frames with placeholder data to ensure continuity ---
+    timeline_frames = []
+    for year in all_animation_years:
+        # Get all data up to the current animation year
+        frame_data = combined_df[combined_df["Year"] <= year].copy()
+        frame_data["FrameYear"] = year
+
+        # --- (KEY CHANGE) The robust fix:
+        # Ensure a row exists for every model in this frame. If a model has no data yet,
+        # add a placeholder with a null value so Plotly knows it exists.
+        present_models = frame_data["Model"].unique()
+        missing_models = set(all_model_names) - set(present_models)
+
+        if missing_models:
+            placeholders = []
+            for model in missing_models:
+                # Use the first historical year as a non-plotting anchor
+                placeholders.append({
+                    "Year": historical_df["Year"].min(),
+                    "Model": model,
+                    "Value": np.nan, # Use np.nan for a gap in the line
+                    "FrameYear": year
+                })
+            frame_data = pd.concat([frame_data, pd.DataFrame(placeholders)], ignore_index=True)
+
+        timeline_frames.append(frame_data)
+
+    timeline_df = pd.concat(timeline_frames, ignore_index=True)
+
+    # --- AXIS BOUNDS ---
+    full_data_range = pd.concat([
+        combined_df["Value"],
+        wg_df["Value"] if wg_df is not None and not wg_df.empty else pd.Series(dtype='float64'),
+        scenario["bands"][["q05", "q95"]].stack() * conversion_multiplier if scenario is not None else pd.Series(dtype='float64')
+    ])
+    y_min = full_data_range.min() * 0.95
+    y_max = full_data_range.max() * 1.05
+    x_min = historical_df["Year"].min()
+    x_max = max(forecast_df["Year"].max(), 2047) if not forecast_df.empty else 2047
+
+    # --- PLOT THE ANIMATED LINE CHART ---
+    # The category_orders is still good practice to control the legend order.
+    fig_timeline = px.line(
+        timeline_df,
+        x="Year",
+        y="Value",
+        color="Model",
+        animation_frame="FrameYear",
+        animation_group="Model",
+        title=f"📊 Historical Data and Future Projections ({unit})",
+        markers=True,
+        render_mode=render_mode(combined_df, "Model"),  # WebGL for long series
+        range_y=[y_min, y_max],
+        range_x=[x_min, x_max],
+        category_orders={"Model": all_model_names}
+    )
+
+    # --- ADD THE STATIC MONTE CARLO FAN (quantile bands of the simulated paths) ---
+    if scenario is not None:
+        bands = scenario["bands"]
+        band_years = pd.concat([bands["Year"], bands["Year"][::-1]])
+        for lower, upper, label, opacity in [("q05", "q95", "90%", 0.15), ("q25", "q75", "50%", 0.3)]:
+            fig_timeline.add_trace(go.Scatter(
+                x=band_years,
+                y=pd.concat([bands[upper], bands[lower][::-1]]) * conversion_multiplier,
+                fill="toself",
+                fillcolor=f"rgba(99, 110, 250, {opacity})",
+                line=dict(width=0),
+                hoverinfo="skip",
+                name=f"Monte Carlo {label} band"
+            ))
+        fig_timeline.add_trace(go.Scatter(
+            x=bands["Year"],
+            y=bands["q50"] * conversion_multiplier,
+            mode="lines",
+            line=dict(color="rgb(99, 110, 250)", dash="dot"),
+            name="Monte Carlo median"
+        ))
+
+    # --- ADD THE STATIC WG REPORT POINTS ---
+    if wg_df is not None and not wg_df.empty:
+        wg_text = wg_df["Scenario"]
+        if scenario is not None and scenario["targets"] is not None:
+            probabilities = scenario["targets"].set_index("Scenario")["Probability"]
+            wg_text = wg_text.map(lambda s: f"{s} (P={probabilities[s]:.0%})" if s in probabilities else s)
+        fig_timeline.add_trace(go.Scatter(
+            x=wg_df["Year"],
+            y=wg_df["Value"],
+            mode="markers+text",
+            name="WG Report",
+            marker=dict(color="red", size=12, symbol="diamond"),
+            text=wg_text,
+            textposition="top right",
+            showlegend=True
+        ))
+
+    # --- CUSTOMIZE LAYOUT AND AESTHETICS ---
+    fig_timeline.update_layout(
+        updatemenus=[{
+            "type": "buttons",
+            "buttons": [{
+                "label": "Play",
+                "method": "animate",
+                "args": [None, play_args(10, mean_gap(all_animation_years))]  # 10 ms per year; lower = faster
+            }, {
+                "label": "Pause",
+                "method": "animate",
+                "args": [[None], {
+                    "mode": "immediate",
+                    "frame": {"duration": 0},
+                    "transition": {"duration": 0}
+                }]
+            }]
+        }]
+    )    
+
+    fig_timeline.update_layout(
+        yaxis_title=f"Value ({unit})",
+        xaxis_title="Year",
+        legend_title="Model/Scenario",
+        font=dict(family="Poppins, sans-serif", size=12),
+        title_font_size=22,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    fig_timeline.update_layout({
+        'sliders': [{'currentvalue': {'prefix': 'Year: '},'pad': {'t': 20}}]
+    })
+
+    return optimize_figure(fig_timeline, "forecast_timeline")
@@ -0,0 +1,49 @@
+MAX_FRAMES = 60            # slider positions any animation may ship
+MAX_FRAME_POINTS = 50_000  # data points summed over all frames (browser memory / transfer budget)
+
+
+# ---------- BUDGET ----------
+# Frames affordable for an animation whose frames carry `points_per_frame` values each
+def frame_limit(points_per_frame, max_frames=MAX_FRAMES, max_points=MAX_FRAME_POINTS):
+    return max(2, min(max_frames, max_points // max(int(points_per_frame), 1)))
+
+
+def decade_years(years):
+    return [year for year in years if year % 10 == 0]
+
+
+# Subset of `values` within `limit`: the smallest stride that fits, always keeping the first and
+# last value and every `keep` value present (decade boundaries, WG target years, ...)
+def select_frames(values, limit, keep=()):
+    values = sorted(set(values))
+    if len(values) <= limit:
+        return values
+
+    present = set(values)
+    required = {values[0], values[-1]} | {value for value in keep if value in present}
+    for stride in range(2, len(values) + 1):
+        chosen = required | set(values[::stride])
+        if len(chosen) <= limit:
+            return sorted(chosen)
+    return sorted(required)  # key values alone exceed the budget; never drop them
+
+
+# ---------- PLAYBACK ----------
+# Play-button options for frames `gap` steps apart: each frame lasts `gap` times as long and the
+# browser tweens linearly between them, so playback speed matches the unsampled animation.
+def play_args(frame_ms, gap=1, redraw=True):
+    duration = int(round(frame_ms * gap))
+    return {
+        "frame": {"duration": duration, "redraw": redraw},
+        "fromcurrent": True,
+        "transition": {"duration": duration, "easing": "linear"}
+    }
+
+
+def mean_gap(values):
+    return (values[-1] - values[0]) / (len(values) - 1) if len(values) > 1 else 1
+
+
+# Interpolation steps per item (e.g. per rising bar) when `n_items` items share the frame budget
+def steps_per_item(n_items, max_steps, limit):
+    return max(1, min(max_steps, limit // max(n_items, 1)))
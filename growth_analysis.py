@@ -2,7 +2,28 @@ import pandas as pd
 import numpy as np
 from scipy.stats import linregress
 import plotly.graph_objects as go
+from disk_cache import disk_cached
+from plotly_payload import optimize_figure
+from frame_budget import frame_limit, play_args, steps_per_item
 
+LAST_DECADE_END = 2020  # years after this fold into the last decade
+
+# Decades as (start, end) pairs: 1951-1960, 1961-1970, ..., with years before the first start folded
+# into the first decade and years after LAST_DECADE_END into the last
+def decade_ranges(min_year, max_year):
+    min_decade_start = (min_year // 10) * 10 + 1
+    decades = []
+    year = min_decade_start
+    while year + 9 <= LAST_DECADE_END:
+        decades.append((year, year + 9))
+        year += 10
+    if min_year < min_decade_start:
+        decades[0] = (min_year, decades[0][1])
+    if max_year > LAST_DECADE_END:
+        decades[-1] = (decades[-1][0], max_year)
+    return decades
+
+@disk_cached(depends_on=lambda csv_path, *args, **kwargs: [csv_path])
 def plot_logest_growth_from_csv(csv_path, category_name, scale_factor=1.0):
     # Load historical data
     df = pd.read_csv(csv_path)
@@ -26,16 +47,7 @@ def plot_logest_growth_from_csv(csv_path, category_name, scale_factor=1.0):
         df.loc[year, 'Total'] = df.loc[prev_year, 'Total'] + step * (year - prev_year)
 
     # Define decades
-    min_decade_start = (df.index.min() // 10) * 10 + 1
-    decades = []
-    year = min_decade_start
-    while year + 9 <= 2020:
-        decades.append((year, year + 9))
-        year += 10
-    if df.index.min() < min_decade_start:
-        decades[0] = (df.index.min(), decades[0][1])
-    if df.index.max() > 2020:
-        decades[-1] = (decades[-1][0], df.index.max())
+    decades = decade_ranges(df.index.min(), df.index.max())
 
     # Calculate trend growth rates
     decade_growth_rates = {}
@@ -58,34 +70,29 @@ def plot_logest_growth_from_csv(csv_path, category_name, scale_factor=1.0):
         "GrowthRate": list(decade_growth_rates.values())
     })
 
+    # Bar heights of every frame at once, (frames × decades): bars before the rising one at full
+    # height, the rising bar at step/n_steps of its height, bars after it at 0
+    rates = df_plot["GrowthRate"].to_numpy()
+    n_bars = len(rates)
+    # Up to 5 steps per bar within the frame budget; the browser tweens between steps
+    n_steps_per_bar = steps_per_item(n_bars, 5, frame_limit(n_bars))
+    rising = np.repeat(np.arange(n_bars), n_steps_per_bar)
+    steps = np.tile(np.arange(1, n_steps_per_bar + 1), n_bars)
+    columns = np.arange(n_bars)
+    heights = np.where(
+        columns < rising[:, None], rates,
+        np.where(columns == rising[:, None], rates * (steps / n_steps_per_bar)[:, None], 0.0)
+    )
+
+    # Frames are plain dicts carrying only the changing heights (attached unvalidated below)
+    frames = [
+        {"name": f"bar{bar_idx}_step{step}", "traces": [0], "data": [{"type": "bar", "y": row}]}
+        for bar_idx, step, row in zip(rising, steps, heights)
+    ]
+
     # Create Plotly figure with initial empty bars
     fig = go.Figure()
-    fig.add_trace(go.Bar(x=df_plot["Decade"], y=[0]*len(df_plot), name="Trend Growth Rate"))
-
-    # Create frames → one bar rises at a time
-    n_steps_per_bar = 5  # smoothness per bar
-    frames = []
-
-    for bar_idx in range(len(df_plot)):
-        # Bars before → full height
-        # Current bar → rising
-        # Bars after → 0
-        for step in range(1, n_steps_per_bar+1):
-            y_vals = []
-            for i in range(len(df_plot)):
-                if i < bar_idx:
-                    y_vals.append(df_plot["GrowthRate"].iloc[i])
-                elif i == bar_idx:
-                    y_vals.append(df_plot["GrowthRate"].iloc[i] * (step / n_steps_per_bar))
-                else:
-                    y_vals.append(0)
-            frame = go.Frame(
-                data=[go.Bar(x=df_plot["Decade"], y=y_vals)],
-                name=f"bar{bar_idx}_step{step}"
-            )
-            frames.append(frame)
-
-    fig.frames = frames
+    fig.add_trace(go.Bar(x=df_plot["Decade"], y=np.zeros(n_bars), name="Trend Growth Rate"))
 
     # Add overall growth line
     fig.add_hline(y=overall, line_dash="dash", line_color="red", annotation_text=f"Overall Growth Rate ({overall:.2f}%)", annotation_position="top left")
@@ -102,11 +109,7 @@ def plot_logest_growth_from_csv(csv_path, category_name, scale_factor=1.0):
                 {
                     "label": "Play",
                     "method": "animate",
-                    "args": [None, {
-                        "frame": {"duration": 100, "redraw": True},
-                        "fromcurrent": True,
-                        "transition": {"duration": 0}
-                    }]
+                    "args": [None, play_args(100, 5 / n_steps_per_bar)]
                 },
                 {
                     "label": "Pause",
@@ -124,4 +127,7 @@ def plot_logest_growth_from_csv(csv_path, category_name, scale_factor=1.0):
 
     fig.update_traces(marker_color='lightskyblue')
 
-    return fig
+    # Validated data/layout + raw frames; _validate=False skips graph_objects validation of every frame
+    fig = go.Figure({**fig.to_dict(), "frames": frames}, _validate=False)
+
+    return optimize_figure(fig, "growth_bars")
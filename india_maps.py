@@ -0,0 +1,290 @@
+import io
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import streamlit as st
+from matplotlib import colormaps
+from matplotlib.colors import BoundaryNorm
+from matplotlib.figure import Figure
+from disk_cache import disk_cached
+from single_flight import coalesced
+from state_registry import CANONICAL_STATES, INDIA_ID, attach_state_ids
+from schema import compact_frame
+
+PULSES_XLSX = "Data/Pulses_Data.xlsx"
+STATES_SHAPEFILE = "India_Shapefile/india_st.shp"
+DISTRICTS_SHAPEFILE = "India_Shapefile/State/2011_Dist.shp"
+PULSE_SHEETS = ["Gram", "Urad", "Moong", "Masoor", "Moth", "Kulthi", "Khesari", "Peas", "Arhar"]
+PULSE_SEASONS = ["Kharif", "Rabi", "Total"]
+PULSE_METRICS = ["Area", "Production", "Yield"]
+PULSE_YIELD_FACTOR = 1000  # '000 tonnes / '000 hectares → Kg/hectare
+PRODUCTION_PULSES_CSV = "Data/Production/prod_pulses/historical_data.csv"
+
+
+# ---------- LOADERS ----------
+# Load each pulse sheet once; state names resolve to integer State_IDs at ingest
+@coalesced()
+@st.cache_data
+def load_pulses_sheet(pulse_type):
+    df = pd.read_excel(
+        PULSES_XLSX,
+        sheet_name=pulse_type,
+        header=1  # Header is in second row (row 2 in Excel)
+    )
+
+    # Remove any extra spaces in column names (important!!)
+    df.columns = df.columns.str.strip()
+
+    # Rename "States/UTs" → "State"
+    df = df.rename(columns={"States/UTs": "State"})
+    df["Year"] = df["Year"].astype(str)
+    for metric in PULSE_METRICS:
+        df[metric] = pd.to_numeric(df[metric], errors="coerce")
+
+    df, unmatched = attach_state_ids(df, "State", source=f"Pulses_Data.xlsx [{pulse_type}]")
+    # Crop is the sheet name again; year labels stay strings (they are pivoted and animated over)
+    df = compact_frame(df, f"pulses [{pulse_type}]", columns=["State", "State_ID", "Season", "Year"] + PULSE_METRICS, strings=["Year"])
+    return df, unmatched
+
+@st.cache_data
+def load_india_states_shapefile():
+    gdf = gpd.read_file(STATES_SHAPEFILE)
+    return attach_state_ids(gdf, "State_Name", source="india_st.shp")
+
+@st.cache_data
+def load_india_districts_shapefile():
+    gdf = gpd.read_file(DISTRICTS_SHAPEFILE)
+    gdf = gdf.set_crs(epsg=4326, inplace=False)
+    return attach_state_ids(gdf, "ST_NM", source="2011_Dist.shp")
+
+
+# ---------- PULSES CUBE ----------
+# The whole workbook as one dense array indexed [pulse, season, metric, State_ID, year] with integer
+# lookup tables per axis, so every map, state trend and all-India series is an array slice.
+# Year labels ("1950-1951", "2001-02") are parsed to their numeric start year; `year_labels` keeps
+# the workbook's label for each year column. Rows without a registry state are left out; rows without
+# a season are the crop's annual figures (e.g. Gram and Arhar before the seasonal split) and count as Total.
+# `derived` marks cells filled by derive_pulse_aggregates rather than read from the workbook.
+class PulsesCube:
+    def __init__(self, values, years, year_labels, derived=None):
+        self.values = values
+        self.derived = np.zeros(values.shape, dtype=bool) if derived is None else derived
+        self.years = years
+        self.year_labels = year_labels
+        self.pulse_index = {pulse: i for i, pulse in enumerate(PULSE_SHEETS)}
+        self.season_index = {season.lower(): i for i, season in enumerate(PULSE_SEASONS)}
+        self.metric_index = {metric: i for i, metric in enumerate(PULSE_METRICS)}
+        self.year_index = {label: i for i, label in enumerate(year_labels)}
+
+    # State_ID × year view (no copy)
+    def slice(self, pulse, season, metric):
+        return self.values[self.pulse_index[pulse], self.season_index[season.lower()], self.metric_index[metric]]
+
+    def labels_with_data(self, pulse, season, metric):
+        has_data = ~np.isnan(self.slice(pulse, season, metric)).all(axis=0)
+        return [self.year_labels[i] for i in np.flatnonzero(has_data)]
+
+    # One year across states → (State_ID, State, <metric>, Derived), missing values dropped
+    def year_frame(self, pulse, season, metric, year_label):
+        if year_label not in self.year_index:
+            raise ValueError(f"No pulses year {year_label!r} (a selection with no data has no year to pick)")
+        index = (self.pulse_index[pulse], self.season_index[season.lower()], self.metric_index[metric])
+        year = self.year_index[year_label]
+        column = self.values[index][:, year]
+        state_ids = np.flatnonzero(~np.isnan(column))
+        return pd.DataFrame({
+            "State_ID": state_ids, "State": np.asarray(CANONICAL_STATES)[state_ids], metric: column[state_ids],
+            "Derived": self.derived[index][state_ids, year]
+        })
+
+    # One state across years → (Year [start year], <metric>), missing values dropped
+    def state_series(self, pulse, season, metric, state_id):
+        if state_id is None or not 0 <= state_id < len(CANONICAL_STATES):
+            raise ValueError(f"No registry state with State_ID {state_id!r}")
+        row = self.slice(pulse, season, metric)[state_id]
+        has_data = ~np.isnan(row)
+        return pd.DataFrame({"Year": self.years[has_data], metric: row[has_data]})
+
+    def national_series(self, pulse, season, metric):
+        return self.state_series(pulse, season, metric, INDIA_ID)
+
+
+# Missing Total rows from Kharif + Rabi, missing all-India rows from the states, then missing Yield
+# computed as Production / Area, for all pulses at once, in place on the cube values. Shipped yields
+# are never overwritten (see pulses_yield_conflicts). Unreported seasons/states count as not grown
+# as long as one is reported.
+# → mask of derived cells
+def derive_pulse_aggregates(values):
+    total = PULSE_SEASONS.index("Total")
+    seasons = [PULSE_SEASONS.index("Kharif"), PULSE_SEASONS.index("Rabi")]
+    area, production, yields = (PULSE_METRICS.index(metric) for metric in ["Area", "Production", "Yield"])
+    states = np.array([i for i in range(len(CANONICAL_STATES)) if i != INDIA_ID])
+    derived = np.zeros(values.shape, dtype=bool)
+
+    def sum_reported(parts, axis):
+        return np.where(np.isnan(parts).all(axis=axis), np.nan, np.nansum(parts, axis=axis))
+
+    for metric in (area, production):
+        season_sum = sum_reported(values[:, seasons, metric], axis=1)       # pulse × state × year
+        fill = np.isnan(values[:, total, metric]) & ~np.isnan(season_sum)
+        values[:, total, metric][fill] = season_sum[fill]
+        derived[:, total, metric] = fill
+
+        state_sum = sum_reported(values[:, :, metric][:, :, states], axis=2)  # pulse × season × year
+        fill = np.isnan(values[:, :, metric, INDIA_ID]) & ~np.isnan(state_sum)
+        values[:, :, metric, INDIA_ID][fill] = state_sum[fill]
+        derived[:, :, metric, INDIA_ID] |= fill
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recomputed = values[:, :, production] / values[:, :, area] * PULSE_YIELD_FACTOR
+    fill = np.isnan(values[:, :, yields]) & np.isfinite(recomputed)
+    values[:, :, yields][fill] = recomputed[fill]
+    derived[:, :, yields] = fill
+    return derived
+
+
+def parse_year_start(labels):
+    return pd.to_numeric(pd.Series(labels, dtype=str).str.extract(r"^(\d{4})", expand=False), errors="coerce")
+
+
+@disk_cached(depends_on=lambda: [PULSES_XLSX])
+def build_pulses_cube():
+    df = pd.concat([load_pulses_sheet(pulse)[0].assign(Pulse=i) for i, pulse in enumerate(PULSE_SHEETS)], ignore_index=True)
+    season = df["Season"].astype("string").fillna("Total").str.lower().map({season.lower(): i for i, season in enumerate(PULSE_SEASONS)})
+    start = parse_year_start(df["Year"])
+    keep = season.notna() & start.notna() & (df["State_ID"] >= 0) & df[PULSE_METRICS].notna().any(axis=1)
+    df, season, start = df[keep], season[keep].astype(int), start[keep].astype(int)
+    # A state listed twice in a year (e.g. under two spellings) keeps its first row
+    first = ~pd.DataFrame({"p": df["Pulse"], "s": season, "id": df["State_ID"], "y": start}).duplicated()
+    df, season, start = df[first], season[first], start[first]
+
+    years = np.unique(start.to_numpy())
+    year_labels = df.groupby(start.to_numpy())["Year"].first().reindex(years).tolist()
+    values = np.full((len(PULSE_SHEETS), len(PULSE_SEASONS), len(PULSE_METRICS), len(CANONICAL_STATES), len(years)), np.nan)
+    values[df["Pulse"].to_numpy(), season.to_numpy(), :, df["State_ID"].to_numpy(), np.searchsorted(years, start.to_numpy())] = \
+        df[PULSE_METRICS].to_numpy(dtype=float)
+    derived = derive_pulse_aggregates(values)
+    return PulsesCube(values, years.astype(np.int16), year_labels, derived)
+
+
+# All-India Total production of the nine sheets against the national pulses series in
+# Data/Production (agricultural year 2015-2016 ↔ 2015). The sheets cover the major pulses only, so
+# Coverage sits below 1; years above 1 + tolerance are flagged.
+# → (Year, Sheets, prod_pulses, Coverage, Pulses reported, Flagged)
+def pulses_crosscheck(cube, path=PRODUCTION_PULSES_CSV, tolerance=0.01):
+    national = cube.values[:, PULSE_SEASONS.index("Total"), PULSE_METRICS.index("Production"), INDIA_ID]  # pulse × year
+    reported = (~np.isnan(national)).sum(axis=0)
+    sheets = pd.DataFrame({"Year": cube.years.astype(int), "Sheets": np.nansum(national, axis=0), "Pulses reported": reported})
+    shipped = pd.read_csv(path)
+    shipped = shipped[shipped["Year"].astype(str).str.match(r"^\d{4}$")].astype({"Year": int})
+    out = sheets[sheets["Pulses reported"] > 0].merge(shipped.rename(columns={"Total": "prod_pulses"}), on="Year", how="inner")
+    out["Coverage"] = out["Sheets"] / out["prod_pulses"]
+    out["Flagged"] = out["Coverage"] > 1 + tolerance
+    return out[["Year", "Sheets", "prod_pulses", "Coverage", "Pulses reported", "Flagged"]]
+
+
+# Shipped yields that disagree by more than `tolerance` with Production / Area where Area or Production
+# was derived; the shipped value is kept
+# → (Pulse, Season, State, Year, Yield, Yield from totals, Gap)
+def pulses_yield_conflicts(cube, tolerance=0.01):
+    area, production, yields = (PULSE_METRICS.index(metric) for metric in ["Area", "Production", "Yield"])
+    values, derived = cube.values, cube.derived
+    with np.errstate(divide="ignore", invalid="ignore"):
+        recomputed = values[:, :, production] / values[:, :, area] * PULSE_YIELD_FACTOR
+        gap = values[:, :, yields] / recomputed - 1
+    conflict = ((derived[:, :, area] | derived[:, :, production]) & ~derived[:, :, yields]
+                & np.isfinite(gap) & (np.abs(gap) > tolerance))
+    pulse, season, state, year = np.nonzero(conflict)
+    return pd.DataFrame({
+        "Pulse": np.asarray(PULSE_SHEETS)[pulse], "Season": np.asarray(PULSE_SEASONS)[season],
+        "State": np.asarray(CANONICAL_STATES)[state], "Year": np.asarray(cube.year_labels)[year],
+        "Yield": values[:, :, yields][conflict], "Yield from totals": recomputed[conflict], "Gap": gap[conflict]
+    })
+
+
+# Built once per process (and on disk across restarts); slices are read-only views
+@st.cache_resource
+def load_pulses_cube():
+    return build_pulses_cube()
+
+
+def detect_district_column(gdf):
+    for col in gdf.columns:
+        if "DISTRICT" in col.upper() or "DIST_NAME" in col.upper() or "DIST_NM" in col.upper():
+            return col
+    return None
+
+
+# Fabricated district values: each state's total split by random Dirichlet proportions
+def allocate_district_values(gdf_districts, df_selected_year, metric, district_col):
+    gdf = gdf_districts.copy()
+    gdf["Dummy_Value"] = 0.0
+
+    # One total per state in df_selected_year, keyed by State_ID
+    state_totals = df_selected_year[df_selected_year["State_ID"] >= 0].drop_duplicates("State_ID").set_index("State_ID")[metric]
+
+    for state_id, state_total_value in state_totals.items():
+        mask = gdf["State_ID"] == state_id
+
+        # No matching districts → skip
+        districts = gdf.loc[mask, district_col].unique()
+        if len(districts) == 0:
+            continue
+
+        proportions = np.random.dirichlet(np.ones(len(districts)))
+        dummy_values = pd.Series(proportions * state_total_value, index=districts)
+        gdf.loc[mask, "Dummy_Value"] = gdf.loc[mask, district_col].map(dummy_values)
+
+    return gdf
+
+
+# ---------- RENDERERS ----------
+# Rendered maps are cached as PNG bytes on disk, so hot views survive restarts
+def figure_png(fig, dpi=100):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
+
+
+# `breaks` fixes the colour classes (shared by every year) instead of scaling to this year's range
+def _plot_choropleth(gdf, column, title, figsize, fontsize=None, breaks=None):
+    fig = Figure(figsize=figsize)
+    ax = fig.subplots()
+    gdf.plot(
+        column=column,
+        ax=ax,
+        legend=True,
+        cmap='YlOrRd',
+        norm=BoundaryNorm(list(breaks), colormaps["YlOrRd"].N, clip=True) if breaks is not None else None,
+        edgecolor='black',
+        missing_kwds={"color": "white", "edgecolor": "black"}
+    )
+    ax.set_title(title, fontsize=fontsize)
+    return fig
+
+
+@coalesced()
+@disk_cached(depends_on=lambda *args, **kwargs: [PULSES_XLSX, STATES_SHAPEFILE])
+def render_pulses_map_png(pulse_type, season, metric, year, breaks=None):
+    gdf, _ = load_india_states_shapefile()
+    df_selected_year = load_pulses_cube().year_frame(pulse_type, season, metric, year)
+
+    # Merge Shapefile with selected year df on the integer state key
+    merged = gdf.merge(df_selected_year.drop(columns="State"), on="State_ID", how="left")
+    fig = _plot_choropleth(merged, metric, f"{pulse_type} - {season} - {metric} in {year}", (10, 12), breaks=breaks)
+    return figure_png(fig)
+
+
+@coalesced()
+@disk_cached(depends_on=lambda *args, **kwargs: [PULSES_XLSX, DISTRICTS_SHAPEFILE])
+def render_full_district_map_png(pulse_type, season, metric, year):
+    gdf_districts, _ = load_india_districts_shapefile()
+    df_selected_year = load_pulses_cube().year_frame(pulse_type, season, metric, year)
+    district_col = detect_district_column(gdf_districts)
+
+    gdf_full = allocate_district_values(gdf_districts, df_selected_year, metric, district_col)
+    fig = _plot_choropleth(
+        gdf_full, "Dummy_Value",
+        f"Full India District Map - {metric} ({season}, {pulse_type}, {year})", (12, 14), fontsize=16
+    )
+    return figure_png(fig)
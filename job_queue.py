@@ -0,0 +1,174 @@
+import inspect
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+JOB_DB_PATH = os.path.join(".cache", "jobs.sqlite")
+JOB_RESULT_DIR = os.path.join(".cache", "jobs")
+
+QUEUED, RUNNING, DONE, FAILED, LOST = "queued", "running", "done", "failed", "lost"
+REUSE_SECONDS = 600  # a finished job answers identical submissions for this long
+KEEP_RESULTS_SECONDS = 7 * 24 * 3600
+HEARTBEAT_SECONDS = 10
+STALE_SECONDS = 6 * HEARTBEAT_SECONDS  # a pending job whose owner hasn't beaten for this long is lost
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT,
+    status TEXT NOT NULL,
+    progress REAL DEFAULT 0,
+    message TEXT,
+    submitted_at REAL,
+    started_at REAL,
+    finished_at REAL,
+    duration_s REAL,
+    error TEXT,
+    result_path TEXT,
+    owner TEXT,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status);
+CREATE INDEX IF NOT EXISTS jobs_kind ON jobs (kind, finished_at);
+"""
+
+
+# ---------- JOB QUEUE ----------
+# Heavy work runs on a local thread pool; every job's state lives in a SQLite table so the
+# Streamlit script only submits and polls, and durations survive restarts for capacity planning.
+# Several processes may share the table: each queue owns its jobs and beats a heartbeat on them, and
+# only pending jobs whose heartbeat went stale (their process died) are marked lost.
+class JobQueue:
+    def __init__(self, db_path=JOB_DB_PATH, result_dir=JOB_RESULT_DIR, workers=2):
+        self.db_path = db_path
+        self.result_dir = result_dir
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        os.makedirs(result_dir, exist_ok=True)
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard-job")
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, sql_type in [("owner", "TEXT"), ("heartbeat_at", "REAL")]:
+                if column not in columns:  # tables created before heartbeats
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {sql_type}")
+        self.reap()
+        self.prune()
+        threading.Thread(target=self._beat, name="dashboard-job-heartbeat", daemon=True).start()
+
+    def _conn(self):
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn.row_factory = sqlite3.Row
+        return self._local.conn
+
+    def _beat(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            self._conn().execute("UPDATE jobs SET heartbeat_at=? WHERE owner=? AND status IN (?, ?)",
+                                 (time.time(), self.owner, QUEUED, RUNNING))
+
+    # Pending jobs whose owner stopped beating (or never did) can never finish
+    def reap(self, stale_seconds=STALE_SECONDS):
+        self._conn().execute(
+            "UPDATE jobs SET status=? WHERE status IN (?, ?) AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+            (LOST, QUEUED, RUNNING, time.time() - stale_seconds)
+        )
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name}=?" for name in fields)
+        self._conn().execute(f"UPDATE jobs SET {columns} WHERE id=?", (*fields.values(), job_id))
+
+    # Submit fn(*args, **kwargs). A job with the same `key` that is still pending, or finished
+    # less than `reuse_for` seconds ago, is returned instead of running again (failures included,
+    # so a polling page doesn't resubmit a broken job on every rerun).
+    # fn may accept a `progress(fraction, message)` callback.
+    def submit(self, kind, fn, *args, key=None, reuse_for=REUSE_SECONDS, **kwargs):
+        self.reap()
+        if key is not None:
+            existing = self._conn().execute(
+                "SELECT id, status, result_path FROM jobs WHERE key=? AND "
+                "(status IN (?, ?) OR (status IN (?, ?) AND finished_at >= ?)) ORDER BY submitted_at DESC LIMIT 1",
+                (key, QUEUED, RUNNING, DONE, FAILED, time.time() - reuse_for)
+            ).fetchone()
+            if existing is not None and (existing["status"] != DONE or os.path.exists(existing["result_path"] or "")):
+                return existing["id"]
+
+        job_id = uuid.uuid4().hex
+        self._conn().execute(
+            "INSERT INTO jobs (id, kind, key, status, submitted_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job_id, kind, key, QUEUED, time.time(), self.owner, time.time())
+        )
+        self._pool.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        started = time.time()
+        self._update(job_id, status=RUNNING, started_at=started)
+
+        def progress(fraction, message=None):
+            self._update(job_id, progress=float(min(max(fraction, 0.0), 1.0)), message=message)
+
+        try:
+            if "progress" in inspect.signature(fn).parameters:
+                kwargs = {**kwargs, "progress": progress}
+            result = fn(*args, **kwargs)
+
+            result_path = os.path.join(self.result_dir, f"{job_id}.pkl")
+            tmp_path = f"{result_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, result_path)
+
+            finished = time.time()
+            self._update(job_id, status=DONE, progress=1.0, finished_at=finished,
+                         duration_s=finished - started, result_path=result_path)
+        except Exception as e:
+            finished = time.time()
+            self._update(job_id, status=FAILED, finished_at=finished, duration_s=finished - started,
+                         error=f"{e}\n{traceback.format_exc()}")
+
+    def status(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id=?", (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def result(self, job_id):
+        job = self.status(job_id)
+        if job is None or job["status"] != DONE:
+            raise RuntimeError(f"Job {job_id} is not finished (status: {job and job['status']})")
+        with open(job["result_path"], "rb") as f:
+            return pickle.load(f)
+
+    # Drop stored results of old jobs; their rows (and durations) are kept
+    def prune(self, keep_seconds=KEEP_RESULTS_SECONDS):
+        cutoff = time.time() - keep_seconds
+        rows = self._conn().execute(
+            "SELECT id, result_path FROM jobs WHERE result_path IS NOT NULL AND finished_at < ?", (cutoff,)
+        ).fetchall()
+        for row in rows:
+            try:
+                os.remove(row["result_path"])
+            except OSError:
+                pass
+            self._update(row["id"], result_path=None)
+
+    # Finished-job durations per kind, for capacity planning
+    def duration_summary(self):
+        df = pd.read_sql_query(
+            "SELECT kind, status, duration_s FROM jobs WHERE finished_at IS NOT NULL", self._conn()
+        )
+        if df.empty:
+            return df
+        return df.groupby(["kind", "status"])["duration_s"].describe(percentiles=[0.5, 0.95]).reset_index()
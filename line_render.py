@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+WEBGL_THRESHOLD = 1000        # points per trace above which SVG markers get slow in the browser
+MAX_POINTS_PER_TRACE = 2000   # LTTB target; a chart cannot show more distinct points than this anyway
+
+
+# ---------- LTTB ----------
+# Largest-Triangle-Three-Buckets: indices of `n_out` points that keep the visual shape of (x, y).
+# First and last points are always kept; each bucket keeps the point forming the largest triangle
+# with the previously kept point and the mean of the next bucket.
+def lttb_indices(x, y, n_out):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(int) + 1  # bounds of the n_out - 2 middle buckets
+    edges[-1] = n - 1
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        next_x, next_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        keep[i + 1] = previous
+    return keep
+
+
+# Rows of df kept by LTTB on (x, y), per `group` series if given; non-numeric x (e.g. "2015-16"
+# year labels) is treated as evenly spaced. Rows with missing y are dropped from long series.
+def downsample(df, x, y, group=None, max_points=MAX_POINTS_PER_TRACE):
+    def one(series_df):
+        if len(series_df) <= max_points:
+            return series_df
+        series_df = series_df.dropna(subset=[y])
+        xs = series_df[x].to_numpy()
+        if xs.dtype.kind not in "iuf":
+            xs = np.arange(len(series_df))
+        return series_df.iloc[lttb_indices(xs, series_df[y].to_numpy(), max_points)]
+
+    if group is None:
+        return one(df)
+    return pd.concat([one(part) for _, part in df.groupby(group, sort=False)], ignore_index=True)
+
+
+# "webgl" (Scattergl) once any single trace is too long for SVG, else "svg"; pass to px.line(render_mode=...)
+def render_mode(df, group=None, threshold=WEBGL_THRESHOLD):
+    longest = df.groupby(group).size().max() if group is not None and not df.empty else len(df)
+    return "webgl" if longest > threshold else "svg"
@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+# Widget labels a simulated user changes, in app.py's sidebar order
+ACTIONS = ["Select Type:", "Category", "Select Pulse Type", "Select Year", "Select State for State Map"]
+DEFAULT_USERS = (1, 2, 4, 8)
+DEFAULT_STEPS = 5
+DEFAULT_PORT = 8599
+STARTUP_TIMEOUT = 60
+RERUN_TIMEOUT = 600
+
+
+# ---------- SERVER ----------
+def start_server(script="app.py", port=DEFAULT_PORT):
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"Streamlit server did not come up on port {port}")
+
+
+# Resident set size of a process in MB (Linux /proc; None elsewhere)
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid, interval=0.5):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.peak = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = rss_mb(self.pid)
+            if rss is not None:
+                self.peak = max(self.peak or 0, rss)
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# ---------- SIMULATED USER ----------
+# One browser tab speaking Streamlit's websocket protocol: every rerun sends the full widget
+# state, and latency is measured from the request until the server reports script_finished.
+class Session:
+    def __init__(self, url, rng):
+        self.url, self.rng = url, rng
+        self.widgets = {}  # label -> (element kind, widget proto) from the latest run
+        self.values = {}   # widget id -> WidgetState we have set
+        self.latencies, self.errors = [], 0
+
+    async def rerun(self, ws):
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        live_ids = {widget.id for _, widget in self.widgets.values()}
+        msg.rerun_script.widget_states.widgets.extend(s for wid, s in self.values.items() if wid in live_ids)
+
+        started = time.perf_counter()
+        await ws.send(msg.SerializeToString())
+        widgets = {}
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(ws.recv(), RERUN_TIMEOUT))
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_kind = element.WhichOneof("type")
+                if element_kind == "exception":
+                    self.errors += 1
+                widget = getattr(element, element_kind)
+                if getattr(widget, "id", "") and getattr(widget, "label", ""):
+                    widgets[widget.label] = (element_kind, widget)
+            elif kind == "script_finished":
+                self.latencies.append(time.perf_counter() - started)
+                self.widgets = widgets
+                return
+
+    # Pick a random option of one of the widgets a user would touch
+    def change_widget(self, label):
+        if label not in self.widgets:
+            return False
+        element_kind, widget = self.widgets[label]
+        options = list(widget.options)
+        if not options:
+            return False
+        value = self.rng.choice(options)
+
+        state = self.values.setdefault(widget.id, WidgetState(id=widget.id))
+        if element_kind in ("selectbox", "radio"):
+            state.string_value = value
+        elif element_kind == "slider":
+            state.string_array_value.data[:] = [value]
+        else:
+            return False
+        return True
+
+    async def run(self, steps):
+        async with websockets.connect(self.url, subprotocols=["streamlit"], max_size=None) as ws:
+            await self.rerun(ws)  # initial page load
+            for _ in range(steps):
+                if self.change_widget(self.rng.choice(ACTIONS)):
+                    await self.rerun(ws)
+
+
+# ---------- LOAD LEVELS ----------
+async def _run_level(url, users, steps, seed):
+    sessions = [Session(url, random.Random(seed + i)) for i in range(users)]
+    await asyncio.gather(*(s.run(steps) for s in sessions))
+    return sessions
+
+
+def run_level(url, users, steps, pid=None, seed=0):
+    sampler = RssSampler(pid) if pid is not None else None
+    if sampler is not None:
+        sampler.start()
+    started = time.perf_counter()
+    sessions = asyncio.run(_run_level(url, users, steps, seed))
+    elapsed = time.perf_counter() - started
+    if sampler is not None:
+        sampler.stop()
+
+    latencies = np.array([lat for s in sessions for lat in s.latencies])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {
+        "Users": users,
+        "Reruns": len(latencies),
+        "Errors": sum(s.errors for s in sessions),
+        "p50 (s)": p50,
+        "p95 (s)": p95,
+        "p99 (s)": p99,
+        "Throughput (reruns/s)": len(latencies) / elapsed,
+        "Peak RSS (MB)": sampler.peak if sampler is not None else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the dashboard with N concurrent simulated users.")
+    parser.add_argument("--users", type=int, nargs="+", default=list(DEFAULT_USERS))
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="widget changes per user after the first load")
+    parser.add_argument("--script", default="app.py")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--url", help="websocket URL of an already running server (skips starting one; no RSS)")
+    parser.add_argument("--pid", type=int, help="server pid to sample RSS from when using --url")
+    parser.add_argument("--csv", help="also write the results table here")
+    args = parser.parse_args()
+
+    proc = None
+    if args.url is None:
+        proc = start_server(args.script, args.port)
+    url = args.url or f"ws://localhost:{args.port}/_stcore/stream"
+    pid = proc.pid if proc is not None else args.pid
+
+    try:
+        rows = []
+        for users in args.users:
+            row = run_level(url, users, args.steps, pid=pid)
+            rows.append(row)
+            print(f"{users:>4} users: p50 {row['p50 (s)']:.2f}s  p95 {row['p95 (s)']:.2f}s  "
+                  f"{row['Throughput (reruns/s)']:.2f} reruns/s  RSS {row['Peak RSS (MB)'] or float('nan'):.0f} MB", flush=True)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    results = pd.DataFrame(rows)
+    print(results.round(3).to_string(index=False))
+    if args.csv:
+        os.makedirs(os.path.dirname(args.csv) or ".", exist_ok=True)
+        results.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pandas as pd
+from catalog import DATA_ROOT, iter_category_folders
+
+ENSEMBLE_NAME = "Ensemble (RMSE-weighted)"
+
+
+# ---------- ACCURACY INDEX ----------
+# One row per (Type, Category, Model) from every model_rmse.csv, with the model's RMSE rank
+# inside its category and whether forecast_data.csv actually ships that model's projections.
+def build_accuracy_index(root=DATA_ROOT):
+    frames = []
+    for data_type, category, folder in iter_category_folders(root):
+        rmse_path = os.path.join(folder, "model_rmse.csv")
+        if not os.path.exists(rmse_path):
+            continue
+        rmse_df = pd.read_csv(rmse_path)
+        rmse_df.columns = rmse_df.columns.str.strip()
+
+        forecast_path = os.path.join(folder, "forecast_data.csv")
+        forecast_models = pd.read_csv(forecast_path, nrows=0).columns[1:] if os.path.exists(forecast_path) else []
+
+        rmse_df["Model"] = rmse_df["Model"].str.strip()
+        rmse_df.insert(0, "Type", data_type)
+        rmse_df.insert(1, "Category", category)
+        rmse_df["In Forecast"] = rmse_df["Model"].isin(forecast_models)
+        frames.append(rmse_df)
+
+    if not frames:
+        return pd.DataFrame(columns=["Type", "Category", "Model", "RMSE", "Percentage Error", "In Forecast", "Rank"])
+
+    index = pd.concat(frames, ignore_index=True)
+    index["Rank"] = index.groupby(["Type", "Category"])["RMSE"].rank(method="first").astype(int)
+    return index.sort_values(["Type", "Category", "Rank"]).reset_index(drop=True)
+
+
+def category_accuracy(index, data_type, category):
+    return index[(index["Type"] == data_type) & (index["Category"] == category)]
+
+
+# Best `n` models by RMSE, limited to models that have projections (`available`)
+def top_models(index, data_type, category, n=3, available=None):
+    ranked = category_accuracy(index, data_type, category)
+    if available is not None:
+        ranked = ranked[ranked["Model"].isin(list(available))]
+    return ranked["Model"].head(n).tolist()
+
+
+# Inverse-MSE weights (1 / RMSE²) normalised to sum to 1
+def ensemble_weights(index, data_type, category, models):
+    rmse = category_accuracy(index, data_type, category).set_index("Model")["RMSE"].reindex(models)
+    weights = 1.0 / np.square(rmse.dropna())
+    return weights / weights.sum()
+
+
+def ensemble_forecast(forecast_df, weights):
+    models = weights.index.tolist()
+    return forecast_df[models].to_numpy() @ weights.to_numpy()
+
+
+# Lowest-RMSE model per (Type, Category), across every folder
+def best_model_table(index, data_type=None):
+    best = index[index["Rank"] == 1]
+    if data_type is not None:
+        best = best[best["Type"] == data_type]
+    return best[["Type", "Category", "Model", "RMSE", "Percentage Error", "In Forecast"]].reset_index(drop=True)
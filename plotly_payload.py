@@ -0,0 +1,188 @@
+import base64
+import json
+import logging
+import threading
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+import streamlit as st
+from plotly.utils import PlotlyJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIGITS = 6  # significant digits kept; hover labels never show more
+MIN_ARRAY_LENGTH = 4  # shorter arrays gain nothing from binary encoding
+INT_DTYPES = (np.int8, np.int16, np.int32)
+
+_lock = threading.Lock()
+_stats = {}  # chart name -> {"before": bytes, "after": bytes}
+
+
+def payload_stats():
+    with _lock:
+        return {name: dict(sizes) for name, sizes in _stats.items()}
+
+
+# ---------- ARRAYS ----------
+def round_significant(values, digits=DEFAULT_DIGITS):
+    values = np.asarray(values, dtype=np.float64)
+    nonzero = np.isfinite(values) & (values != 0)
+    magnitude = np.zeros_like(values)
+    magnitude[nonzero] = np.floor(np.log10(np.abs(values[nonzero])))
+    factor = 10.0 ** (digits - 1 - magnitude)
+    return np.round(values * factor) / factor
+
+
+# Numeric 1-D data rounded to `digits` significant digits and stored in the smallest dtype that
+# holds it (float32 carries 7); plotly serializes numpy arrays as base64 typed arrays ({dtype, bdata}).
+def compact_array(values, digits=DEFAULT_DIGITS):
+    if isinstance(values, (list, tuple)):
+        if len(values) < MIN_ARRAY_LENGTH or not all(
+            v is None or (isinstance(v, (int, float, np.number)) and not isinstance(v, (bool, np.bool_))) for v in values
+        ):
+            return None
+        values = np.array([np.nan if v is None else v for v in values], dtype=float)
+    elif not isinstance(values, np.ndarray):
+        return None
+
+    if values.ndim != 1 or len(values) < MIN_ARRAY_LENGTH or values.dtype.kind not in "iuf":
+        return None
+
+    if values.dtype.kind == "f" and np.isfinite(values).all() and np.array_equal(values, np.floor(values)):
+        values = values.astype(np.int64)
+
+    if values.dtype.kind in "iu":
+        low, high = values.min(), values.max()
+        for dtype in INT_DTYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return values.astype(dtype)
+
+    # Non-integral, or integers too large for int32 (which plotly.js has no 64-bit typed array for)
+    return round_significant(values, digits).astype(np.float32)
+
+
+# Figure.to_dict() already hands back numpy data as {"dtype", "bdata"} typed-array specs
+def _is_typed_array(value):
+    return isinstance(value, dict) and "bdata" in value and "dtype" in value
+
+
+def _decode_typed_array(value):
+    return np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]).newbyteorder("<"))
+
+
+def _compact_props(props, digits):
+    for key, value in props.items():
+        if _is_typed_array(value):
+            if "shape" in value:
+                continue
+            value = _decode_typed_array(value)
+        elif isinstance(value, dict):
+            _compact_props(value, digits)
+            continue
+        compacted = compact_array(value, digits)
+        if compacted is not None:
+            props[key] = compacted
+
+
+# ---------- FRAMES ----------
+def _fingerprint(value):
+    return json.dumps(value, cls=PlotlyJSONEncoder, sort_keys=True)
+
+
+# Frame layout keys that every frame sets to the base layout's value are no-ops
+def _dedupe_frame_layouts(spec):
+    frames, base = spec.get("frames", []), spec.get("layout", {})
+    keys = {key for frame in frames for key in frame.get("layout", {})}
+    for key in keys:
+        if key not in base:
+            continue
+        target = _fingerprint(base[key])
+        if all(key in frame.get("layout", {}) and _fingerprint(frame["layout"][key]) == target for frame in frames):
+            for frame in frames:
+                del frame["layout"][key]
+    for frame in frames:
+        if "layout" in frame and not frame["layout"]:
+            del frame["layout"]
+
+
+def _index_frame_traces(spec):
+    for frame in spec.get("frames", []):
+        frame["traces"] = list(frame.get("traces", range(len(frame.get("data", [])))))
+
+
+def _frame_copies(spec, index):
+    return [frame["data"][frame["traces"].index(index)] for frame in spec.get("frames", []) if index in frame["traces"]]
+
+
+# px's hover_name on a choropleth repeats every location name as hovertext; %{location} says the same
+def _drop_duplicate_hovertext(spec):
+    for index, base_trace in enumerate(spec.get("data", [])):
+        copies = [base_trace] + _frame_copies(spec, index)
+        if not all("hovertext" in trace and "locations" in trace
+                   and _fingerprint(trace["hovertext"]) == _fingerprint(trace["locations"]) for trace in copies):
+            continue
+        for trace in copies:
+            del trace["hovertext"]
+            if "hovertemplate" in trace:
+                trace["hovertemplate"] = trace["hovertemplate"].replace("%{hovertext}", "%{location}")
+
+
+# Trace properties repeated unchanged in every frame (and equal to the base trace) are dropped;
+# traces left with nothing to animate (e.g. a static WG scatter) are removed from the frames.
+def _strip_frame_traces(spec):
+    frames = spec.get("frames", [])
+    if not frames:
+        return
+
+    for index, base_trace in enumerate(spec.get("data", [])):
+        copies = _frame_copies(spec, index)
+        if len(copies) != len(frames):
+            continue  # a frame without this trace: its properties are not safe to share
+        for key in {key for trace in copies for key in trace} - {"type"}:
+            if key not in base_trace:
+                continue
+            target = _fingerprint(base_trace[key])
+            if all(key in trace and _fingerprint(trace[key]) == target for trace in copies):
+                for trace in copies:
+                    del trace[key]
+
+    for frame in frames:
+        kept = [(index, trace) for index, trace in zip(frame["traces"], frame["data"]) if set(trace) - {"type"}]
+        frame["traces"] = [index for index, _ in kept]
+        frame["data"] = [trace for _, trace in kept]
+
+
+# ---------- FIGURES ----------
+# Shrunk copy of fig; with a `name`, payload bytes before/after are logged and kept for the debug panel.
+# Cached figure builders call this before returning, so the cost is paid once per cached figure.
+def optimize_figure(fig, name=None, digits=DEFAULT_DIGITS):
+    before = payload_bytes(fig) if name else None
+    spec = fig.to_dict()
+    _index_frame_traces(spec)
+    _drop_duplicate_hovertext(spec)
+    _dedupe_frame_layouts(spec)
+    _strip_frame_traces(spec)
+    for trace in spec.get("data", []):
+        _compact_props(trace, digits)
+    for frame in spec.get("frames", []):
+        for trace in frame.get("data", []):
+            _compact_props(trace, digits)
+    optimized = go.Figure(spec, _validate=False)  # spec came from a validated figure
+
+    if name:
+        after = payload_bytes(optimized)
+        with _lock:
+            _stats[name] = {"before": before, "after": after}
+        logger.info("Plotly payload %s: %d → %d bytes (%.0f%%)", name, before, after, 100 * after / max(before, 1))
+    return optimized
+
+
+def payload_bytes(fig):
+    return len(pio.to_json(fig, validate=False))
+
+
+# Drop-in for st.plotly_chart on figures built inline in the script
+def plotly_chart(fig, name, digits=DEFAULT_DIGITS, **kwargs):
+    return st.plotly_chart(optimize_figure(fig, name, digits), **kwargs)
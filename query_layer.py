@@ -0,0 +1,243 @@
+import os
+import threading
+import time
+
+import duckdb
+import pandas as pd
+from catalog import DATA_ROOT, WORLD_ROOT, iter_category_folders, iter_world_files
+from india_maps import PULSE_METRICS, PULSE_SHEETS, PULSES_XLSX, load_pulses_sheet
+
+PARQUET_DIR = os.path.join(".cache", "parquet")
+MAX_EXPLORER_ROWS = 10_000
+# FAO aggregates reported next to their own parts ("China" = mainland + Taiwan + Hong Kong + Macao)
+WORLD_AGGREGATES = {
+    "China": ["China, mainland", "China, Taiwan Province of", "China, Hong Kong SAR", "China, Macao SAR"],
+}
+
+_lock = threading.Lock()
+_connection = None
+
+
+# ---------- DATASETS ----------
+# Each dataset is materialized once to Parquet and rebuilt when any of its source files is newer.
+#   history   (Type, Category, Year, Value)            Data/*/*/historical_data.csv
+#   forecasts (Type, Category, Year, Model, Value)     Data/*/*/forecast_data.csv
+#   wg        (Type, Category, Year, Scenario, Value)  Data/*/*/wg_report.csv
+#   pulses    (Pulse, State, State_ID, Season, Year, Year_Start, Area, Production, Yield)  Pulses_Data.xlsx
+#   world     (Type, Category, Country, Year, Unit, Value)  world data/*/*_country.csv
+def _category_files(filename, root=DATA_ROOT):
+    return [(t, c, os.path.join(f, filename)) for t, c, f in iter_category_folders(root)
+            if os.path.exists(os.path.join(f, filename))]
+
+
+def _read_category_csv(data_type, category, path):
+    df = pd.read_csv(path)
+    df = df[df["Year"].astype(str).str.match(r"^\d{4}$")]
+    df.insert(0, "Category", category)
+    df.insert(0, "Type", data_type)
+    return df.assign(Year=df["Year"].astype(int))
+
+
+def _build_history(files):
+    frames = [_read_category_csv(*f).rename(columns={"Total": "Value"}) for f in files]
+    return pd.concat(frames, ignore_index=True)[["Type", "Category", "Year", "Value"]]
+
+
+def _build_forecasts(files):
+    frames = [_read_category_csv(*f).melt(id_vars=["Type", "Category", "Year"], var_name="Model", value_name="Value") for f in files]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _build_wg(files):
+    return pd.concat([_read_category_csv(*f) for f in files], ignore_index=True)[["Type", "Category", "Year", "Scenario", "Value"]]
+
+
+def _build_pulses(files):
+    frames = []
+    for pulse in PULSE_SHEETS:
+        df, _ = load_pulses_sheet(pulse)
+        df = df.assign(
+            Pulse=pulse,
+            State=df["State"].astype(str),
+            Year_Start=pd.to_numeric(df["Year"].str[:4], errors="coerce").astype("Int64"),
+            **{metric: pd.to_numeric(df[metric], errors="coerce") for metric in PULSE_METRICS}
+        )
+        frames.append(df[["Pulse", "State", "State_ID", "Season", "Year", "Year_Start"] + PULSE_METRICS])
+    return pd.concat(frames, ignore_index=True)
+
+
+DATASETS = {
+    "history": (lambda: _category_files("historical_data.csv"), _build_history),
+    "forecasts": (lambda: _category_files("forecast_data.csv"), _build_forecasts),
+    "wg": (lambda: _category_files("wg_report.csv"), _build_wg),
+    "pulses": (lambda: [(None, None, PULSES_XLSX)], _build_pulses),
+    "world": (lambda: list(iter_world_files(WORLD_ROOT)), None),  # converted by DuckDB itself
+}
+
+
+# The 364k-row world tables go CSV → Parquet inside DuckDB without passing through pandas
+def _write_world_parquet(con, files, path):
+    selects = " UNION ALL ".join(
+        "SELECT ? AS Type, ? AS Category, Country, Year, Unit, Value FROM read_csv(?, header=true, "
+        "columns={'Country': 'VARCHAR', 'Year': 'SMALLINT', 'Unit': 'VARCHAR', 'Value': 'DOUBLE'})"
+        for _ in files
+    )
+    params = [value for data_type, category, source in files for value in (data_type, category, source)]
+    con.execute(f"COPY ({selects}) TO '{path}' (FORMAT parquet)", params)
+
+
+def _materialize(con, name):
+    list_sources, build = DATASETS[name]
+    files = list_sources()
+    path = os.path.join(PARQUET_DIR, f"{name}.parquet")
+    newest_source = max((os.path.getmtime(f[2]) for f in files), default=0)
+    if os.path.exists(path) and os.path.getmtime(path) >= newest_source:
+        return path
+
+    tmp_path = f"{path}.tmp"
+    if build is None:
+        _write_world_parquet(con, files, tmp_path)
+    else:
+        build(files).to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+# ---------- WORLD RANKS ----------
+# world without overlapping aggregates: an aggregate's row is dropped for any (Type, Category, Year)
+# in which one of its parts is reported, so ranks and totals count every area once
+def _create_world_countries(con):
+    pairs = [(aggregate, part) for aggregate, parts in WORLD_AGGREGATES.items() for part in parts]
+    con.execute("CREATE TABLE world_aggregates (Aggregate VARCHAR, Part VARCHAR)")
+    con.executemany("INSERT INTO world_aggregates VALUES (?, ?)", pairs)
+    con.execute("""
+        CREATE TABLE world_countries AS
+        SELECT * FROM world w
+        WHERE NOT EXISTS (
+            SELECT 1 FROM world_aggregates a JOIN world p ON p.Country = a.Part
+            WHERE a.Aggregate = w.Country AND p.Type = w.Type AND p.Category = w.Category AND p.Year = w.Year
+        )
+    """)
+
+
+# Dense rank (1 = largest), percentile (1.0 = top) and share of the world total for every
+# (Type, Category, Year) in one windowed pass over the world table, indexed for per-country lookups.
+# Yields are ratios, so their Share is NULL.
+def _create_world_ranks(con):
+    con.execute("""
+        CREATE TABLE world_ranks AS
+        SELECT Type, Category, Year, Country, Value,
+               dense_rank() OVER (w ORDER BY Value DESC) AS Rank,
+               count(*) OVER w AS Countries,
+               percent_rank() OVER (w ORDER BY Value) AS Percentile,
+               CASE WHEN Type <> 'Yield' THEN Value / sum(Value) OVER w END AS Share
+        FROM world_countries WHERE Value IS NOT NULL
+        WINDOW w AS (PARTITION BY Type, Category, Year)
+    """)
+    con.execute("CREATE INDEX world_ranks_country ON world_ranks (Type, Category, Country)")
+
+
+# ---------- CONNECTION ----------
+# One in-memory DuckDB per process. Tables are loaded from the Parquet files, then file access is
+# switched off and the configuration locked, so explorer queries cannot read or write the disk.
+def connection():
+    global _connection
+    with _lock:
+        if _connection is None:
+            os.makedirs(PARQUET_DIR, exist_ok=True)
+            con = duckdb.connect()
+            for name in DATASETS:
+                path = _materialize(con, name)
+                con.execute(f"CREATE TABLE {name} AS SELECT * FROM read_parquet('{path}')")
+            _create_world_countries(con)
+            _create_world_ranks(con)
+            con.execute("SET enable_external_access = false")
+            con.execute("SET lock_configuration = true")
+            _connection = con
+        return _connection
+
+
+# Cursors share the database but are safe to use from concurrent sessions
+def query(sql, params=None):
+    return connection().cursor().execute(sql, params or []).df()
+
+
+def describe():
+    return query("SELECT table_name AS \"Table\", column_name AS \"Column\", data_type AS \"Type\" "
+                 "FROM information_schema.columns ORDER BY table_name, ordinal_position")
+
+
+# SQL explorer: exactly one SELECT statement, results capped at MAX_EXPLORER_ROWS → (df, seconds)
+def run_select(sql, max_rows=MAX_EXPLORER_ROWS):
+    cursor = connection().cursor()
+    statements = cursor.extract_statements(sql)
+    if len(statements) != 1 or statements[0].type != duckdb.StatementType.SELECT:
+        raise ValueError("Only a single SELECT (or WITH … SELECT) statement can be run here.")
+    started = time.perf_counter()
+    rows = cursor.execute(statements[0].query).fetchmany(max_rows)
+    df = pd.DataFrame(rows, columns=[column[0] for column in cursor.description])
+    return df, time.perf_counter() - started
+
+
+# ---------- TYPED QUERIES ----------
+# Top n countries by Value for one world table; latest year with data when year is None.
+# Share is NULL for yields, as in world_ranks → (Rank, Country, Year, Value, Unit, Share)
+def top_countries(data_type, category, year=None, n=10):
+    return query("""
+        WITH t AS (SELECT * FROM world_countries WHERE Type = $type AND Category = $category AND Value IS NOT NULL),
+             y AS (SELECT coalesce($year, max(Year)) AS Year FROM t)
+        SELECT rank() OVER (ORDER BY Value DESC) AS Rank, Country, t.Year, Value, Unit,
+               CASE WHEN Type <> 'Yield' THEN Value / sum(Value) OVER () END AS Share
+        FROM t JOIN y USING (Year)
+        ORDER BY Value DESC
+        LIMIT $n
+    """, {"type": data_type, "category": category, "year": year, "n": n})
+
+
+# States ranked on one pulse metric in one season and year label (e.g. "2015-2016")
+# → (Rank, State, State_ID, <metric>)
+def state_ranking(pulse, season, metric, year):
+    if metric not in PULSE_METRICS:
+        raise ValueError(f"Unknown pulse metric: {metric}")
+    return query(f"""
+        SELECT rank() OVER (ORDER BY "{metric}" DESC) AS Rank, State, State_ID, "{metric}"
+        FROM pulses
+        WHERE Pulse = $pulse AND lower(Season) = lower($season) AND Year = $year
+              AND State_ID >= 0 AND "{metric}" IS NOT NULL
+        ORDER BY Rank
+    """, {"pulse": pulse, "season": season, "year": year})
+
+
+# One country's standing in every category of a type, across all years
+# → (Category, Year, Value, Rank, Countries, Percentile, Share)
+def country_standing(country, data_type):
+    return query("""
+        SELECT Category, Year, Value, Rank, Countries, Percentile, Share
+        FROM world_ranks WHERE Type = $type AND Country = $country
+        ORDER BY Category, Year
+    """, {"type": data_type, "country": country})
+
+
+# Every country's rank in every year of one world table → (Country, Year, Value, Rank, Countries, Percentile, Share)
+def world_ranks(data_type, category):
+    return query("""
+        SELECT Country, Year, Value, Rank, Countries, Percentile, Share
+        FROM world_ranks WHERE Type = $type AND Category = $category
+        ORDER BY Year, Rank
+    """, {"type": data_type, "category": category})
+
+
+# India history of several categories side by side → Year × category
+def category_comparison(data_type, categories):
+    df = query("SELECT Category, Year, Value FROM history WHERE Type = $type AND list_contains($categories, Category)",
+               {"type": data_type, "categories": list(categories)})
+    return df.pivot(index="Year", columns="Category", values="Value").reset_index()
+
+
+# Per-year world total for one table → (Year, Countries, Total)
+def world_totals(data_type, category):
+    return query("""
+        SELECT Year, count(*) AS Countries, sum(Value) AS Total
+        FROM world_countries WHERE Type = $type AND Category = $category
+        GROUP BY Year ORDER BY Year
+    """, {"type": data_type, "category": category})
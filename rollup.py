@@ -0,0 +1,113 @@
+import os
+import numpy as np
+import pandas as pd
+from catalog import DATA_ROOT, iter_category_folders
+from disk_cache import disk_cached
+
+# ---------- HIERARCHY ----------
+# Parents that are exact sums of other Data/ categories. Coarse cereals also covers jowar, bajra,
+# ragi etc., which have no folders, so Maize alone never rolls up into it.
+ROLLUPS = {
+    "cereals": ["rice", "wheat", "coarse cereals"],
+    "foodgrains": ["cereals", "pulses"],
+}
+ADDITIVE_TYPES = ["Production", "Area"]  # yields are ratios and do not sum
+SERIES_FILES = ["historical_data.csv", "forecast_data.csv"]
+HISTORY = "History"  # series name of historical_data.csv's Total; forecast series keep their model names
+TOLERANCE = 0.005    # relative gap between shipped and computed aggregate that gets flagged
+
+
+# Leaf categories of a parent, nested parents expanded (foodgrains → rice, wheat, coarse cereals, pulses)
+def leaves(category):
+    if category not in ROLLUPS:
+        return [category]
+    return [leaf for child in ROLLUPS[category] for leaf in leaves(child)]
+
+
+# ---------- SERIES ----------
+def source_files(root=DATA_ROOT, data_types=ADDITIVE_TYPES):
+    return [os.path.join(folder, filename)
+            for _, _, folder in iter_category_folders(root, data_types)
+            for filename in SERIES_FILES if os.path.exists(os.path.join(folder, filename))]
+
+
+# Every history and forecast-model series of the given types → (Type, Category, Series, Year, Value)
+def load_series(root=DATA_ROOT, data_types=ADDITIVE_TYPES):
+    frames = []
+    for data_type, category, folder in iter_category_folders(root, data_types):
+        for filename in SERIES_FILES:
+            path = os.path.join(folder, filename)
+            if not os.path.exists(path):
+                continue
+            df = pd.read_csv(path).rename(columns={"Total": HISTORY})
+            df = df[df["Year"].astype(str).str.match(r"^\d{4}$")]
+            df = df.assign(Year=df["Year"].astype(int)).melt(id_vars="Year", var_name="Series", value_name="Value")
+            frames.append(df.assign(Type=data_type, Category=category))
+    return pd.concat(frames, ignore_index=True)[["Type", "Category", "Series", "Year", "Value"]]
+
+
+# ---------- ROLLUP ----------
+# All parents of every (type, series, year) in one matrix product: the Year × leaf matrix times a
+# parent × leaf membership matrix. A parent is NaN in years where any of its leaves is missing.
+# Shipped aggregates are then compared with the computed sums; their files may use a different unit
+# (Foodgrains production is in lakh tonnes, its children in '000 tonnes), so each (type, parent) is
+# first matched to the computed sum by the power of ten that best aligns its history.
+# → (rollups, checks)
+#   rollups (Type, Category, Series, Year, Value)                                   in the children's unit
+#   checks  (Type, Category, Series, Year, Shipped, Computed, Scale, Gap, Flagged)  Gap relative to Shipped × Scale
+@disk_cached(depends_on=lambda root=DATA_ROOT: source_files(root))
+def build_rollups(root=DATA_ROOT):
+    long = load_series(root)
+    wide = long.pivot(index=["Type", "Series", "Year"], columns="Category", values="Value")
+
+    parents = list(ROLLUPS)
+    leaf_names = sorted({leaf for parent in parents for leaf in leaves(parent)})
+    membership = np.array([[leaf in leaves(parent) for leaf in leaf_names] for parent in parents], dtype=float)
+    values = wide.reindex(columns=leaf_names).to_numpy()
+    computed = pd.DataFrame(values @ membership.T, index=wide.index, columns=parents)
+
+    rollups = computed.rename_axis(columns="Category").stack().rename("Value").reset_index()
+    rollups = rollups.dropna(subset=["Value"])[["Type", "Category", "Series", "Year", "Value"]].reset_index(drop=True)
+
+    shipped = wide.reindex(columns=parents)
+    log_ratio = np.log10(computed / shipped).replace([np.inf, -np.inf], np.nan).xs(HISTORY, level="Series")
+    scale = 10.0 ** log_ratio.groupby(level="Type").median().round()
+    scale = scale.reindex(shipped.index.get_level_values("Type")).set_axis(shipped.index)
+
+    checks = pd.concat({
+        "Shipped": shipped.stack(), "Computed": computed.stack(), "Scale": scale.stack()
+    }, axis=1).dropna(subset=["Shipped", "Computed", "Scale"]).rename_axis(["Type", "Series", "Year", "Category"]).reset_index()
+    checks["Gap"] = checks["Computed"] / (checks["Shipped"] * checks["Scale"]) - 1
+    checks["Flagged"] = checks["Gap"].abs() > TOLERANCE
+    checks = checks[["Type", "Category", "Series", "Year", "Shipped", "Computed", "Scale", "Gap", "Flagged"]]
+    return rollups, checks.sort_values(["Type", "Category", "Series", "Year"]).reset_index(drop=True)
+
+
+# ---------- SERVING ----------
+# Parents computable for data_type (all leaves present) that have no folder of their own
+def missing_parents(data_type, available_categories, root=DATA_ROOT):
+    if data_type not in ADDITIVE_TYPES:
+        return []
+    present = {category for _, category, _ in iter_category_folders(root, [data_type])}
+    return [parent for parent in ROLLUPS
+            if parent not in available_categories and all(leaf in present for leaf in leaves(parent))]
+
+
+# A rolled-up parent shaped like its CSVs would be → (historical_df [Year, Total], forecast_df [Year, <models>]);
+# forecast_df has no model columns when the children share no forecast model
+def rollup_frames(rollups, data_type, category):
+    df = rollups[(rollups["Type"] == data_type) & (rollups["Category"] == category)]
+    history = df[df["Series"] == HISTORY][["Year", "Value"]].rename(columns={"Value": "Total"}).reset_index(drop=True)
+    forecasts = df[df["Series"] != HISTORY].pivot(index="Year", columns="Series", values="Value")
+    forecasts = forecasts.rename_axis(columns=None).reset_index()
+    return (history if not history.empty else None), forecasts
+
+
+# Summary per (type, parent, series): years compared, years flagged, largest gap
+def check_summary(checks, data_type=None):
+    if data_type is not None:
+        checks = checks[checks["Type"] == data_type]
+    return checks.groupby(["Type", "Category", "Series"], sort=False).agg(
+        Years=("Year", "size"), Flagged=("Flagged", "sum"), Scale=("Scale", "first"),
+        **{"Max gap": ("Gap", lambda gap: gap.abs().max())}
+    ).reset_index()
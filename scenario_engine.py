@@ -0,0 +1,112 @@
+import glob
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from catalog import DATA_ROOT, iter_category_folders
+
+SCENARIO_CACHE_PATH = os.path.join(".cache", "scenarios.pkl")
+N_PATHS = 5000
+HORIZON_END = 2047
+GROWTH_WINDOW = 30  # recent years whose log-growth drives the simulated drift
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def load_history(folder):
+    df = pd.read_csv(os.path.join(folder, "historical_data.csv"))
+    df = df[df["Year"].astype(str).str.match(r"^\d{4}$")]
+    df = df.assign(Year=df["Year"].astype(int), Total=pd.to_numeric(df["Total"], errors="coerce"))
+    df = df[df["Total"] > 0].dropna(subset=["Total"])
+    return df.sort_values("Year")
+
+
+# ---------- SIMULATION ----------
+# Paths continue from the last observed value with the recent mean log-growth plus
+# residuals bootstrapped (with replacement) from that same window: (n_paths × horizon).
+def simulate_paths(values, horizon, n_paths=N_PATHS, window=GROWTH_WINDOW, seed=0):
+    growth = np.diff(np.log(np.asarray(values, dtype=float)))[-window:]
+    drift = growth.mean()
+    residuals = growth - drift
+
+    rng = np.random.default_rng(seed)
+    shocks = rng.choice(residuals, size=(n_paths, horizon), replace=True)
+    log_paths = np.log(values[-1]) + np.cumsum(drift + shocks, axis=1)
+    return np.exp(log_paths)
+
+
+def simulate_category(folder, n_paths=N_PATHS, horizon_end=HORIZON_END, seed=0):
+    history = load_history(folder)
+    if len(history) < 3:
+        return None
+    last_year = int(history["Year"].iloc[-1])
+    years = np.arange(last_year + 1, horizon_end + 1)
+    if len(years) == 0:
+        return None
+    paths = simulate_paths(history["Total"].to_numpy(), len(years), n_paths=n_paths, seed=seed)
+
+    bands = pd.DataFrame(np.quantile(paths, QUANTILES, axis=0).T, columns=[f"q{int(q * 100):02d}" for q in QUANTILES])
+    bands.insert(0, "Year", years)
+
+    targets = None
+    wg_path = os.path.join(folder, "wg_report.csv")
+    if os.path.exists(wg_path):
+        targets = pd.read_csv(wg_path)
+        targets = targets[targets["Year"].between(years[0], years[-1])].copy()
+        cols = (targets["Year"] - years[0]).to_numpy()
+        # Share of simulated paths at or above each WG target in its target year
+        targets["Probability"] = (paths[:, cols] >= targets["Value"].to_numpy()).mean(axis=0)
+
+    return {"bands": bands, "targets": targets, "last_year": last_year, "n_paths": n_paths}
+
+
+def _simulate_job(job):
+    data_type, category, folder, n_paths = job
+    return (data_type, category), simulate_category(folder, n_paths=n_paths)
+
+
+# Every category simulated in a process pool; {(Type, category): result}
+def precompute_all(root=DATA_ROOT, n_paths=N_PATHS, workers=None, progress=None):
+    jobs = [(t, c, f, n_paths) for t, c, f in iter_category_folders(root)
+            if os.path.exists(os.path.join(f, "historical_data.csv"))]
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, (key, result) in enumerate(pool.map(_simulate_job, jobs), start=1):
+            if result is not None:
+                results[key] = result
+            if progress is not None:
+                progress(i / len(jobs), f"Simulated {key[0]} / {key[1]}")
+    return results
+
+
+# ---------- CACHE ----------
+def _inputs_mtime(root):
+    files = glob.glob(os.path.join(root, "*", "*", "historical_data.csv")) + glob.glob(os.path.join(root, "*", "*", "wg_report.csv"))
+    return max((os.path.getmtime(f) for f in files), default=0)
+
+
+# Load cached results, recomputing when any historical/WG file is newer than the cache
+def load_scenarios(path=SCENARIO_CACHE_PATH, root=DATA_ROOT, n_paths=N_PATHS, progress=None):
+    if os.path.exists(path) and os.path.getmtime(path) >= _inputs_mtime(root):
+        with open(path, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("n_paths") == n_paths:
+            return cached["results"]
+
+    results = precompute_all(root, n_paths=n_paths, progress=progress)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"n_paths": n_paths, "results": results}, f)
+    os.replace(tmp_path, path)
+    return results
+
+
+if __name__ == "__main__":
+    scenarios = load_scenarios()
+    for (data_type, category), result in sorted(scenarios.items()):
+        targets = result["targets"]
+        if targets is not None and not targets.empty:
+            probs = ", ".join(f"{s}: {p:.0%}" for s, p in zip(targets["Scenario"], targets["Probability"]))
+            print(f"{data_type:<10} {category:<25} {probs}")
@@ -0,0 +1,83 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_MAX_RATIO = 0.5  # strings become Categorical when unique values ≤ this share of rows
+MAX_DECIMALS = 6
+
+_lock = threading.Lock()
+_report = {}  # table -> {"Rows", "Before (MB)", "After (MB)"}
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 1024 / 1024
+
+
+def memory_report():
+    with _lock:
+        rows = [{"Table": table, **sizes} for table, sizes in _report.items()]
+    df = pd.DataFrame(rows, columns=["Table", "Rows", "Before (MB)", "After (MB)"])
+    return df.assign(Saved=1 - df["After (MB)"] / df["Before (MB)"]).round(3)
+
+
+# ---------- COLUMNS ----------
+# Decimal places the data actually uses (0..MAX_DECIMALS)
+def _decimals(values):
+    finite = values[np.isfinite(values)]
+    for decimals in range(MAX_DECIMALS + 1):
+        if np.allclose(np.round(finite, decimals), finite, rtol=1e-12, atol=0):
+            return decimals
+    return MAX_DECIMALS
+
+
+# Measurements as float32 when every value still reads the same at its own decimal precision,
+# else float64. Integer-valued measurements become floats too, so unit conversions can scale them in place.
+def _compact_float(series):
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    as_f32 = values.astype(np.float32)
+    if np.allclose(as_f32, values, rtol=0, atol=0.5 * 10 ** -_decimals(values), equal_nan=True):
+        return series.astype(np.float32)
+    return series.astype(np.float64)
+
+
+# Low-cardinality strings as ordered Categoricals (sorted categories keep <, <= and sorting working)
+def _compact_string(series, max_ratio):
+    uniques = series.dropna().unique()
+    if len(uniques) > max(1, max_ratio * len(series)):
+        return series
+    return series.astype(pd.CategoricalDtype(sorted(uniques), ordered=True))
+
+
+# ---------- INGEST ----------
+# Shrinks a freshly loaded table in place of its defaults: unused columns dropped (`columns` lists
+# the ones to keep), years to int16 and *_ID keys to their smallest int, measurements to float32 where
+# precision allows, low-cardinality strings to Categorical unless listed in `strings` (labels that
+# are pivoted or animated over, where unused categories would show up). Records memory under `table`.
+def compact_frame(df, table, columns=None, strings=(), max_ratio=CATEGORY_MAX_RATIO):
+    before = memory_mb(df)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    df = df.copy()
+
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        if col == "Year" and series.dtype.kind in "iuf" and series.notna().all():
+            df[col] = series.astype(np.int16)
+        elif series.dtype.kind in "iu" and col.endswith("ID"):
+            df[col] = pd.to_numeric(series, downcast="integer")
+        elif series.dtype.kind in "iuf":
+            df[col] = _compact_float(series)
+        elif col not in strings and (series.dtype == object or pd.api.types.is_string_dtype(series.dtype)):
+            df[col] = _compact_string(series, max_ratio)
+
+    with _lock:
+        _report[table] = {"Rows": len(df), "Before (MB)": before, "After (MB)": memory_mb(df)}
+    return df
+
+
+# World CSVs by column position, as the query layer reads them (area_oilseeds names its first column "Area")
+def read_world_csv(path):
+    return compact_frame(pd.read_csv(path, header=0, names=["Country", "Year", "Unit", "Value"]), "world")
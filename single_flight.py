@@ -0,0 +1,76 @@
+import functools
+import threading
+from concurrent.futures import Future
+from disk_cache import call_key
+
+DEFAULT_TIMEOUT = 120  # seconds a waiting caller will block on someone else's computation
+
+_lock = threading.Lock()
+_stats = {"leaders": 0, "shared": 0, "timeouts": 0, "errors": 0}
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+def flight_stats():
+    with _lock:
+        return dict(_stats)
+
+
+# ---------- SINGLE FLIGHT ----------
+# Concurrent calls with the same key share one computation: the first caller (leader)
+# runs fn, everyone else waits on its Future and gets the same result or exception.
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            _count("shared")
+            try:
+                return call.result(timeout=timeout)
+            except TimeoutError:
+                _count("timeouts")
+                raise TimeoutError(f"Timed out after {timeout}s waiting for in-flight computation of {key}")
+
+        _count("leaders")
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            _count("errors")
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+_group = SingleFlight()
+
+
+# Coalesce concurrent identical calls to fn (keyed like disk_cached: name + argument hash)
+def coalesced(timeout=DEFAULT_TIMEOUT, group=None):
+    def decorator(fn):
+        name = fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return (group or _group).do(call_key(name, args, kwargs), fn, *args, timeout=timeout, **kwargs)
+        return wrapper
+    return decorator
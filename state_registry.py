@@ -0,0 +1,115 @@
+import logging
+import re
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ---------- CANONICAL STATE NAMES ----------
+# The position in this list is the integer State_ID used for every join.
+# Append new entries at the end so existing IDs never shift.
+CANONICAL_STATES = [
+    "India",
+    "Andaman & Nicobar Islands",
+    "Andhra Pradesh",
+    "Arunachal Pradesh",
+    "Assam",
+    "Bihar",
+    "Chandigarh",
+    "Chhattisgarh",
+    "Dadra & Nagar Haveli",
+    "Daman & Diu",
+    "Dadra & Nagar Haveli and Daman & Diu",
+    "Delhi",
+    "Goa",
+    "Gujarat",
+    "Haryana",
+    "Himachal Pradesh",
+    "Jammu & Kashmir",
+    "Jharkhand",
+    "Karnataka",
+    "Kerala",
+    "Ladakh",
+    "Lakshadweep",
+    "Madhya Pradesh",
+    "Maharashtra",
+    "Manipur",
+    "Meghalaya",
+    "Mizoram",
+    "Nagaland",
+    "Odisha",
+    "Puducherry",
+    "Punjab",
+    "Rajasthan",
+    "Sikkim",
+    "Tamil Nadu",
+    "Telangana",
+    "Tripura",
+    "Uttar Pradesh",
+    "Uttarakhand",
+    "West Bengal",
+]
+
+INDIA = "India"
+INDIA_ID = CANONICAL_STATES.index(INDIA)
+
+STATE_DTYPE = pd.CategoricalDtype(CANONICAL_STATES)
+STATE_IDS = {name: i for i, name in enumerate(CANONICAL_STATES)}
+
+# ---------- ALIASES ----------
+# Spellings found in Pulses_Data.xlsx, india_st, 2011_Dist and S01_PC.
+# Case, spacing and "&" vs "and" are already handled by state_key().
+STATE_ALIASES = {
+    "All India": "India",
+    "Andaman & Nicobar": "Andaman & Nicobar Islands",
+    "Andaman & Nicobar Island": "Andaman & Nicobar Islands",
+    "Arunanchal Pradesh": "Arunachal Pradesh",
+    "Chhattishgarh": "Chhattisgarh",
+    "Dadara & Nagar Havelli": "Dadra & Nagar Haveli",
+    "Daman and Diu and Dadra and Nagar Haveli": "Dadra & Nagar Haveli and Daman & Diu",
+    "Kashmir": "Jammu & Kashmir",
+    "NCT of Delhi": "Delhi",
+    "Kerela": "Kerala",
+    "Orissa": "Odisha",
+    "Pondicherry": "Puducherry",
+    "Telengana": "Telangana",
+    "Uttaranchal": "Uttarakhand",
+}
+
+
+# Normalize a raw name to a lookup key: lower case, "&" -> "and", letters/digits only
+def state_key(name):
+    return re.sub(r"[^a-z0-9]", "", str(name).lower().replace("&", "and"))
+
+
+_KEY_TO_CANONICAL = {state_key(name): name for name in CANONICAL_STATES}
+_KEY_TO_CANONICAL.update({state_key(alias): name for alias, name in STATE_ALIASES.items()})
+
+
+def canonical_state_name(name):
+    if pd.isna(name):
+        return None
+    return _KEY_TO_CANONICAL.get(state_key(name))
+
+
+# Resolve a column of raw names to the shared categorical dtype.
+# Only the distinct spellings are looked up, so this stays cheap on long tables.
+def to_state_categorical(names):
+    codes, uniques = pd.factorize(pd.Series(names), use_na_sentinel=True)
+    resolved = pd.Categorical([canonical_state_name(u) for u in uniques], dtype=STATE_DTYPE)
+    # Appending -1 lets NaN names (code -1) fall through to "unmatched"
+    state_ids = np.append(resolved.codes, -1)[codes]
+    unmatched = sorted({str(u).strip() for u, c in zip(uniques, resolved.codes) if c < 0})
+    return pd.Categorical.from_codes(state_ids, dtype=STATE_DTYPE), unmatched
+
+
+# Replace `column` with canonical names and add an integer State_ID column (-1 = unmatched).
+# Returns the frame and the raw names that could not be matched, so callers can report them.
+def attach_state_ids(df, column, source=None):
+    df = df.copy()
+    states, unmatched = to_state_categorical(df[column])
+    df[column] = states
+    df["State_ID"] = states.codes.astype("int16")
+    if unmatched:
+        logger.warning("Unmatched state names in %s: %s", source or column, ", ".join(unmatched))
+    return df, unmatched
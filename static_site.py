@@ -0,0 +1,298 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import plotly.io as pio
+from plotly.offline import get_plotlyjs
+from catalog import (CATEGORY_HIERARCHY, DATA_ROOT, DATA_TYPES, UNIT_CONVERSIONS, WORLD_ROOT, category_unit,
+                     iter_world_files, normalize_category)
+from classification import SCHEMES, build_class_catalog
+from derived import build_panel
+from export_maps import (RENDER_MODULES, SCHEME, load_manifest, pulse_tasks, save_manifest, task_key, timeline_categories,
+                         timeline_inputs)
+from forecast_timeline import build_forecast_timeline_figure
+from india_maps import render_pulses_map_png
+from model_accuracy import build_accuracy_index
+from query_layer import world_ranks
+from rollup import build_rollups
+from schema import read_world_csv
+from world_map import build_world_timelapse_figure
+
+SITE_ROOT = "static_site"
+SITE_INDEX = "site.json"
+SITE_MODULES = RENDER_MODULES + ["static_site.py", "query_layer.py"]
+# Selectors of each view, in app.py's sidebar order: (record field, label)
+VIEWS = {
+    "timeline": {"title": "Future Projections", "fields": [
+        ("type", "Select Type:"), ("sector", "Main Sector"), ("sub_sector", "Sub-Sector"),
+        ("category", "Category"), ("unit", "Convert Unit")]},
+    "world": {"title": "World View Map", "fields": [
+        ("type", "Select Type:"), ("category", "World Map Category"), ("color", "Color World Map By")]},
+    "pulses": {"title": "Pulses Map", "fields": [
+        ("season", "Select Season"), ("pulse", "Select Pulse Type"), ("metric", "Select Metric"), ("year", "Select Year")]},
+}
+
+
+# ---------- SELECTION SPACE ----------
+# Every (type, sector, sub-sector, category) the sidebar can reach that has a timeline, with each unit
+# it offers: "Original" plus the conversions of the category's unit. One task per category.
+def timeline_tasks(root=DATA_ROOT):
+    rollups, _ = build_rollups(root)
+    panel = build_panel(root)
+    accuracy = build_accuracy_index(root)
+    for data_type in DATA_TYPES:
+        sources = {normalize_category(c): (c, source) for c, source in timeline_categories(data_type, panel, root)}
+        for sector, sub_sectors in CATEGORY_HIERARCHY.items():
+            for sub_sector, groups in sub_sectors.items():
+                for display in [name for names in groups.values() for name in names]:
+                    if normalize_category(display) not in sources:
+                        continue
+                    category, source = sources[normalize_category(display)]
+                    unit = category_unit(data_type, display)
+                    variants = []
+                    for label, multiplier in [("Original", 1.0)] + list(UNIT_CONVERSIONS.get(unit, {}).items()):
+                        inputs = timeline_inputs(data_type, category, source, rollups, panel, accuracy, multiplier, root)
+                        if inputs is not None:
+                            selection = {"type": data_type, "sector": sector, "sub_sector": sub_sector,
+                                         "category": display, "unit": label}
+                            variants.append((selection, *inputs, unit if label == "Original" else label))
+                    if variants:
+                        yield {"kind": "timeline", "name": f"{data_type}/{sector}/{sub_sector}/{display}",
+                               "params": tuple(variants), "inputs": []}
+
+
+# Every (type, world category) coloured by value (classes of `scheme`) and by world rank
+def world_tasks(catalog, scheme, root=WORLD_ROOT):
+    for data_type, category, path in iter_world_files(root):
+        breaks = catalog.get(("world", f"{data_type}/{category}", scheme))
+        yield {"kind": "world", "name": f"{data_type}/{category}",
+               "params": (data_type, category.title(), read_world_csv(path), world_ranks(data_type, category), breaks),
+               "inputs": [path]}
+
+
+def build_site_tasks(views=tuple(VIEWS), scheme=SCHEME):
+    catalog = build_class_catalog() if {"pulses", "world"} & set(views) else {}
+    tasks = []
+    if "timeline" in views:
+        tasks += timeline_tasks()
+    if "world" in views:
+        tasks += world_tasks(catalog, scheme)
+    if "pulses" in views:
+        tasks += pulse_tasks(catalog, scheme)
+    return tasks
+
+
+# ---------- BUILD ----------
+def slug(*parts):
+    return "/".join(str(part).replace("/", "-").replace(" ", "_").replace("'", "").lower() for part in parts)
+
+
+# Plotly figure spec gzipped; the page inflates it with the browser's DecompressionStream
+def write_figure(fig, root, path):
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "wb") as f:
+        f.write(gzip.compress(pio.to_json(fig, validate=False).encode(), mtime=0))
+
+
+# Builds one task's files → selection records, each with the "path" of its figure (JSON) or map (PNG)
+def build_task(task, root=SITE_ROOT):
+    records = []
+    if task["kind"] == "timeline":
+        for selection, historical_df, forecast_df, wg_df, unit in task["params"]:
+            path = f"figures/timeline/{slug(selection['type'], selection['category'], selection['unit'])}.json.gz"
+            write_figure(build_forecast_timeline_figure(historical_df, forecast_df, wg_df, unit), root, path)
+            records.append({**selection, "path": path})
+    elif task["kind"] == "world":
+        data_type, category, df, ranks, breaks = task["params"]
+        title = f"{category} {data_type}"
+        for color, fig in [("Value", build_world_timelapse_figure(df, metric_title=title, breaks=breaks)),
+                           ("World rank", build_world_timelapse_figure(ranks, metric_title=title, color="Rank"))]:
+            path = f"figures/world/{slug(data_type, category, color)}.json.gz"
+            write_figure(fig, root, path)
+            records.append({"type": data_type, "category": category, "color": color, "path": path})
+    else:
+        pulse, season, metric, labels, breaks, _ = task["params"]
+        for label in labels:
+            path = f"maps/pulses/{slug(pulse, season, metric, label)}.png"
+            png = render_pulses_map_png(pulse, season, metric, label, breaks=breaks)
+            os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+            with open(os.path.join(root, path), "wb") as f:
+                f.write(png)
+            records.append({"season": season, "pulse": pulse, "metric": metric, "year": label, "path": path})
+    return records
+
+
+def _build_job(job):
+    task, root = job
+    try:
+        return build_task(task, root), ""
+    except Exception as e:
+        return [], str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+
+
+# A task is skipped when its key is unchanged and every file it wrote last time is still there
+def is_current(entry, key, root):
+    return entry is not None and entry["key"] == key and all(
+        os.path.exists(os.path.join(root, record["path"])) for record in entry["records"])
+
+
+# Records grouped by view, in task order (= sidebar order), for the page's selectors
+def site_index(tasks, manifest):
+    views = {view: {"title": spec["title"], "fields": [list(field) for field in spec["fields"]], "records": []}
+             for view, spec in VIEWS.items()}
+    for task in tasks:
+        entry = manifest.get(f"{task['kind']}/{task['name']}")
+        if entry is not None:
+            views[task["kind"]]["records"] += entry["records"]
+    return {view: spec for view, spec in views.items() if spec["records"]}
+
+
+# Builds every task in a process pool (skipping unchanged ones) and writes the page, its index and
+# plotly.js → one summary row per task
+def build_site(tasks, root=SITE_ROOT, workers=None, force=False, progress=None):
+    os.makedirs(root, exist_ok=True)
+    manifest = load_manifest(root)
+    rows, jobs = [], {}
+    for task in tasks:
+        id_, key = f"{task['kind']}/{task['name']}", task_key(task, SITE_MODULES)
+        if not force and is_current(manifest.get(id_), key, root):
+            rows.append({"Task": id_, "Status": "skipped", "Files": len(manifest[id_]["records"]), "Notes": ""})
+        else:
+            jobs[id_] = (task, key)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_build_job, (task, root)): id_ for id_, (task, _) in jobs.items()}
+        for i, future in enumerate(as_completed(futures), start=1):
+            id_ = futures[future]
+            records, note = future.result()
+            if records:
+                manifest[id_] = {"key": jobs[id_][1], "records": records}
+            else:
+                manifest.pop(id_, None)
+            save_manifest(manifest, root)
+            rows.append({"Task": id_, "Status": "built" if records else "failed", "Files": len(records), "Notes": note})
+            if progress is not None:
+                progress(i / len(futures), f"Built {id_}")
+
+    with open(os.path.join(root, SITE_INDEX), "w", encoding="utf-8") as f:
+        json.dump(site_index(tasks, manifest), f, separators=(",", ":"))
+    with open(os.path.join(root, "index.html"), "w", encoding="utf-8") as f:
+        f.write(INDEX_HTML)
+    plotly_js = os.path.join(root, "plotly.min.js")
+    if not os.path.exists(plotly_js):
+        with open(plotly_js, "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+    return pd.DataFrame(rows, columns=["Task", "Status", "Files", "Notes"]).sort_values("Task", ignore_index=True)
+
+
+# ---------- PAGE ----------
+# Cascading selectors over site.json's records: each select offers the values found among records
+# matching the selections before it, so only pre-built combinations can be picked
+INDEX_HTML = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>India FoodCrop Data Dashboard</title>
+<script src="plotly.min.js"></script>
+<style>
+body { font-family: sans-serif; margin: 0; display: flex; }
+#sidebar { width: 260px; padding: 16px; background: #f0f2f6; min-height: 100vh; }
+#sidebar label { display: block; margin-top: 12px; font-size: 14px; }
+#sidebar select { width: 100%; }
+#main { flex: 1; padding: 16px; }
+#map { max-width: 100%; }
+</style></head>
+<body>
+<div id="sidebar"><label>View <select id="view"></select></label><div id="selectors"></div></div>
+<div id="main"><h1 style="text-align:center;">🌾 India FoodCrop Data Dashboard</h1><h3 id="title"></h3>
+<div id="figure"></div><img id="map"></div>
+<script>
+let site = null;
+
+async function loadFigure(path) {
+  const bytes = new Uint8Array(await (await fetch(path)).arrayBuffer());
+  // The server may already have inflated it (Content-Encoding); only gzip data starts with 1f 8b
+  const stream = new Blob([bytes]).stream();
+  const text = bytes[0] === 0x1f && bytes[1] === 0x8b
+    ? await new Response(stream.pipeThrough(new DecompressionStream("gzip"))).text()
+    : new TextDecoder().decode(bytes);
+  return JSON.parse(text);
+}
+
+function matching(view, depth) {
+  const fields = site[view].fields;
+  return site[view].records.filter(r => fields.slice(0, depth).every(([key]) =>
+    r[key] === document.getElementById("sel-" + key).value));
+}
+
+function fillSelectors(view, from) {
+  const fields = site[view].fields;
+  for (let depth = from; depth < fields.length; depth++) {
+    const select = document.getElementById("sel-" + fields[depth][0]);
+    const previous = select.value;
+    const values = [...new Set(matching(view, depth).map(r => r[fields[depth][0]]))];
+    select.innerHTML = values.map(v => `<option>${v}</option>`).join("");
+    if (values.includes(previous)) select.value = previous;
+  }
+  show(view);
+}
+
+async function show(view) {
+  const record = matching(view, site[view].fields.length)[0];
+  const figure = document.getElementById("figure"), map = document.getElementById("map");
+  if (!record) return;
+  if (record.path.endsWith(".png")) {
+    Plotly.purge(figure);
+    map.src = record.path;
+    map.style.display = "";
+  } else {
+    map.style.display = "none";
+    await Plotly.newPlot(figure, await loadFigure(record.path));
+  }
+}
+
+function selectView(view) {
+  document.getElementById("title").textContent = site[view].title;
+  document.getElementById("selectors").innerHTML = site[view].fields.map(([key, label]) =>
+    `<label>${label} <select id="sel-${key}"></select></label>`).join("");
+  site[view].fields.forEach(([key], depth) =>
+    document.getElementById("sel-" + key).onchange = () => fillSelectors(view, depth + 1));
+  fillSelectors(view, 0);
+}
+
+fetch("site.json").then(r => r.json()).then(data => {
+  site = data;
+  const views = document.getElementById("view");
+  views.innerHTML = Object.keys(site).map(v => `<option value="${v}">${site[v].title}</option>`).join("");
+  views.onchange = () => selectView(views.value);
+  selectView(views.value);
+});
+</script>
+</body></html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-build every sidebar selection of the dashboard (timelines, world maps, pulses maps) "
+                    "into a static site with client-side selectors, servable from any plain file server.")
+    parser.add_argument("--views", nargs="+", choices=list(VIEWS), default=list(VIEWS))
+    parser.add_argument("--scheme", choices=SCHEMES, default=SCHEME, help="map colour classes")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--root", default=SITE_ROOT)
+    parser.add_argument("--force", action="store_true", help="rebuild tasks whose inputs are unchanged")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    tasks = build_site_tasks(args.views, args.scheme)
+    summary = build_site(tasks, args.root, args.workers, args.force,
+                         progress=lambda fraction, message: print(f"[{fraction:4.0%}] {message}", flush=True))
+    print(summary.to_string(index=False))
+    print(summary["Status"].value_counts().to_string())
+    print(f"{len(tasks)} tasks, {summary['Files'].sum()} files in {time.perf_counter() - started:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from cagr import cagr_matrix
+
+
+def test_cagr_between_every_pair_of_years():
+    matrix = cagr_matrix([2000, 2001, 2003], [100.0, 110.0, 133.1])
+    assert matrix[0, 1] == pytest.approx(10.0)
+    assert matrix[0, 2] == pytest.approx(100 * (1.331 ** (1 / 3) - 1))
+    assert matrix[1, 2] == pytest.approx(10.0)
+
+
+def test_cagr_is_undefined_below_the_diagonal_and_for_non_positive_values():
+    matrix = cagr_matrix([2000, 2001, 2002], [100.0, 0.0, 121.0])
+    assert np.isnan(matrix[np.tril_indices(3)]).all()
+    assert np.isnan(matrix[0, 1]) and np.isnan(matrix[1, 2])
+    assert matrix[0, 2] == pytest.approx(10.0)
@@ -0,0 +1,39 @@
+import itertools
+
+import numpy as np
+import pytest
+from classification import class_index, jenks_breaks
+
+
+def within_cost(values, labels):
+    return sum(((values[labels == c] - values[labels == c].mean()) ** 2).sum() for c in np.unique(labels))
+
+
+# Least within-class squared deviation over every split of the sorted values into k runs
+def brute_force_cost(values, k):
+    values = np.sort(values)
+    best = np.inf
+    for cuts in itertools.combinations(range(1, len(values)), k - 1):
+        labels = np.zeros(len(values), dtype=int)
+        for cut in cuts:
+            labels[cut:] += 1
+        best = min(best, within_cost(values, labels))
+    return best
+
+
+def test_jenks_keeps_singleton_top_class():
+    values = np.array([0.329, 0.656, 0.686, 0.84, 1.238, 1.243, 7.712, 8.313])
+    breaks = jenks_breaks(values, 4)
+    assert len(breaks) == 5
+    assert within_cost(values, class_index(values, breaks)) == pytest.approx(brute_force_cost(values, 4))
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_jenks_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n, k = int(rng.integers(3, 10)), int(rng.integers(2, 5))
+    values = rng.lognormal(0, 1.5, size=n)
+    breaks = jenks_breaks(values, k)
+    assert len(breaks) == min(k, n) + 1
+    assert np.all(np.diff(breaks) > 0)
+    assert within_cost(values, class_index(values, breaks)) == pytest.approx(brute_force_cost(values, min(k, n)))
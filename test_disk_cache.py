@@ -0,0 +1,86 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+import disk_cache
+from disk_cache import _code_version, disk_cached, evict
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setitem(disk_cache._size, "bytes", None)
+    return tmp_path / "cache"
+
+
+def test_repeat_call_is_read_from_disk():
+    calls = []
+
+    @disk_cached(namespace="test_repeat")
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    assert square(3) == 9
+    assert square(3) == 9
+    assert square(4) == 16
+    assert calls == [3, 4]
+
+
+def test_frame_arguments_are_keyed_by_content():
+    calls = []
+
+    @disk_cached(namespace="test_frames")
+    def total(df):
+        calls.append(len(calls))
+        return df["Value"].sum()
+
+    assert total(pd.DataFrame({"Value": [1, 2]})) == 3
+    assert total(pd.DataFrame({"Value": [1, 2]})) == 3
+    assert total(pd.DataFrame({"Value": [1, 5]})) == 6
+    assert len(calls) == 2
+
+
+def test_dependency_change_invalidates(tmp_path):
+    source = tmp_path / "data.csv"
+    source.write_text("1\n")
+    calls = []
+
+    @disk_cached(depends_on=lambda path: [path], namespace="test_depends")
+    def read(path):
+        calls.append(path)
+        with open(path) as f:
+            return f.read()
+
+    assert read(str(source)) == "1\n"
+    assert read(str(source)) == "1\n"
+    source.write_text("1\n2\n")
+    assert read(str(source)) == "1\n2\n"
+    assert len(calls) == 2
+
+
+# Editing a module the decorated function's file imports changes the code version
+def test_code_version_follows_local_imports(tmp_path):
+    (tmp_path / "helper.py").write_text("SCALE = 1\n")
+    (tmp_path / "view.py").write_text("import os\nfrom helper import SCALE\n")
+    (tmp_path / "unrelated.py").write_text("X = 1\n")
+    view = str(tmp_path / "view.py")
+
+    before = _code_version.__wrapped__(view)
+    (tmp_path / "unrelated.py").write_text("X = 2\n")
+    assert _code_version.__wrapped__(view) == before
+    (tmp_path / "helper.py").write_text("SCALE = 2\n")
+    assert _code_version.__wrapped__(view) != before
+
+
+def test_evict_drops_least_recently_used(cache_dir):
+    os.makedirs(cache_dir / "ns")
+    for i, name in enumerate(["old", "mid", "new"]):
+        path = cache_dir / "ns" / f"{name}.pkl"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (time.time() - 100 + i, time.time() - 100 + i))
+
+    assert evict(max_bytes=250) == 1
+    assert sorted(os.listdir(cache_dir / "ns")) == ["mid.pkl", "new.pkl"]
+    assert disk_cache._size["bytes"] == 200
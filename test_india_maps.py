@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from india_maps import PULSE_METRICS, PULSE_SEASONS, PULSE_SHEETS, PulsesCube, derive_pulse_aggregates
+from state_registry import CANONICAL_STATES, INDIA_ID
+
+KHARIF, RABI, TOTAL = (PULSE_SEASONS.index(season) for season in ["Kharif", "Rabi", "Total"])
+AREA, PRODUCTION, YIELD = (PULSE_METRICS.index(metric) for metric in ["Area", "Production", "Yield"])
+GRAM = PULSE_SHEETS.index("Gram")
+STATE_A, STATE_B = [i for i in range(len(CANONICAL_STATES)) if i != INDIA_ID][:2]
+
+
+def empty_values(n_years=2):
+    return np.full((len(PULSE_SHEETS), len(PULSE_SEASONS), len(PULSE_METRICS), len(CANONICAL_STATES), n_years), np.nan)
+
+
+# Gram is only sown in Rabi: its Kharif slice has no years at all
+@pytest.fixture
+def rabi_only_cube():
+    values = empty_values()
+    values[GRAM, RABI, AREA, STATE_A] = [10.0, 12.0]
+    values[GRAM, RABI, PRODUCTION, STATE_A] = [8.0, 9.0]
+    derived = derive_pulse_aggregates(values)
+    return PulsesCube(values, np.array([2000, 2001], dtype=np.int16), ["2000-01", "2001-02"], derived)
+
+
+def test_empty_selection_has_no_labels(rabi_only_cube):
+    assert rabi_only_cube.labels_with_data("Gram", "Kharif", "Area") == []
+    assert rabi_only_cube.labels_with_data("Gram", "Rabi", "Area") == ["2000-01", "2001-02"]
+
+
+def test_year_frame_rejects_missing_label(rabi_only_cube):
+    with pytest.raises(ValueError):
+        rabi_only_cube.year_frame("Gram", "Kharif", "Area", None)
+    with pytest.raises(ValueError):
+        rabi_only_cube.year_frame("Gram", "Rabi", "Area", "1999-00")
+
+
+def test_state_series_rejects_missing_state(rabi_only_cube):
+    with pytest.raises(ValueError):
+        rabi_only_cube.state_series("Gram", "Rabi", "Area", None)
+    with pytest.raises(ValueError):
+        rabi_only_cube.state_series("Gram", "Rabi", "Area", -1)
+
+
+def test_year_frame_lists_reported_states(rabi_only_cube):
+    frame = rabi_only_cube.year_frame("Gram", "Rabi", "Area", "2001-02")
+    rows = frame.set_index("State_ID")
+    assert sorted(rows.index) == sorted([STATE_A, INDIA_ID])
+    assert rows.loc[STATE_A, "Area"] == rows.loc[INDIA_ID, "Area"] == 12.0
+    assert not rows.loc[STATE_A, "Derived"] and rows.loc[INDIA_ID, "Derived"]
+
+
+def test_derivation_fills_totals_and_yields():
+    values = empty_values(n_years=1)
+    values[GRAM, KHARIF, AREA, STATE_A] = 2.0
+    values[GRAM, RABI, AREA, STATE_A] = 3.0
+    values[GRAM, KHARIF, PRODUCTION, STATE_A] = 1.0
+    values[GRAM, RABI, PRODUCTION, STATE_A] = 4.0
+    values[GRAM, RABI, AREA, STATE_B] = 5.0
+    values[GRAM, RABI, PRODUCTION, STATE_B] = 5.0
+    values[GRAM, RABI, YIELD, STATE_B] = 900.0  # shipped; disagrees with 5 / 5 × 1000
+    derived = derive_pulse_aggregates(values)
+
+    assert values[GRAM, TOTAL, AREA, STATE_A, 0] == 5.0
+    assert values[GRAM, TOTAL, PRODUCTION, STATE_A, 0] == 5.0
+    assert values[GRAM, RABI, AREA, INDIA_ID, 0] == 8.0
+    assert values[GRAM, TOTAL, YIELD, STATE_A, 0] == pytest.approx(1000.0)
+    assert values[GRAM, RABI, YIELD, STATE_B, 0] == 900.0
+    assert derived[GRAM, TOTAL, AREA, STATE_A, 0] and not derived[GRAM, RABI, YIELD, STATE_B, 0]
@@ -0,0 +1,53 @@
+import time
+
+from job_queue import DONE, FAILED, LOST, QUEUED, JobQueue
+
+
+def wait_for(queue, job_id, timeout=5):
+    deadline = time.time() + timeout
+    while queue.status(job_id)["status"] not in (DONE, FAILED) and time.time() < deadline:
+        time.sleep(0.01)
+    return queue.status(job_id)
+
+
+def add(a, b, progress=None):
+    progress(0.5, "halfway")
+    return a + b
+
+
+def fail():
+    raise ValueError("boom")
+
+
+def make_queue(tmp_path):
+    return JobQueue(db_path=str(tmp_path / "jobs.sqlite"), result_dir=str(tmp_path / "results"))
+
+
+def test_job_runs_and_same_key_is_reused(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.submit("add", add, 2, 3, key="add:2:3")
+    assert wait_for(queue, job_id)["status"] == DONE
+    assert queue.result(job_id) == 5
+    assert queue.submit("add", add, 2, 3, key="add:2:3") == job_id
+
+
+def test_failure_is_recorded(tmp_path):
+    queue = make_queue(tmp_path)
+    job = wait_for(queue, queue.submit("fail", fail))
+    assert job["status"] == FAILED
+    assert "boom" in job["error"]
+
+
+# A pending job is only lost once its owner's heartbeat is stale, not because another process started
+def test_only_stale_pending_jobs_are_reaped(tmp_path):
+    queue = make_queue(tmp_path)
+    conn = queue._conn()
+    now = time.time()
+    conn.execute("INSERT INTO jobs (id, kind, status, owner, heartbeat_at) VALUES ('alive', 'x', ?, 'other', ?)",
+                 (QUEUED, now))
+    conn.execute("INSERT INTO jobs (id, kind, status, owner, heartbeat_at) VALUES ('dead', 'x', ?, 'other', ?)",
+                 (QUEUED, now - 3600))
+
+    make_queue(tmp_path)
+    assert queue.status("alive")["status"] == QUEUED
+    assert queue.status("dead")["status"] == LOST
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+import disk_cache
+from rollup import build_rollups, leaves, missing_parents, rollup_frames
+
+
+def write_category(root, folder, rows):
+    path = root / "Production" / folder
+    path.mkdir(parents=True)
+    pd.DataFrame(rows, columns=["Year", "Total"]).to_csv(path / "historical_data.csv", index=False)
+
+
+# Leaves in '000 tonnes; shipped foodgrains in lakh tonnes (÷100) with 2001 off by 10%
+@pytest.fixture
+def data_root(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "Data"
+    write_category(root, "prod_rice", [(2000, 100.0), (2001, 110.0), (2002, 120.0)])
+    write_category(root, "prod_wheat", [(2000, 50.0), (2001, 60.0), (2002, None)])
+    write_category(root, "prod_coarse cereals", [(2000, 30.0), (2001, 30.0), (2002, 30.0)])
+    write_category(root, "prod_pulses", [(2000, 20.0), (2001, 20.0), (2002, 20.0)])
+    write_category(root, "prod_foodgrains", [(2000, 2.0), (2001, 2.42), (2002, 1.7)])
+    return str(root)
+
+
+def test_leaves_expand_nested_parents():
+    assert leaves("foodgrains") == ["rice", "wheat", "coarse cereals", "pulses"]
+    assert leaves("rice") == ["rice"]
+
+
+def test_parents_are_sums_of_leaves(data_root):
+    rollups, _ = build_rollups(data_root)
+    history, forecasts = rollup_frames(rollups, "Production", "cereals")
+    assert history.set_index("Year")["Total"].to_dict() == {2000: 180.0, 2001: 200.0}  # wheat missing in 2002
+    assert list(forecasts.columns) == ["Year"]
+
+
+def test_shipped_aggregate_is_scaled_and_flagged(data_root):
+    _, checks = build_rollups(data_root)
+    foodgrains = checks[checks["Category"] == "foodgrains"].set_index("Year")
+    assert (foodgrains["Scale"] == 100).all()
+    assert foodgrains.loc[2000, "Gap"] == pytest.approx(0.0)
+    assert foodgrains.loc[2001, "Flagged"] and not foodgrains.loc[2000, "Flagged"]
+
+
+def test_missing_parents_need_every_leaf(data_root):
+    assert missing_parents("Production", ["rice", "wheat", "foodgrains"], data_root) == ["cereals"]
+    assert missing_parents("Yield", [], data_root) == []
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+from single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_computation():
+    group, calls, results = SingleFlight(), [], []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while group.in_flight() == 0:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert group.in_flight() == 0
+
+
+def test_leader_exception_reaches_waiters_and_is_not_kept():
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    leader = threading.Thread(target=lambda: pytest.raises(ValueError, group.do, "k", failing))
+    leader.start()
+    started.wait(5)
+    errors = []
+
+    def wait():
+        try:
+            group.do("k", failing)
+        except ValueError as e:
+            errors.append(str(e))
+
+    waiter = threading.Thread(target=wait)
+    waiter.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join(5)
+    waiter.join(5)
+
+    assert errors == ["boom"]
+    assert group.do("k", lambda: "retried") == "retried"
+
+
+def test_waiter_times_out():
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    leader = threading.Thread(target=group.do, args=("k", slow))
+    leader.start()
+    started.wait(5)
+    with pytest.raises(TimeoutError):
+        group.do("k", slow, timeout=0.05)
+    release.set()
+    leader.join(5)
@@ -0,0 +1,315 @@
+import argparse
+import errno
+import gzip
+import json
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import shapely
+from shapely.geometry import box
+import mapbox_vector_tile
+
+MBTILES_PATH = os.path.join(".cache", "india.mbtiles")
+# Shapefiles behind default_layers(); the MBTiles file records their mtime/size and is rebuilt when they change
+TILE_SOURCES = ["India_Shapefile/india_st.shp", "India_Shapefile/State/2011_Dist.shp", "India_Shapefile/S01_PC.shp"]
+TILE_EXTENT = 4096
+TILE_BUFFER = 64  # in tile units, so polygon edges don't show seams
+MERCATOR_HALF = 20037508.342789244
+DEFAULT_ZOOMS = (3, 10)
+
+
+# ---------- TILE MATH ----------
+def tile_bounds(z, x, y):
+    size = 2 * MERCATOR_HALF / (2 ** z)
+    minx = -MERCATOR_HALF + x * size
+    maxy = MERCATOR_HALF - y * size
+    return minx, maxy - size, minx + size, maxy
+
+
+def tiles_covering(bounds, z):
+    size = 2 * MERCATOR_HALF / (2 ** z)
+    last = 2 ** z - 1
+    minx, miny, maxx, maxy = bounds
+    x0 = min(max(int((minx + MERCATOR_HALF) // size), 0), last)
+    x1 = min(max(int((maxx + MERCATOR_HALF) // size), 0), last)
+    y0 = min(max(int((MERCATOR_HALF - maxy) // size), 0), last)
+    y1 = min(max(int((MERCATOR_HALF - miny) // size), 0), last)
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            yield x, y
+
+
+# ---------- LAYERS ----------
+# Each layer: GeoDataFrame, integer feature-id column, properties kept in the tile.
+# The feature id is what the browser joins data values on.
+def default_layers():
+    import geopandas as gpd
+    from state_registry import attach_state_ids
+    from constituencies import load_constituencies, load_districts
+
+    states, _ = attach_state_ids(gpd.read_file(TILE_SOURCES[0]), "State_Name", source="india_st.shp")
+    states["State_Name"] = states["State_Name"].astype(str)
+
+    districts = load_districts()
+    districts["District_ID"] = np.arange(len(districts), dtype="int32")
+    districts["ST_NM"] = districts["ST_NM"].astype(str)
+
+    constituencies = load_constituencies()
+    constituencies["ST_NAME"] = constituencies["ST_NAME"].astype(str)
+
+    return {
+        "states": (states, "State_ID", ["State_Name"]),
+        "districts": (districts, "District_ID", ["DISTRICT", "ST_NM", "State_ID"]),
+        "constituencies": (constituencies, "PC_ID", ["PC_NAME", "ST_NAME", "State_ID"]),
+    }
+
+
+def _encode_tile(layer_geoms, bounds):
+    minx, miny, maxx, maxy = bounds
+    pad = (maxx - minx) * TILE_BUFFER / TILE_EXTENT
+    clip_box = box(minx - pad, miny - pad, maxx + pad, maxy + pad)
+
+    encoded_layers = []
+    for name, (geoms, tree, ids, props) in layer_geoms.items():
+        hits = tree.query(clip_box, predicate="intersects")
+        if len(hits) == 0:
+            continue
+        clipped = shapely.clip_by_rect(geoms[hits], *clip_box.bounds)
+        features = [
+            {"geometry": geom, "id": int(ids[i]), "properties": props[i]}
+            for i, geom in zip(hits, clipped) if not geom.is_empty
+        ]
+        if features:
+            encoded_layers.append({"name": name, "features": features})
+
+    if not encoded_layers:
+        return None
+    return mapbox_vector_tile.encode(
+        encoded_layers,
+        default_options={"quantize_bounds": bounds, "extents": TILE_EXTENT}
+    )
+
+
+# ---------- MBTILES ----------
+def sources_token(sources=TILE_SOURCES):
+    tokens = []
+    for path in sources:
+        try:
+            stat = os.stat(path)
+            tokens.append([path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            tokens.append([path, None, None])
+    return json.dumps(tokens)
+
+
+# True when the file exists and was cut from the sources as they are now
+def mbtiles_current(path=MBTILES_PATH, sources=TILE_SOURCES):
+    if not os.path.exists(path):
+        return False
+    try:
+        with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as conn:
+            row = conn.execute("SELECT value FROM metadata WHERE name='sources'").fetchone()
+    except sqlite3.Error:
+        return False
+    return row is not None and row[0] == sources_token(sources)
+
+
+def ensure_mbtiles(path=MBTILES_PATH, sources=TILE_SOURCES):
+    if not mbtiles_current(path, sources):
+        build_mbtiles(default_layers(), path, sources=sources)
+
+
+def _init_mbtiles(conn, zooms, bounds_lonlat, sources):
+    conn.executescript("""
+        DROP TABLE IF EXISTS metadata;
+        DROP TABLE IF EXISTS tiles;
+        CREATE TABLE metadata (name TEXT, value TEXT);
+        CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+        CREATE UNIQUE INDEX tile_index ON tiles (zoom_level, tile_column, tile_row);
+    """)
+    conn.executemany("INSERT INTO metadata VALUES (?, ?)", [
+        ("name", "india"),
+        ("format", "pbf"),
+        ("minzoom", str(zooms[0])),
+        ("maxzoom", str(zooms[1])),
+        ("bounds", ",".join(f"{b:.5f}" for b in bounds_lonlat)),
+        ("sources", sources_token(sources)),
+    ])
+
+
+# Cut every layer into gzip-compressed Mapbox Vector Tiles for each zoom level.
+# Geometry is simplified once per zoom to roughly one tile unit, then clipped per tile.
+# `sources` are the files the layers were read from, recorded for mbtiles_current().
+def build_mbtiles(layers, path=MBTILES_PATH, zooms=DEFAULT_ZOOMS, sources=TILE_SOURCES):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".mbtiles.tmp")  # one per builder
+    os.close(fd)
+
+    projected = {name: (gdf.to_crs(epsg=3857), id_col, cols) for name, (gdf, id_col, cols) in layers.items()}
+    all_bounds = np.array([gdf.total_bounds for gdf, _, _ in projected.values()])
+    bounds = (all_bounds[:, 0].min(), all_bounds[:, 1].min(), all_bounds[:, 2].max(), all_bounds[:, 3].max())
+    bounds_lonlat = [
+        math.degrees(bounds[0] / 6378137.0), math.degrees(math.atan(math.sinh(bounds[1] / 6378137.0))),
+        math.degrees(bounds[2] / 6378137.0), math.degrees(math.atan(math.sinh(bounds[3] / 6378137.0))),
+    ]
+
+    n_tiles = 0
+    with sqlite3.connect(tmp_path) as conn:
+        _init_mbtiles(conn, zooms, bounds_lonlat, sources)
+        for z in range(zooms[0], zooms[1] + 1):
+            tolerance = 2 * MERCATOR_HALF / (2 ** z) / TILE_EXTENT
+            layer_geoms = {}
+            for name, (gdf, id_col, cols) in projected.items():
+                geoms = shapely.simplify(gdf.geometry.to_numpy(), tolerance, preserve_topology=True)
+                props = gdf[cols].to_dict("records")
+                layer_geoms[name] = (geoms, shapely.STRtree(geoms), gdf[id_col].to_numpy(), props)
+
+            rows = []
+            for x, y in tiles_covering(bounds, z):
+                data = _encode_tile(layer_geoms, tile_bounds(z, x, y))
+                if data is not None:
+                    # MBTiles stores rows in TMS order (y counted from the bottom)
+                    rows.append((z, x, 2 ** z - 1 - y, gzip.compress(data)))
+            conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", rows)
+            n_tiles += len(rows)
+    os.replace(tmp_path, path)
+    return n_tiles
+
+
+# ---------- LOCAL TILE ENDPOINT ----------
+class _TileHandler(BaseHTTPRequestHandler):
+    mbtiles_path = MBTILES_PATH
+    _local = threading.local()
+    _route = re.compile(r"^/tiles/(\d+)/(\d+)/(\d+)\.pbf$")
+
+    def _conn(self):
+        if getattr(self._local, "conn", None) is None:
+            self._local.conn = sqlite3.connect(f"file:{self.mbtiles_path}?mode=ro", uri=True)
+        return self._local.conn
+
+    def do_GET(self):
+        match = self._route.match(self.path.split("?")[0])
+        if not match:
+            self.send_error(404)
+            return
+        z, x, y = (int(v) for v in match.groups())
+        row = self._conn().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, 2 ** z - 1 - y)
+        ).fetchone()
+
+        if row is None:
+            self.send_response(204)
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(row[0])))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.end_headers()
+        self.wfile.write(row[0])
+
+    def log_message(self, format, *args):
+        pass
+
+
+# Serve tiles from a daemon thread next to the Streamlit app; returns the {z}/{x}/{y} URL template.
+# port=0 binds a free port. A server this process already runs for `path` is reused, and a fixed
+# port that another process already serves on is reused rather than failing.
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def _tile_url(host, port):
+    return f"http://{host}:{port}/tiles/{{z}}/{{x}}/{{y}}.pbf"
+
+
+def start_tile_server(path=MBTILES_PATH, host="127.0.0.1", port=0):
+    with _servers_lock:
+        key = (os.path.abspath(path), host)
+        if key in _servers and (port == 0 or _servers[key].server_address[1] == port):
+            return _tile_url(host, _servers[key].server_address[1])
+        handler = type("TileHandler", (_TileHandler,), {"mbtiles_path": path, "_local": threading.local()})
+        try:
+            server = ThreadingHTTPServer((host, port), handler)
+        except OSError as e:
+            if port and e.errno == errno.EADDRINUSE:
+                return _tile_url(host, port)
+            raise
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        _servers[key] = server
+        return _tile_url(host, server.server_address[1])
+
+
+# ---------- CLIENT ----------
+# MapLibre page that fetches only the tiles in view and joins values by feature id via feature-state.
+# Colours interpolate over value_range, or step through fixed classes when `breaks` is given
+# (then `colors` holds one colour per class).
+def tile_map_html(tile_url, layer, values, value_range, title="", zooms=DEFAULT_ZOOMS,
+                  center=(82.8, 22.5), zoom=3.8, height=620, colors=("#ffffb2", "#bd0026"), breaks=None):
+    config = {
+        "tileUrl": tile_url,
+        "layer": layer,
+        "values": {str(int(k)): float(v) for k, v in values.items() if v == v},
+        "range": [float(value_range[0]), float(value_range[1]) if value_range[1] > value_range[0] else float(value_range[0]) + 1],
+        "colors": list(colors),
+        "breaks": [float(b) for b in breaks[1:-1]] if breaks is not None else None,
+        "minzoom": zooms[0],
+        "maxzoom": zooms[1],
+        "center": list(center),
+        "zoom": zoom,
+    }
+    return f"""
+<link href="https://unpkg.com/maplibre-gl@4/dist/maplibre-gl.css" rel="stylesheet" />
+<script src="https://unpkg.com/maplibre-gl@4/dist/maplibre-gl.js"></script>
+<div style="font-family:Poppins, sans-serif;font-weight:600;margin-bottom:4px">{title}</div>
+<div id="map" style="height:{height - 40}px;"></div>
+<script>
+const cfg = {json.dumps(config)};
+const map = new maplibregl.Map({{
+    container: "map",
+    style: {{version: 8, sources: {{}}, layers: [{{id: "bg", type: "background", paint: {{"background-color": "#f4f4f4"}}}}]}},
+    center: cfg.center,
+    zoom: cfg.zoom
+}});
+map.on("load", () => {{
+    map.addSource("india", {{type: "vector", tiles: [cfg.tileUrl], minzoom: cfg.minzoom, maxzoom: cfg.maxzoom}});
+    map.addLayer({{
+        id: "fill", type: "fill", source: "india", "source-layer": cfg.layer,
+        paint: {{"fill-color": ["case", ["==", ["feature-state", "value"], null], "#ffffff",
+            cfg.breaks ? ["step", ["feature-state", "value"], cfg.colors[0], ...cfg.breaks.flatMap((b, i) => [b, cfg.colors[i + 1]])]
+                       : ["interpolate", ["linear"], ["feature-state", "value"], cfg.range[0], cfg.colors[0], cfg.range[1], cfg.colors[1]]]}}
+    }});
+    map.addLayer({{id: "edges", type: "line", source: "india", "source-layer": cfg.layer, paint: {{"line-color": "#000", "line-width": 0.5}}}});
+    for (const [id, value] of Object.entries(cfg.values)) {{
+        map.setFeatureState({{source: "india", sourceLayer: cfg.layer, id: Number(id)}}, {{value: value}});
+    }}
+}});
+</script>
+"""
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or serve India vector tiles (MBTiles)")
+    parser.add_argument("command", choices=["build", "serve"])
+    parser.add_argument("--path", default=MBTILES_PATH)
+    parser.add_argument("--min-zoom", type=int, default=DEFAULT_ZOOMS[0])
+    parser.add_argument("--max-zoom", type=int, default=DEFAULT_ZOOMS[1])
+    parser.add_argument("--port", type=int, default=8765)  # fixed, so the URL can be proxied
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_mbtiles(default_layers(), args.path, (args.min_zoom, args.max_zoom))
+        print(f"Wrote {count} tiles to {args.path}")
+    else:
+        print("Serving", start_tile_server(args.path, port=args.port))
+        threading.Event().wait()
@@ -0,0 +1,94 @@
+import numpy as np
+import plotly.express as px
+from catalog import WORLD_ROOT, iter_world_files
+from disk_cache import disk_cached
+from growth_analysis import decade_ranges
+from plotly_payload import optimize_figure
+from query_layer import query
+
+MIN_POINTS = 5      # years with data a decade needs before its trend is fitted
+MIN_SHARE = 0.005   # fastest-growing producers ignore countries below this share of the decade's world total
+
+
+# ---------- BULK LOGEST ----------
+# Decade-wise trend growth (LOGEST, as in growth_analysis) for every country of every world table at
+# once. Series form a padded (series × year) matrix of log values with a validity mask; the per-decade
+# least-squares sums are matrix products with a (year × decade) membership matrix, so every slope comes
+# from the closed form (nΣxy − ΣxΣy) / (nΣx² − (Σx)²) without a fit per series. Gaps and non-positive
+# values are masked rather than interpolated; decades with fewer than MIN_POINTS years stay NaN.
+# → (Type, Category, Country, Decade, Growth (%), Years, Mean, Share); Share is NaN for yields
+@disk_cached(depends_on=lambda: [path for _, _, path in iter_world_files(WORLD_ROOT)])
+def build_country_growth():
+    df = query("SELECT Type, Category, Country, Year, Value FROM world_countries")  # no double-counted aggregates
+    wide = df.pivot_table(index=["Type", "Category", "Country"], columns="Year", values="Value", aggfunc="first")
+
+    years = wide.columns.to_numpy()
+    values = wide.to_numpy(dtype=float)
+    valid = np.isfinite(values) & (values > 0)
+    weights = valid.astype(float)
+    logs = np.log(np.where(valid, values, 1.0))  # 0 where masked
+    x = (years - years.mean()).astype(float)     # centred for numerical stability
+
+    decades = decade_ranges(int(years.min()), int(years.max()))
+    membership = np.array([(years >= start) & (years <= end) for start, end in decades], dtype=float).T
+    n = weights @ membership
+    sum_x = (weights * x) @ membership
+    sum_xx = (weights * x ** 2) @ membership
+    sum_y = logs @ membership
+    sum_xy = (logs * x) @ membership
+    total = np.where(valid, values, 0.0) @ membership
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_xx - sum_x ** 2)
+        growth = np.where(n >= MIN_POINTS, (np.exp(slope) - 1) * 100, np.nan)
+        mean = total / n
+
+    keys = wide.index.to_frame(index=False).loc[np.repeat(np.arange(len(wide)), len(decades))].reset_index(drop=True)
+    out = keys.assign(
+        Decade=np.tile([f"{start}-{end}" for start, end in decades], len(wide)),
+        **{"Growth (%)": growth.ravel()}, Years=n.ravel().astype(int), Mean=mean.ravel()
+    )
+    out = out[out["Years"] > 0].reset_index(drop=True)
+    world_total = out.groupby(["Type", "Category", "Decade"])["Mean"].transform("sum")
+    out["Share"] = (out["Mean"] / world_total).where(out["Type"] != "Yield")
+    return out
+
+
+# ---------- VIEWS ----------
+def growth_decades(growth, data_type, category):
+    table = growth[(growth["Type"] == data_type) & (growth["Category"] == category)]
+    return sorted(table["Decade"].unique())
+
+
+# Fastest-growing countries in one decade; producers below min_share of the world are left out
+def fastest_growing(growth, data_type, category, decade, n=10, min_share=MIN_SHARE):
+    table = growth[(growth["Type"] == data_type) & (growth["Category"] == category) & (growth["Decade"] == decade)]
+    table = table.dropna(subset=["Growth (%)"])
+    if data_type != "Yield":
+        table = table[table["Share"] >= min_share]
+    return table.nlargest(n, "Growth (%)")[["Country", "Growth (%)", "Years", "Mean", "Share"]].reset_index(drop=True)
+
+
+# Choropleth of decade growth animated over decades; a symmetric colour range centred on 0 %
+# (clipped at the 95th percentile) keeps decades comparable
+@disk_cached()
+def build_growth_choropleth(growth, data_type, category):
+    df = growth[(growth["Type"] == data_type) & (growth["Category"] == category)].dropna(subset=["Growth (%)"])
+    limit = float(np.nanpercentile(df["Growth (%)"].abs(), 95)) if not df.empty else 1.0
+    fig = px.choropleth(
+        df.sort_values("Decade"),
+        locations="Country",
+        locationmode="country names",
+        color="Growth (%)",
+        hover_name="Country",
+        hover_data={"Years": True, "Share": ":.1%"},
+        animation_frame="Decade",
+        color_continuous_scale="RdYlGn",
+        range_color=[-limit, limit],
+    )
+    fig.update_layout(
+        geo=dict(showframe=False, showcoastlines=False),
+        coloraxis_colorbar=dict(title="Trend growth (%/yr)"),
+        margin={"r": 0, "t": 40, "l": 0, "b": 0}
+    )
+    return optimize_figure(fig, "world_growth")
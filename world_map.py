@@ -1,19 +1,38 @@
 import streamlit as st
 import plotly.express as px
-import pandas as pd
+from disk_cache import disk_cached
+from single_flight import coalesced
+from plotly_payload import optimize_figure
+from frame_budget import decade_years, frame_limit, mean_gap, play_args, select_frames
+from classification import class_index, plotly_class_scale
 
-def show_world_timelapse_map(df, metric_title="Production", default_unit="Tonnes"):
+@coalesced()
+@disk_cached()
+# `breaks` (from the class catalog) colours values by fixed classes shared by every year
+def build_world_timelapse_figure(df, metric_title="Production", default_unit="Tonnes", color="Value", breaks=None):
     unit = df["Unit"].iloc[0] if "Unit" in df.columns and not df["Unit"].isna().all() else default_unit
     title = " "
+    color_scale, range_color, colorbar = "YlGnBu_r" if color == "Rank" else "YlGnBu", None, {}  # rank 1 darkest
+    if breaks is not None and color == "Value":
+        df = df.assign(Class=class_index(df["Value"], breaks))
+        color_scale, range_color, colorbar = plotly_class_scale(breaks, "YlGnBu")
+        color = "Class"
+
+    # Frame budget: stride over years (keeping decade boundaries) sized to the countries per frame
+    years = df["Year"].unique()
+    frame_years = select_frames(years, frame_limit(df.groupby("Year").size().max()), keep=decade_years(years))
+    df = df[df["Year"].isin(frame_years)]
 
     fig = px.choropleth(
         df,
         locations="Country",
         locationmode="country names",
-        color="Value",
+        color=color,
         hover_name="Country",
+        hover_data=["Value"] if color != "Value" else None,
         animation_frame="Year",
-        color_continuous_scale="YlGnBu",
+        color_continuous_scale=color_scale,
+        range_color=range_color,
         title=title
     )
     fig.update_layout(
@@ -22,11 +41,7 @@ def show_world_timelapse_map(df, metric_title="Production", default_unit="Tonnes
             "buttons": [{
                 "label": "Play",
                 "method": "animate",
-                "args": [None, {
-                    "frame": {"duration": 200, "redraw": True},  # Lower = faster (ms)
-                    "fromcurrent": True,
-                    "transition": {"duration": 1, "easing": "linear"}
-                }]
+                "args": [None, play_args(200, mean_gap(frame_years))]  # 200 ms per year; lower = faster
             }, {
                 "label": "Pause",
                 "method": "animate",
@@ -41,8 +56,12 @@ def show_world_timelapse_map(df, metric_title="Production", default_unit="Tonnes
 
     fig.update_layout(
         geo=dict(showframe=False, showcoastlines=False),
-        coloraxis_colorbar=dict(title=unit),
+        coloraxis_colorbar=dict(title="World rank" if color == "Rank" else unit, **colorbar),
         margin={"r": 0, "t": 40, "l": 0, "b": 0}
     )
 
+    return optimize_figure(fig, "world_timelapse")
+
+def show_world_timelapse_map(df, metric_title="Production", default_unit="Tonnes", color="Value", breaks=None):
+    fig = build_world_timelapse_figure(df, metric_title, default_unit, color, breaks)
     st.plotly_chart(fig, use_container_width=True)